@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Queue the monthly leave accrual; run it from cron on the 1st of each month:
+
+    python accrue.py                   # entitlements as of today
+    python accrue.py --as-of 2026-03-01
+
+Enqueues an "accrue_balances" job (see app/core/accrual.py), which the job
+worker runs: it creates missing balances of that year for active users and
+sets each balance to the entitlement as of the date, carry-over included.
+Running it twice for the same date changes nothing.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.core import jobs
+from app.database import AsyncSessionLocal, engine
+
+
+async def main(as_of: date) -> None:
+    async with AsyncSessionLocal() as db:
+        jobs.enqueue(db, "accrue_balances", {"as_of": as_of.isoformat()})
+        await db.commit()
+    await engine.dispose()
+    print(f"Queued leave accrual as of {as_of.isoformat()}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    asyncio.run(main(parser.parse_args().as_of))
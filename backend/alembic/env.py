@@ -21,13 +21,14 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
-# Override sqlalchemy.url from environment variable
-db_url = os.environ.get("DATABASE_URL")
+# Override sqlalchemy.url from the caller (see app/tests/conftest.py) or the environment
+db_url = config.attributes.get("database_url") or os.environ.get("DATABASE_URL")
 if db_url:
     # Ensure usage of async driver
     if db_url.startswith("postgresql://"):
         db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-    config.set_main_option("sqlalchemy.url", db_url)
+    # The ini parser treats % as interpolation (URL-encoded passwords, socket paths)
+    config.set_main_option("sqlalchemy.url", db_url.replace("%", "%%"))
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
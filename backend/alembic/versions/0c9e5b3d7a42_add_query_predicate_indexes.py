@@ -0,0 +1,41 @@
+"""add query predicate indexes
+
+Revision ID: 0c9e5b3d7a42
+Revises: f2b6c8d1a3e5
+Create Date: 2026-10-20 01:12:37.640219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9e5b3d7a42'
+down_revision: Union[str, None] = 'f2b6c8d1a3e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_public_holidays_year'), 'public_holidays', ['year'], unique=False)
+    op.create_index('ix_vacation_balances_year_user_id', 'vacation_balances', ['year', 'user_id'], unique=False)
+    op.create_index('ix_vacation_requests_user_id_start_date', 'vacation_requests', ['user_id', 'start_date'], unique=False)
+    op.create_index(
+        'ix_vacation_requests_approved_start_date_end_date',
+        'vacation_requests',
+        ['start_date', 'end_date'],
+        unique=False,
+        postgresql_where=sa.text("status = 'approved'"),
+        sqlite_where=sa.text("status = 'approved'"),
+    )
+    op.create_index('ix_audit_events_action', 'audit_events', ['action', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_events_action', table_name='audit_events')
+    op.drop_index('ix_vacation_requests_approved_start_date_end_date', table_name='vacation_requests')
+    op.drop_index('ix_vacation_requests_user_id_start_date', table_name='vacation_requests')
+    op.drop_index('ix_vacation_balances_year_user_id', table_name='vacation_balances')
+    op.drop_index(op.f('ix_public_holidays_year'), table_name='public_holidays')
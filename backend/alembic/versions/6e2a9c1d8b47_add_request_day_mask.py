@@ -0,0 +1,35 @@
+"""add request day mask and date range index
+
+Revision ID: 6e2a9c1d8b47
+Revises: 4b8e1d6f9a27
+Create Date: 2026-10-19 19:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2a9c1d8b47'
+down_revision: Union[str, None] = '4b8e1d6f9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing requests keep NULL; they are recounted in full the first time a
+    # new holiday falls into their range
+    op.add_column('vacation_requests', sa.Column('day_mask', sa.LargeBinary(), nullable=True))
+    op.create_index(
+        'ix_vacation_requests_start_date_end_date',
+        'vacation_requests',
+        ['start_date', 'end_date'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacation_requests_start_date_end_date', table_name='vacation_requests')
+    op.drop_column('vacation_requests', 'day_mask')
@@ -0,0 +1,52 @@
+"""add user_closure table
+
+Revision ID: 7c41d2e9b0a5
+Revises: 001a602cfa4d
+Create Date: 2026-10-19 09:12:44.105118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41d2e9b0a5'
+down_revision: Union[str, None] = '001a602cfa4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['descendant_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index(op.f('ix_user_closure_descendant_id'), 'user_closure', ['descendant_id'], unique=False)
+
+    # Backfill from the existing manager_id hierarchy
+    op.execute(
+        """
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM users
+            UNION
+            SELECT tree.ancestor_id, users.id, tree.depth + 1
+            FROM tree JOIN users ON users.manager_id = tree.descendant_id
+            WHERE users.id <> tree.ancestor_id AND tree.depth < 100
+        )
+        INSERT INTO user_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, MIN(depth) FROM tree
+        GROUP BY ancestor_id, descendant_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_closure_descendant_id'), table_name='user_closure')
+    op.drop_table('user_closure')
@@ -0,0 +1,40 @@
+"""store leave amounts in quarter days
+
+Revision ID: 8d3f6b2a1c95
+Revises: 6e2a9c1d8b47
+Create Date: 2026-10-19 20:41:37.206914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6b2a1c95'
+down_revision: Union[str, None] = '6e2a9c1d8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, old column in days, new column in quarter days)
+COLUMNS = [
+    ('vacation_requests', 'business_days', 'business_quarters'),
+    ('vacation_balances', 'total_days', 'total_quarters'),
+    ('vacation_balances', 'used_days', 'used_quarters'),
+]
+
+
+def upgrade() -> None:
+    for table, days, quarters in COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(days, new_column_name=quarters)
+        op.execute(sa.text(f"UPDATE {table} SET {quarters} = {quarters} * 4"))
+
+
+def downgrade() -> None:
+    # Part days are rounded down
+    for table, days, quarters in COLUMNS:
+        op.execute(sa.text(f"UPDATE {table} SET {quarters} = {quarters} / 4"))
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(quarters, new_column_name=days)
@@ -0,0 +1,40 @@
+"""add audit events table
+
+Revision ID: 9a4d2c6e8f13
+Revises: 5f9c0e7a3b21
+Create Date: 2026-10-19 14:02:37.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d2c6e8f13'
+down_revision: Union[str, None] = '5f9c0e7a3b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'audit_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('changes', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_events_entity', 'audit_events', ['entity_type', 'entity_id', 'id'], unique=False)
+    op.create_index('ix_audit_events_actor', 'audit_events', ['actor_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_events_actor', table_name='audit_events')
+    op.drop_index('ix_audit_events_entity', table_name='audit_events')
+    op.drop_table('audit_events')
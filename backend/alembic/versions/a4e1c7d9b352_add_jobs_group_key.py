@@ -0,0 +1,35 @@
+"""add jobs group_key
+
+Revision ID: a4e1c7d9b352
+Revises: 0c9e5b3d7a42
+Create Date: 2026-10-21 09:24:11.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e1c7d9b352'
+down_revision: Union[str, None] = '0c9e5b3d7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('group_key', sa.String(), nullable=True))
+    op.create_index(
+        'ix_jobs_pending_kind_group_key',
+        'jobs',
+        ['kind', 'group_key'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_pending_kind_group_key', table_name='jobs')
+    op.drop_column('jobs', 'group_key')
@@ -0,0 +1,28 @@
+"""add vacation type accrual policy
+
+Revision ID: a5c8e3f7d216
+Revises: 8d3f6b2a1c95
+Create Date: 2026-10-19 22:13:05.771592
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c8e3f7d216'
+down_revision: Union[str, None] = '8d3f6b2a1c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('vacation_types', sa.Column('accrual', sa.String(), server_default='annual', nullable=False))
+    op.add_column('vacation_types', sa.Column('carry_over_days', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('vacation_types', 'carry_over_days')
+    op.drop_column('vacation_types', 'accrual')
@@ -0,0 +1,37 @@
+"""add approval inbox indexes
+
+Revision ID: b3e8a1f4c2d7
+Revises: 7c41d2e9b0a5
+Create Date: 2026-10-19 10:02:17.553904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8a1f4c2d7'
+down_revision: Union[str, None] = '7c41d2e9b0a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_vacation_requests_pending_user_id',
+        'vacation_requests',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(op.f('ix_user_approvers_approver_id'), 'user_approvers', ['approver_id'], unique=False)
+    op.create_index(op.f('ix_users_manager_id'), 'users', ['manager_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_manager_id'), table_name='users')
+    op.drop_index(op.f('ix_user_approvers_approver_id'), table_name='user_approvers')
+    op.drop_index('ix_vacation_requests_pending_user_id', table_name='vacation_requests')
@@ -0,0 +1,69 @@
+"""add request_list table
+
+Revision ID: d4a7e2c9f1b6
+Revises: a5c8e3f7d216
+Create Date: 2026-10-19 23:41:08.310527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7e2c9f1b6'
+down_revision: Union[str, None] = 'a5c8e3f7d216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'request_list',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('user_name', sa.String(), nullable=False),
+        sa.Column('type_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('business_quarters', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('reviewer_id', sa.Integer(), nullable=True),
+        sa.Column('reviewer_name', sa.String(), nullable=True),
+        sa.Column('reviewer_comment', sa.Text(), nullable=True),
+        sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_request_list_user_id_start_date', 'request_list', ['user_id', 'start_date'], unique=False)
+    op.create_index(
+        'ix_request_list_pending_created_at',
+        'request_list',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+
+    # Backfill from the existing requests
+    op.execute(
+        """
+        INSERT INTO request_list (
+            id, user_id, user_name, type_id, start_date, end_date, business_quarters, status,
+            comment, reviewer_id, reviewer_name, reviewer_comment, reviewed_at, created_at
+        )
+        SELECT r.id, r.user_id, owner.name, r.type_id, r.start_date, r.end_date, r.business_quarters, r.status,
+               r.comment, r.reviewer_id, reviewer.name, r.reviewer_comment, r.reviewed_at, r.created_at
+        FROM vacation_requests r
+        JOIN users owner ON owner.id = r.user_id
+        LEFT JOIN users reviewer ON reviewer.id = r.reviewer_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_list_pending_created_at', table_name='request_list')
+    op.drop_index('ix_request_list_user_id_start_date', table_name='request_list')
+    op.drop_table('request_list')
@@ -0,0 +1,83 @@
+"""partition vacation_requests by year
+
+Revision ID: f2b6c8d1a3e5
+Revises: d4a7e2c9f1b6
+Create Date: 2026-10-20 00:26:51.904173
+
+Postgres only: vacation_requests becomes a table partitioned by range of
+start_date, with one partition per year from the first request up to next
+year and a default partition for the rest (see app/core/partitions.py).
+The primary key becomes (id, start_date), as Postgres requires the partition
+key in it; ids still come from the same sequence. Other databases are left
+as they are.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6c8d1a3e5'
+down_revision: Union[str, None] = 'd4a7e2c9f1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def add_keys_and_indexes(primary_key) -> None:
+    op.create_primary_key('vacation_requests_pkey', 'vacation_requests', primary_key)
+    op.create_foreign_key('vacation_requests_user_id_fkey', 'vacation_requests', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('vacation_requests_type_id_fkey', 'vacation_requests', 'vacation_types', ['type_id'], ['id'])
+    op.create_foreign_key('vacation_requests_reviewer_id_fkey', 'vacation_requests', 'users', ['reviewer_id'], ['id'])
+    op.create_index('ix_vacation_requests_id', 'vacation_requests', ['id'], unique=False)
+    op.create_index('ix_vacation_requests_status', 'vacation_requests', ['status'], unique=False)
+    op.create_index(
+        'ix_vacation_requests_pending_user_id',
+        'vacation_requests',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index('ix_vacation_requests_start_date_end_date', 'vacation_requests', ['start_date', 'end_date'], unique=False)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE vacation_requests RENAME TO vacation_requests_unpartitioned")
+    op.execute("ALTER SEQUENCE vacation_requests_id_seq OWNED BY NONE")
+    op.execute(
+        "CREATE TABLE vacation_requests (LIKE vacation_requests_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (start_date)"
+    )
+
+    this_year = date.today().year
+    first = bind.execute(sa.text("SELECT min(start_date) FROM vacation_requests_unpartitioned")).scalar()
+    for year in range(min(first.year, this_year) if first else this_year, this_year + 2):
+        op.execute(
+            f"CREATE TABLE vacation_requests_y{year} PARTITION OF vacation_requests "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    op.execute("CREATE TABLE vacation_requests_default PARTITION OF vacation_requests DEFAULT")
+
+    op.execute("INSERT INTO vacation_requests SELECT * FROM vacation_requests_unpartitioned")
+    op.execute("DROP TABLE vacation_requests_unpartitioned")
+    op.execute("ALTER SEQUENCE vacation_requests_id_seq OWNED BY vacation_requests.id")
+    add_keys_and_indexes(['id', 'start_date'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE TABLE vacation_requests_unpartitioned (LIKE vacation_requests INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO vacation_requests_unpartitioned SELECT * FROM vacation_requests")
+    op.execute("ALTER SEQUENCE vacation_requests_id_seq OWNED BY NONE")
+    # Takes every partition with it
+    op.execute("DROP TABLE vacation_requests")
+    op.execute("ALTER TABLE vacation_requests_unpartitioned RENAME TO vacation_requests")
+    op.execute("ALTER SEQUENCE vacation_requests_id_seq OWNED BY vacation_requests.id")
+    add_keys_and_indexes(['id'])
@@ -1,7 +1,9 @@
+import time
+from dataclasses import dataclass
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import ExpiredSignatureError, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -9,7 +11,8 @@ from sqlalchemy import select
 from app import models, schemas
 from app.core import security
 from app.core.config import settings
-from app.database import get_db
+from app.core.revocation import revocations
+from app.database import AsyncSessionLocal, get_db
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -17,32 +20,84 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 from sqlalchemy.orm import selectinload
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> models.User:
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as described by their access token."""
+    id: int
+    role: str
+    # From the same token, for connections that outlive the request (see still_valid)
+    token_expires_at: Optional[int] = None
+    token_version: int = 0
+
+    def still_valid(self) -> bool:
+        """False once the token this came from has expired or been revoked."""
+        if self.token_expires_at is not None and time.time() >= self.token_expires_at:
+            return False
+        return not revocations.is_revoked(self.id, self.token_version)
+
+def _unauthorized(detail: str) -> HTTPException:
+    # 401 tells clients to refresh their access token and retry
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def principal_from_token(db: AsyncSession, token: str) -> Principal:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = schemas.TokenPayload(**payload)
+        token_data = security.read_token(token)
+    except ExpiredSignatureError:
+        raise _unauthorized("Token has expired")
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    
+    if token_data.type != security.ACCESS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
     if token_data.sub is None:
          raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
+    user_id = int(token_data.sub)
+    if revocations.is_revoked(user_id, token_data.ver):
+        raise _unauthorized("Token has been revoked")
+    if token_data.role is not None:
+        return Principal(
+            id=user_id, role=token_data.role, token_expires_at=token_data.exp, token_version=token_data.ver
+        )
+
+    # Tokens issued before roles were embedded: look the user up once more
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return Principal(id=user.id, role=user.role, token_expires_at=token_data.exp, token_version=token_data.ver)
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> Principal:
+    """Authenticate from the token alone; use when the endpoint needs only id and role."""
+    return await principal_from_token(db, token)
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> models.User:
+    principal = await principal_from_token(db, token)
+
     # In async sqlalchemy we need to execute the query
     result = await db.execute(
         select(models.User)
         .options(selectinload(models.User.approvers))
-        .where(models.User.id == int(token_data.sub))
+        .where(models.User.id == principal.id)
     )
     user = result.scalars().first()
     
@@ -52,9 +107,29 @@ async def get_current_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
+
+async def get_current_principal_for_stream(
+    header_token: Optional[str] = Depends(optional_oauth2),
+    token: Optional[str] = Query(None, description="Access token, for clients like EventSource that cannot set headers"),
+) -> Principal:
+    if not (header_token or token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Not Depends(get_db): that session would stay open, pinning a pool
+    # connection, for as long as the stream runs. This one is closed before
+    # the stream starts, and only connects at all for legacy tokens.
+    async with AsyncSessionLocal() as db:
+        return await principal_from_token(db, header_token or token)
+
 async def get_current_active_admin(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
@@ -62,8 +137,8 @@ async def get_current_active_admin(
     return current_user
 
 async def get_current_active_manager_or_admin(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role not in ["manager", "admin"]:
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
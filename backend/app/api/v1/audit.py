@@ -0,0 +1,48 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app import models, schemas
+from app.api import deps
+from app.database import get_db
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.AuditPage)
+async def read_audit_events(
+    db: AsyncSession = Depends(get_db),
+    entity_type: Optional[str] = Query(None, description="e.g. vacation_requests or users"),
+    entity_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    action: Optional[str] = None,
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Audit trail, newest first. Only for Admin.
+
+    Pages are keyed on the event id rather than an offset, so deep pages cost
+    the same as the first one and new events never shift a page.
+    """
+    query = select(models.AuditEvent)
+    if entity_type is not None:
+        query = query.where(models.AuditEvent.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.where(models.AuditEvent.entity_id == entity_id)
+    if actor_id is not None:
+        query = query.where(models.AuditEvent.actor_id == actor_id)
+    if action is not None:
+        query = query.where(models.AuditEvent.action == action)
+    if cursor is not None:
+        query = query.where(models.AuditEvent.id < cursor)
+
+    result = await db.execute(query.order_by(models.AuditEvent.id.desc()).limit(limit + 1))
+    events = result.scalars().all()
+    has_more = len(events) > limit
+    events = events[:limit]
+    return schemas.AuditPage(
+        items=events,
+        next_cursor=events[-1].id if has_more else None,
+    )
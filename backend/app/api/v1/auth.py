@@ -1,13 +1,15 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, update
+from jose import JWTError
 
 from app import models, schemas
 from app.api import deps
-from app.core import security
+from app.core import rate_limit, security
+from app.core.revocation import bump_token_version, revocations
 from app.core.config import settings
 from app.database import get_db
 
@@ -24,6 +26,12 @@ async def login_access_token(
     # 1. Fetch user by email
     email = form_data.username.strip()
     print(f"Login attempt for: '{email}'")
+
+    # Per-account budget, so a botnet spread over many IPs can't hammer one account
+    decision = await rate_limit.login_accounts.hit(email.lower())
+    if not decision.allowed:
+        raise rate_limit.too_many_requests(decision)
+
     result = await db.execute(select(models.User).where(models.User.email == email))
     user = result.scalars().first()
 
@@ -35,7 +43,8 @@ async def login_access_token(
             detail="Incorrect email or password",
         )
     
-    if not security.verify_password(form_data.password, user.password_hash):
+    valid, new_hash = await security.verify_and_update_password_async(form_data.password, user.password_hash)
+    if not valid:
         print(f"Password mismatch for: {email}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,15 +55,85 @@ async def login_access_token(
          print(f"User inactive: {email}")
          raise HTTPException(status_code=400, detail="Inactive user")
 
+    if new_hash:
+        # Stored with an outdated scheme or cost; committed with the refresh token below
+        user.password_hash = new_hash
+
+
+    return await issue_tokens(db, user)
+
+async def issue_tokens(db: AsyncSession, user: models.User) -> dict:
+    """A new access token plus a single-use refresh token (recorded for rotation)."""
+    refresh_token, jti, expires_at = security.create_refresh_token(user.id, version=user.token_version)
+    # Keep the table small: drop this user's refresh tokens that can no longer be used
+    await db.execute(
+        delete(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user.id)
+        .where(models.RefreshToken.expires_at < datetime.utcnow())
+    )
+    db.add(models.RefreshToken(jti=jti, user_id=user.id, expires_at=expires_at))
+    await db.commit()
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id, expires_delta=access_token_expires, role=user.role, version=user.token_version
         ),
         "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": int(access_token_expires.total_seconds()),
     }
 
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh_access_token(
+    token_in: schemas.TokenRefresh,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    Each refresh token works once; presenting a used one again signs the user
+    out everywhere, since it means the token was copied.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = security.decode_token(token_in.refresh_token)
+    except JWTError:
+        raise invalid
+    if payload.get("type") != security.REFRESH or "jti" not in payload:
+        raise invalid
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise invalid
+
+    stored = await db.get(models.RefreshToken, payload["jti"])
+    user = await db.get(models.User, user_id)
+    if stored is None or user is None or stored.user_id != user.id:
+        raise invalid
+
+    # Claim the token in one statement: of two concurrent refreshes with the
+    # same token, the second waits for the first and then matches no row
+    claimed = await db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.jti == stored.jti)
+        .where(models.RefreshToken.used_at.is_(None))
+        .values(used_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount == 0:
+        bump_token_version(user)
+        await db.commit()
+        revocations.revoke(user.id, user.token_version)
+        raise invalid
+    if not user.is_active or payload.get("ver", 0) != user.token_version:
+        raise invalid
+
+    return await issue_tokens(db, user)
+
 @router.get("/me", response_model=schemas.User)
 async def read_users_me(
     current_user: models.User = Depends(deps.get_current_user),
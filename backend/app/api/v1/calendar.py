@@ -3,11 +3,15 @@ from datetime import date
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
 
 from app import models, schemas
 from app.api import deps
+from app.core.partitions import overlapping
+from app.core.type_registry import type_registry
 from app.database import get_db
+from app.utils.dates import business_day_mask, daily_quarters, is_counted
+from app.utils.org_tree import subtree_ids
+from app.utils.units import QUARTERS_PER_DAY, to_days
 
 router = APIRouter()
 
@@ -16,25 +20,34 @@ async def read_calendar(
     db: AsyncSession = Depends(get_db),
     start_date: date = Query(...),
     end_date: date = Query(...),
-    current_user: models.User = Depends(deps.get_current_user),
+    manager_id: Optional[int] = None,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Retrieve calendar entries.
+
+    manager_id narrows the calendar to everyone below that manager (recursively),
+    not the manager themselves, as in the request list and usage report.
     """
-    # Find requests that overlap with the range and are approved
-    query = select(models.VacationRequest).options(
-        selectinload(models.VacationRequest.vacation_type),
-        selectinload(models.VacationRequest.user)
+    # Find requests that overlap with the range and are approved, with their
+    # owners' names joined in (one query, no per-user lookup)
+    query = select(models.VacationRequest, models.User.name).join(
+        models.User, models.User.id == models.VacationRequest.user_id
     ).where(
         and_(
             models.VacationRequest.status == "approved",
-            models.VacationRequest.start_date <= end_date,
-            models.VacationRequest.end_date >= start_date
+            # Only reads the partitions of the years involved
+            overlapping(models.VacationRequest, start_date, end_date)
         )
     )
+    if manager_id is not None:
+        query = query.where(
+            models.VacationRequest.user_id.in_(subtree_ids(manager_id))
+        )
     
     result = await db.execute(query)
-    requests = result.scalars().all()
+    requests = result.all()
+    types = await type_registry.resolve(db, {r.type_id for r, _ in requests})
     
     calendar_entries = []
     
@@ -44,18 +57,24 @@ async def read_calendar(
     
     from datetime import timedelta
     
-    for r in requests:
+    for r, user_name in requests:
+        if r.day_mask is None:
+            # Stored before day masks: whole weekdays
+            mask, per_day = business_day_mask(r.start_date, r.end_date, set()), QUARTERS_PER_DAY
+        else:
+            mask, per_day = r.day_mask, daily_quarters(r.business_quarters, r.day_mask)
         # Loop through days of the request
         current = r.start_date
         while current <= r.end_date:
             if current >= start_date and current <= end_date:
                 calendar_entries.append(schemas.CalendarEntry(
                     user_id=r.user_id,
-                    user_name=r.user.name,
+                    user_name=user_name,
                     date=current,
-                    type_name=r.vacation_type.name,
-                    type_color=r.vacation_type.color,
-                    status=r.status
+                    type_name=types[r.type_id].name,
+                    type_color=types[r.type_id].color,
+                    status=r.status,
+                    days=to_days(per_day) if is_counted(mask, r.start_date, current) else 0,
                 ))
             current += timedelta(days=1)
             
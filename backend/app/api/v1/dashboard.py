@@ -0,0 +1,73 @@
+from typing import Any, Optional
+from datetime import date
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app import models, schemas
+from app.api import deps
+from app.api.v1.requests import map_listing_to_response, pending_listing_query
+from app.api.v1.users import accrued_totals, map_balance_to_response
+from app.core.type_registry import type_registry
+from app.database import get_db
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.Dashboard)
+async def read_dashboard(
+    db: AsyncSession = Depends(get_db),
+    year: Optional[int] = None,
+    limit: int = 20,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Everything the dashboard, approvals and calendar pages need on first paint.
+
+    Replaces the /auth/me + /users/{id}/balance + /requests/ + /vacation-types/ +
+    /holidays/ fan-out with one authenticated call. All queries share this request's
+    session; an AsyncSession cannot run statements concurrently, so they are issued
+    back to back over the same connection instead of via asyncio.gather.
+    """
+    if year is None:
+        year = date.today().year
+
+    balances_result = await db.execute(
+        select(models.VacationBalance)
+        .where(models.VacationBalance.user_id == current_user.id)
+        .where(models.VacationBalance.year == year)
+    )
+    balances = balances_result.scalars().all()
+
+    listing = models.request_list
+    requests_result = await db.execute(
+        select(listing)
+        .where(listing.c.user_id == current_user.id)
+        .order_by(listing.c.start_date.desc())
+        .limit(limit)
+    )
+    own_requests = requests_result.all()
+
+    # Same slice as GET /requests/inbox; explicit approvers may be plain employees
+    pending_result = await db.execute(pending_listing_query(current_user).limit(limit))
+    pending_approvals = pending_result.all()
+
+    # Type names, colors and policies come from the in-memory registry
+    types = await type_registry.resolve(
+        db, {b.type_id for b in balances} | {r.type_id for r in [*own_requests, *pending_approvals]}
+    )
+    totals = await accrued_totals(db, current_user.id, year, balances, types, user=current_user)
+    holidays_result = await db.execute(
+        select(models.PublicHoliday)
+        .where(models.PublicHoliday.year == year)
+        .order_by(models.PublicHoliday.date)
+    )
+
+    return schemas.Dashboard(
+        user=current_user,
+        year=year,
+        balances=[map_balance_to_response(b, types, totals.get(b.id)) for b in balances],
+        requests=[map_listing_to_response(r, types) for r in own_requests],
+        pending_approvals=[map_listing_to_response(r, types) for r in pending_approvals],
+        vacation_types=[t for t in types.values() if t.is_active],
+        holidays=holidays_result.scalars().all(),
+    )
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from app import models
+from app.api import deps
+from app.core.config import settings
+from app.core.events import sse_stream, topics_for_user
+
+router = APIRouter()
+
+@router.get("/", response_class=StreamingResponse)
+async def stream_events(
+    request: Request,
+    current_user: deps.Principal = Depends(deps.get_current_principal_for_stream),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of request changes.
+
+    Everyone receives changes to their own requests and to the requests they
+    review; admins receive every change. Event types: request.created,
+    request.approved, request.rejected, request.cancelled.
+
+    The access token is re-checked at least every heartbeat: once it expires
+    or is revoked the stream sends stream.closed and ends, and the client
+    reconnects with a fresh token.
+    """
+    return StreamingResponse(
+        sse_stream(
+            topics_for_user(current_user.id, current_user.role),
+            request.is_disconnected,
+            settings.EVENTS_HEARTBEAT_SECONDS,
+            still_authorized=current_user.still_valid,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,6 +5,7 @@ from sqlalchemy import select
 
 from app import models, schemas
 from app.api import deps
+from app.core import jobs
 from app.database import get_db
 
 router = APIRouter()
@@ -13,7 +14,7 @@ router = APIRouter()
 async def read_public_holidays(
     db: AsyncSession = Depends(get_db),
     year: int = 2025,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Retrieve public holidays.
@@ -26,10 +27,12 @@ async def create_public_holiday(
     *,
     db: AsyncSession = Depends(get_db),
     holiday_in: schemas.PublicHolidayCreate,
-    current_user: models.User = Depends(deps.get_current_active_admin),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Create new public holiday. Only for Admin.
+
+    Requests overlapping the date are recounted in the background.
     """
     # Check for existing holiday on that date
     result = await db.execute(select(models.PublicHoliday).where(models.PublicHoliday.date == holiday_in.date))
@@ -41,6 +44,8 @@ async def create_public_holiday(
 
     holiday = models.PublicHoliday(**holiday_in.model_dump())
     db.add(holiday)
+    # Requests already covering the date counted it as a business day
+    jobs.enqueue(db, "recount_business_days", {"dates": [holiday.date.isoformat()]})
     await db.commit()
     await db.refresh(holiday)
     return holiday
@@ -0,0 +1,158 @@
+from typing import Any, Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, extract
+
+from app import models, schemas
+from app.api import deps
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database import get_db
+from app.utils.org_tree import subtree_ids, is_in_subtree_query
+from app.utils.units import to_days
+
+router = APIRouter()
+
+# Finished reports keyed by (year, manager_id). Cleared by this process's own
+# approvals, cancellations and manager changes; the TTL is the real bound for
+# everything else: other web processes and background jobs (app.tasks).
+usage_report_cache = TTLCache(maxsize=256, ttl=settings.REPORT_CACHE_TTL_SECONDS)
+
+def invalidate_usage_reports() -> None:
+    usage_report_cache.clear()
+
+def usage_days(total_quarters: int, used_quarters: int) -> dict:
+    """Sums are taken in quarter-days; days only at the end, so they add up exactly."""
+    return {
+        "total_days": to_days(total_quarters),
+        "used_days": to_days(used_quarters),
+        "remaining_days": to_days(total_quarters - used_quarters),
+    }
+
+@router.get("/usage", response_model=schemas.UsageReport)
+async def read_usage_report(
+    db: AsyncSession = Depends(get_db),
+    year: Optional[int] = None,
+    manager_id: Optional[int] = None,
+    current_user: deps.Principal = Depends(deps.get_current_active_manager_or_admin),
+) -> Any:
+    """
+    Days used/remaining per user and vacation type, totals per type and usage per month.
+
+    Managers get their own subtree (or a subtree inside it); admins get the whole
+    company unless manager_id narrows it down; subtrees are resolved through the
+    user_closure table. Totals come from vacation_balances, which approve/cancel
+    already keep up to date, so only the monthly breakdown has to touch
+    vacation_requests. Requests count towards the month they start in.
+    """
+    if year is None:
+        year = date.today().year
+
+    if current_user.role != "admin":
+        if manager_id is not None and manager_id != current_user.id:
+            result = await db.execute(is_in_subtree_query(current_user.id, manager_id))
+            if result.first() is None:
+                raise HTTPException(status_code=403, detail="Not enough permissions")
+        else:
+            manager_id = current_user.id
+
+    cache_key = (year, manager_id)
+    cached = usage_report_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    def scoped(query, user_id_column):
+        if manager_id is None:
+            return query
+        return query.where(user_id_column.in_(subtree_ids(manager_id)))
+
+    balance_columns = (
+        models.VacationType.id.label("type_id"),
+        models.VacationType.name.label("type_name"),
+    )
+
+    users_query = scoped(
+        select(
+            models.User.id.label("user_id"),
+            models.User.name.label("user_name"),
+            models.User.manager_id,
+            *balance_columns,
+            models.VacationBalance.total_quarters,
+            models.VacationBalance.used_quarters,
+        )
+        .join(models.VacationBalance, models.VacationBalance.user_id == models.User.id)
+        .join(models.VacationType, models.VacationType.id == models.VacationBalance.type_id)
+        .where(models.VacationBalance.year == year)
+        .order_by(models.User.name, models.VacationType.id),
+        models.User.id,
+    )
+
+    by_type_query = scoped(
+        select(
+            *balance_columns,
+            func.sum(models.VacationBalance.total_quarters).label("total_quarters"),
+            func.sum(models.VacationBalance.used_quarters).label("used_quarters"),
+        )
+        .join(models.VacationType, models.VacationType.id == models.VacationBalance.type_id)
+        .where(models.VacationBalance.year == year)
+        .group_by(models.VacationType.id, models.VacationType.name)
+        .order_by(models.VacationType.id),
+        models.VacationBalance.user_id,
+    )
+
+    month = extract("month", models.VacationRequest.start_date)
+    by_month_query = scoped(
+        select(
+            month.label("month"),
+            models.VacationType.id.label("type_id"),
+            models.VacationType.name.label("type_name"),
+            func.sum(models.VacationRequest.business_quarters).label("used_quarters"),
+        )
+        .join(models.VacationType, models.VacationType.id == models.VacationRequest.type_id)
+        .where(models.VacationRequest.status == "approved")
+        .where(models.VacationRequest.start_date >= date(year, 1, 1))
+        .where(models.VacationRequest.start_date <= date(year, 12, 31))
+        .group_by(month, models.VacationType.id, models.VacationType.name)
+        .order_by(month, models.VacationType.id),
+        models.VacationRequest.user_id,
+    )
+
+    users_rows = (await db.execute(users_query)).all()
+    by_type_rows = (await db.execute(by_type_query)).all()
+    by_month_rows = (await db.execute(by_month_query)).all()
+
+    report = schemas.UsageReport(
+        year=year,
+        manager_id=manager_id,
+        users=[
+            schemas.UserUsage(
+                user_id=row.user_id,
+                user_name=row.user_name,
+                manager_id=row.manager_id,
+                type_id=row.type_id,
+                type_name=row.type_name,
+                **usage_days(row.total_quarters, row.used_quarters),
+            )
+            for row in users_rows
+        ],
+        by_type=[
+            schemas.TypeUsage(
+                type_id=row.type_id,
+                type_name=row.type_name,
+                **usage_days(row.total_quarters, row.used_quarters),
+            )
+            for row in by_type_rows
+        ],
+        by_month=[
+            schemas.MonthUsage(
+                month=int(row.month),
+                type_id=row.type_id,
+                type_name=row.type_name,
+                used_days=to_days(row.used_quarters),
+            )
+            for row in by_month_rows
+        ],
+    )
+    usage_report_cache.set(cache_key, report)
+    return report
@@ -1,29 +1,57 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from datetime import date, datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, union
 from sqlalchemy.orm import selectinload
 
 from app import models, schemas
 from app.api import deps
+from app.api.v1.reports import invalidate_usage_reports
+from app.core import audit, events, jobs
+from app.core.config import settings
+from app.core.partitions import MAX_REQUEST_DAYS
+from app.core.type_registry import type_registry
 from app.database import get_db
-from app.utils.dates import calculate_business_days
+from app.utils.dates import business_day_mask, count_business_days
+from app.utils.units import QUARTERS_PER_DAY, hours_to_quarters, to_days
+from app.utils.org_tree import subtree_ids
 
 router = APIRouter()
 
+REQUEST_CREATE_FIELDS = ("type_id", "start_date", "end_date", "business_quarters", "comment", "status")
+REQUEST_REVIEW_FIELDS = ("status", "reviewer_id", "reviewed_at")
+
 @router.post("/", response_model=schemas.VacationRequestResponse)
 async def create_vacation_request(
     *,
     db: AsyncSession = Depends(get_db),
     request_in: schemas.VacationRequestCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Create new vacation request.
     """
     if request_in.end_date < request_in.start_date:
         raise HTTPException(status_code=400, detail="End date cannot be before start date")
+    if (request_in.end_date - request_in.start_date).days >= MAX_REQUEST_DAYS:
+        raise HTTPException(status_code=400, detail=f"Requests cannot be longer than {MAX_REQUEST_DAYS} days")
+
+    vacation_type = await type_registry.get(db, request_in.type_id)
+    if vacation_type is None or not vacation_type.is_active:
+        raise HTTPException(status_code=400, detail="Unknown or inactive vacation type")
+
+    quarters_per_day = QUARTERS_PER_DAY
+    if request_in.hours is not None:
+        if request_in.end_date != request_in.start_date:
+            raise HTTPException(status_code=400, detail="Hourly leave must start and end on the same day")
+        try:
+            quarters_per_day = hours_to_quarters(request_in.hours, settings.WORKDAY_HOURS)
+        except ValueError:
+            step = settings.WORKDAY_HOURS / QUARTERS_PER_DAY
+            raise HTTPException(status_code=400, detail=f"Hours must be a multiple of {step:g}")
+        if not 0 < quarters_per_day <= QUARTERS_PER_DAY:
+            raise HTTPException(status_code=400, detail=f"Hours must be between 0 and {settings.WORKDAY_HOURS}")
     
     # 1. Calculate business days
     holidays_result = await db.execute(
@@ -33,7 +61,8 @@ async def create_vacation_request(
     )
     holidays_set = set(holidays_result.scalars().all())
     
-    business_days = calculate_business_days(request_in.start_date, request_in.end_date, holidays_set)
+    day_mask = business_day_mask(request_in.start_date, request_in.end_date, holidays_set)
+    business_quarters = count_business_days(day_mask) * quarters_per_day
     
     # 2. Check balance if needed
     # (Simplified for now, skipping strict balance check for MVP speed, but normally we'd check here)
@@ -44,43 +73,40 @@ async def create_vacation_request(
         type_id=request_in.type_id,
         start_date=request_in.start_date,
         end_date=request_in.end_date,
-        business_days=business_days,
+        business_quarters=business_quarters,
+        day_mask=day_mask,
         comment=request_in.comment,
         status="pending"
     )
     db.add(db_request)
+    audit.record(db, current_user, "request.created", db_request, REQUEST_CREATE_FIELDS)
+    await db.flush()
+    jobs.enqueue(db, "notify_request", {"request_id": db_request.id, "event": "created"})
     await db.commit()
-    await db.refresh(db_request)
     
-    # Reload for response with relations
-    result = await db.execute(
-        select(models.VacationRequest)
-        .options(selectinload(models.VacationRequest.vacation_type), selectinload(models.VacationRequest.user))
-        .where(models.VacationRequest.id == db_request.id)
-    )
-    loaded_request = result.scalars().first()
-    
-    # Construct response manually to handle relations gracefully or use schema configs
-    return map_request_to_response(loaded_request)
+    response, owner = await load_response(db, db_request.id)
+    await events.publish_request_event("request.created", response, owner)
+    return response
 
 @router.get("/", response_model=List[schemas.VacationRequestResponse])
 async def read_requests(
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    manager_id: Optional[int] = None,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Retrieve requests.
+
+    manager_id narrows the list to everyone below that manager (recursively),
+    not the manager themselves, as in the calendar and usage report.
     """
-    query = select(models.VacationRequest).options(
-        selectinload(models.VacationRequest.vacation_type),
-        selectinload(models.VacationRequest.user),
-        selectinload(models.VacationRequest.reviewer)
-    )
+    listing = models.request_list
+    query = select(listing).order_by(listing.c.id)
     
     if current_user.role == "employee":
-        query = query.where(models.VacationRequest.user_id == current_user.id)
+        query = query.where(listing.c.user_id == current_user.id)
     elif current_user.role == "manager":
          # see own + direct reports
          # This is a bit complex in SQL, for simplicity let's fetch all for now or filter in app
@@ -88,20 +114,76 @@ async def read_requests(
          # We need to join user to do that
          # query = query.join(models.User).where(or_(models.VacationRequest.user_id == current_user.id, models.User.manager_id == current_user.id))
          pass
+
+    if manager_id is not None:
+        query = query.where(listing.c.user_id.in_(subtree_ids(manager_id)))
          
     result = await db.execute(query.offset(skip).limit(limit))
-    requests = result.scalars().all()
+    rows = result.all()
+    types = await type_registry.resolve(db, {row.type_id for row in rows})
     
-    return [map_request_to_response(r) for r in requests]
+    return [map_listing_to_response(row, types) for row in rows]
+
+def reviewable_user_ids(reviewer_id: int):
+    """Select of user ids whose requests reviewer_id may decide: direct reports and explicit approvees."""
+    return union(
+        select(models.User.id).where(models.User.manager_id == reviewer_id),
+        select(models.user_approvers.c.user_id).where(models.user_approvers.c.approver_id == reviewer_id),
+    )
+
+async def ensure_can_review(db: AsyncSession, current_user: deps.Principal, request: models.VacationRequest) -> None:
+    """Admins review anything; everyone else only their reports' and approvees' requests."""
+    if current_user.role == "admin":
+        return
+    if request.user_id != current_user.id:
+        reviewable = reviewable_user_ids(current_user.id).subquery()
+        result = await db.execute(select(reviewable.c.id).where(reviewable.c.id == request.user_id))
+        if result.first() is not None:
+            return
+    raise HTTPException(status_code=403, detail="Not enough permissions")
+
+def pending_listing_query(current_user: deps.Principal):
+    """request_list rows waiting on current_user, oldest first (the inbox)."""
+    listing = models.request_list
+    query = (
+        select(listing)
+        .where(listing.c.status == "pending")
+        .where(listing.c.user_id != current_user.id)
+        .order_by(listing.c.created_at, listing.c.id)
+    )
+    if current_user.role != "admin":
+        query = query.where(listing.c.user_id.in_(reviewable_user_ids(current_user.id)))
+    return query
+
+@router.get("/inbox", response_model=List[schemas.VacationRequestResponse])
+async def read_inbox(
+    db: AsyncSession = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: deps.Principal = Depends(deps.get_current_principal),
+) -> Any:
+    """
+    Pending requests waiting on the current user.
+
+    Managers and explicit approvers (user_approvers), whatever their role, see
+    the requests they can decide; admins see every pending request; everyone
+    else gets an empty inbox. Read from request_list, served by its partial
+    index on pending requests.
+    """
+    result = await db.execute(pending_listing_query(current_user).offset(skip).limit(limit))
+    rows = result.all()
+    types = await type_registry.resolve(db, {row.type_id for row in rows})
+    return [map_listing_to_response(row, types) for row in rows]
 
 @router.post("/{request_id}/approve", response_model=schemas.VacationRequestResponse)
 async def approve_request(
     request_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(deps.get_current_active_manager_or_admin),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
-    Approve value request.
+    Approve a vacation request. Open to its owner's manager, their explicit
+    approvers (whatever their role) and admins; see ensure_can_review.
     """
     result = await db.execute(select(models.VacationRequest).where(models.VacationRequest.id == request_id))
     request = result.scalars().first()
@@ -111,12 +193,14 @@ async def approve_request(
     if request.status != "pending":
         raise HTTPException(status_code=400, detail="Request is not pending")
         
-    # Check permissions (manager of user or admin)
-    # Ideally should fetch request user and check manager_id
+    # Check permissions (manager of user, explicit approver or admin)
+    await ensure_can_review(db, current_user, request)
     
     request.status = "approved"
     request.reviewer_id = current_user.id
     request.reviewed_at = datetime.utcnow()
+    # Before any query autoflushes the change away
+    audit.record(db, current_user, "request.approved", request, REQUEST_REVIEW_FIELDS)
     
     # Update Balance
     balance_result = await db.execute(
@@ -128,30 +212,26 @@ async def approve_request(
     balance = balance_result.scalars().first()
     
     if balance:
-        balance.used_days += request.business_days
+        balance.used_quarters += request.business_quarters
         db.add(balance)
     
     db.add(request)
+    jobs.enqueue(db, "notify_request", {"request_id": request.id, "event": "approved"})
     await db.commit()
-    await db.refresh(request)
+    invalidate_usage_reports()
     
-    # Reload for response
-    result = await db.execute(
-        select(models.VacationRequest)
-        .options(selectinload(models.VacationRequest.vacation_type), selectinload(models.VacationRequest.user), selectinload(models.VacationRequest.reviewer))
-        .where(models.VacationRequest.id == request_id)
-    )
-    loaded_request = result.scalars().first()
-    return map_request_to_response(loaded_request)
+    response, owner = await load_response(db, request_id)
+    await events.publish_request_event("request.approved", response, owner)
+    return response
 
 @router.post("/{request_id}/reject", response_model=schemas.VacationRequestResponse)
 async def reject_request(
     request_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(deps.get_current_active_manager_or_admin),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
-    Reject vacation request.
+    Reject a vacation request. Same reviewers as approve.
     """
     result = await db.execute(select(models.VacationRequest).where(models.VacationRequest.id == request_id))
     request = result.scalars().first()
@@ -160,29 +240,27 @@ async def reject_request(
         
     if request.status != "pending":
         raise HTTPException(status_code=400, detail="Request is not pending")
+
+    await ensure_can_review(db, current_user, request)
     
     request.status = "rejected"
     request.reviewer_id = current_user.id
     request.reviewed_at = datetime.utcnow()
+    audit.record(db, current_user, "request.rejected", request, REQUEST_REVIEW_FIELDS)
     
     db.add(request)
+    jobs.enqueue(db, "notify_request", {"request_id": request.id, "event": "rejected"})
     await db.commit()
-    await db.refresh(request)
     
-    # Reload for response
-    result = await db.execute(
-        select(models.VacationRequest)
-        .options(selectinload(models.VacationRequest.vacation_type), selectinload(models.VacationRequest.user), selectinload(models.VacationRequest.reviewer))
-        .where(models.VacationRequest.id == request_id)
-    )
-    loaded_request = result.scalars().first()
-    return map_request_to_response(loaded_request)
+    response, owner = await load_response(db, request_id)
+    await events.publish_request_event("request.rejected", response, owner)
+    return response
 
 @router.post("/{request_id}/cancel", response_model=schemas.VacationRequestResponse)
 async def cancel_request(
     request_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Cancel own vacation request.
@@ -208,39 +286,55 @@ async def cancel_request(
         )
         balance = balance_result.scalars().first()
         if balance:
-            balance.used_days -= request.business_days
+            balance.used_quarters -= request.business_quarters
             db.add(balance)
     
     request.status = "cancelled"
     db.add(request)
+    audit.record(db, current_user, "request.cancelled", request, REQUEST_REVIEW_FIELDS)
     await db.commit()
-    await db.refresh(request)
+    invalidate_usage_reports()
     
-    # Reload for response
+    response, owner = await load_response(db, request_id)
+    await events.publish_request_event("request.cancelled", response, owner)
+    return response
+
+async def load_response(db: AsyncSession, request_id: int):
+    """
+    A request as returned after a change, read from its request_list row, and
+    its owner with approvers (for events.publish_request_event).
+    """
+    listing = models.request_list
+    result = await db.execute(select(listing).where(listing.c.id == request_id))
+    row = result.one()
     result = await db.execute(
-        select(models.VacationRequest)
-        .options(selectinload(models.VacationRequest.vacation_type), selectinload(models.VacationRequest.user), selectinload(models.VacationRequest.reviewer))
-        .where(models.VacationRequest.id == request_id)
+        select(models.User).options(selectinload(models.User.approvers)).where(models.User.id == row.user_id)
     )
-    loaded_request = result.scalars().first()
-    return map_request_to_response(loaded_request)
+    owner = result.scalars().one()
+    types = await type_registry.resolve(db, (row.type_id,))
+    return map_listing_to_response(row, types), owner
 
-def map_request_to_response(r):
+def map_listing_to_response(row, types):
+    """
+    A request_list row (app.core.listing) as a response. types: the type
+    registry's mapping (app.core.type_registry), holding row.type_id.
+    """
+    vacation_type = types[row.type_id]
     return schemas.VacationRequestResponse(
-        id=r.id,
-        user_id=r.user_id,
-        user_name=r.user.name,
-        type_id=r.type_id,
-        type_name=r.vacation_type.name,
-        type_color=r.vacation_type.color,
-        start_date=r.start_date,
-        end_date=r.end_date,
-        business_days=r.business_days,
-        status=r.status,
-        comment=r.comment,
-        reviewer_id=r.reviewer_id,
-        reviewer_name=r.reviewer.name if r.reviewer else None,
-        reviewer_comment=r.reviewer_comment,
-        reviewed_at=r.reviewed_at,
-        created_at=r.created_at
+        id=row.id,
+        user_id=row.user_id,
+        user_name=row.user_name,
+        type_id=row.type_id,
+        type_name=vacation_type.name,
+        type_color=vacation_type.color,
+        start_date=row.start_date,
+        end_date=row.end_date,
+        business_days=to_days(row.business_quarters),
+        status=row.status,
+        comment=row.comment,
+        reviewer_id=row.reviewer_id,
+        reviewer_name=row.reviewer_name,
+        reviewer_comment=row.reviewer_comment,
+        reviewed_at=row.reviewed_at,
+        created_at=row.created_at
     )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, users, vacation_types, holidays, requests, calendar
+from app.api.v1 import auth, users, vacation_types, holidays, requests, calendar, dashboard, reports, system, events, audit
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -9,3 +9,8 @@ api_router.include_router(vacation_types.router, prefix="/vacation-types", tags=
 api_router.include_router(holidays.router, prefix="/holidays", tags=["holidays"])
 api_router.include_router(requests.router, prefix="/requests", tags=["requests"])
 api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(audit.router, prefix="/audit", tags=["audit"])
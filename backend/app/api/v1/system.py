@@ -0,0 +1,29 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.api import deps
+from app.core import jobs, rate_limit
+from app.database import get_db
+
+router = APIRouter()
+
+@router.get("/jobs", response_model=schemas.JobQueueStats)
+async def read_job_queue(
+    db: AsyncSession = Depends(get_db),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Background job queue depth. Only for Admin.
+    """
+    return await jobs.queue_stats(db)
+
+@router.get("/rate-limits", response_model=Dict[str, schemas.RateLimitPolicyStats])
+async def read_rate_limits(
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Rate limit budgets and how often they were hit in this process. Only for Admin.
+    """
+    return {limit.name: limit.stats() for limit in rate_limit.limits}
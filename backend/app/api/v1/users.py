@@ -1,24 +1,32 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime
+from datetime import date, datetime
 
 
 from app import models, schemas
 from app.api import deps
-from app.core import security
+from app.api.v1.reports import invalidate_usage_reports
+from app.core import accrual, audit, security, jobs
+from app.core.revocation import bump_token_version, revocations
+from app.core.type_registry import type_registry
 from app.database import get_db
+from app.utils.org_tree import is_in_subtree_query
+from app.utils.units import to_days
 from sqlalchemy.orm import selectinload
 
 router = APIRouter()
 
+# Never the password hash
+AUDITED_USER_FIELDS = ("email", "name", "role", "is_active", "manager_id", "start_date", "approvers")
+
 @router.get("/", response_model=List[schemas.User])
 async def read_users(
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_admin),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Retrieve users. Only for Admin.
@@ -37,7 +45,7 @@ async def create_user(
     *,
     db: AsyncSession = Depends(get_db),
     user_in: schemas.UserCreate,
-    current_user: models.User = Depends(deps.get_current_active_admin),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Create new user. Only for Admin.
@@ -66,37 +74,14 @@ async def create_user(
         user.approvers = list(approvers)
 
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    audit.record(db, current_user, "user.created", user, AUDITED_USER_FIELDS)
+    await db.flush()
 
-    # Initialize Vacation Balances
+    # Initialize Vacation Balances off the request path, committed together with the user
     if user.start_date:
-        result = await db.execute(select(models.VacationType).where(models.VacationType.is_active == True))
-        vacation_types = result.scalars().all()
-        
-        current_year = datetime.utcnow().year
-        
-        for vt in vacation_types:
-            total_days = vt.default_days
-            
-            # Prorate if joined this year
-            if user.start_date.year == current_year:
-                months_remaining = 12 - user.start_date.month + 1
-                if months_remaining < 0: 
-                    months_remaining = 0
-                total_days = round((months_remaining / 12) * vt.default_days)
-            elif user.start_date.year > current_year:
-                 total_days = 0 
-           
-            balance = models.VacationBalance(
-                user_id=user.id,
-                type_id=vt.id,
-                year=current_year,
-                total_days=total_days,
-                used_days=0
-            )
-            db.add(balance)
-        await db.commit()
+        jobs.enqueue(db, "initialize_balances", {"user_id": user.id, "year": datetime.utcnow().year})
+
+    await db.commit()
 
     # Fetch user again with loaded relationships for serialization
     result = await db.execute(
@@ -113,7 +98,7 @@ async def update_user(
     db: AsyncSession = Depends(get_db),
     user_id: int,
     user_in: schemas.UserUpdate,
-    current_user: models.User = Depends(deps.get_current_active_admin),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Update a user.
@@ -127,6 +112,14 @@ async def update_user(
         )
 
     update_data = user_in.dict(exclude_unset=True)
+    if update_data.get("manager_id") is not None:
+        # The new manager must not be the user or anyone reporting to them
+        result = await db.execute(is_in_subtree_query(user.id, update_data["manager_id"]))
+        if update_data["manager_id"] == user.id or result.first() is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="A user cannot report to themselves or to someone in their own team",
+            )
     if "approver_ids" in update_data:
         approver_ids = update_data.pop("approver_ids")
         if approver_ids is not None:
@@ -136,12 +129,23 @@ async def update_user(
         else:
              user.approvers = []
         
+    was = (user.role, user.is_active)
+    moved = "manager_id" in update_data and update_data["manager_id"] != user.manager_id
     for field, value in update_data.items():
         setattr(user, field, value)
+    # Role and active state are baked into tokens: make existing ones stop working
+    revoke = (user.role, user.is_active) != was
 
     db.add(user)
+    audit.record(db, current_user, "user.updated", user, AUDITED_USER_FIELDS)
+    if revoke:
+        bump_token_version(user)
     await db.commit()
-    await db.refresh(user)
+    if revoke:
+        revocations.revoke(user.id, user.token_version)
+    if moved:
+        # Reports are cached per manager subtree, and this one just changed
+        invalidate_usage_reports()
     
     # Fetch user again with loaded relationships for serialization
     result = await db.execute(
@@ -157,7 +161,7 @@ async def delete_user(
     *,
     db: AsyncSession = Depends(get_db),
     user_id: int,
-    current_user: models.User = Depends(deps.get_current_active_admin),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Soft delete a user.
@@ -171,8 +175,10 @@ async def delete_user(
         )
     user.is_active = False
     db.add(user)
+    audit.record(db, current_user, "user.deactivated", user, ("is_active",))
+    bump_token_version(user)
     await db.commit()
-    await db.refresh(user)
+    revocations.revoke(user.id, user.token_version)
     
     # Fetch user again with loaded relationships for serialization
     result = await db.execute(
@@ -188,31 +194,58 @@ async def read_user_balance(
     user_id: int,
     year: int = 2025,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Get user vacation balance.
+
+    Types that accrue monthly report what is earned as of today, even before
+    the monthly accrual job has stored it.
     """
     if current_user.id != user_id and current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=400, detail="Not enough permissions")
         
     result = await db.execute(
         select(models.VacationBalance)
-        .options(selectinload(models.VacationBalance.vacation_type))
         .where(models.VacationBalance.user_id == user_id)
         .where(models.VacationBalance.year == year)
     )
     balances = result.scalars().all()
-    
-    response = []
-    for b in balances:
-        response.append(schemas.VacationBalanceResponse(
-            id=b.id,
-            type_id=b.type_id,
-            type_name=b.vacation_type.name,
-            year=b.year,
-            total_days=b.total_days,
-            used_days=b.used_days,
-            remaining_days=b.total_days - b.used_days
-        ))
-    return response
+    types = await type_registry.resolve(db, {b.type_id for b in balances})
+
+    totals = await accrued_totals(db, user_id, year, balances, types)
+    return [map_balance_to_response(b, types, totals.get(b.id)) for b in balances]
+
+async def accrued_totals(db: AsyncSession, user_id: int, year: int, balances, types, user=None) -> Dict[int, int]:
+    """
+    Entitlement as of today, in quarter-days by balance id, for the balances
+    whose type accrues monthly. types: the type registry's mapping.
+    """
+    accruing = [b for b in balances if types[b.type_id].accrual == accrual.MONTHLY]
+    if not accruing:
+        return {}
+    if user is None:
+        user = await db.get(models.User, user_id)
+    result = await db.execute(
+        select(models.VacationBalance)
+        .where(models.VacationBalance.user_id == user_id)
+        .where(models.VacationBalance.year == year - 1)
+    )
+    previous = {b.type_id: b for b in result.scalars().all()}
+    return {
+        b.id: accrual.entitlement_quarters(types[b.type_id], user.start_date, year, date.today(), previous.get(b.type_id))
+        for b in accruing
+    }
+
+def map_balance_to_response(b, types, total_quarters: Optional[int] = None):
+    if total_quarters is None:
+        total_quarters = b.total_quarters
+    return schemas.VacationBalanceResponse(
+        id=b.id,
+        type_id=b.type_id,
+        type_name=types[b.type_id].name,
+        year=b.year,
+        total_days=to_days(total_quarters),
+        used_days=b.used_days,
+        remaining_days=to_days(total_quarters - b.used_quarters)
+    )
@@ -1,10 +1,11 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app import models, schemas
 from app.api import deps
+from app.core import audit
+from app.core.type_registry import type_registry
 from app.database import get_db
 
 router = APIRouter()
@@ -12,20 +13,19 @@ router = APIRouter()
 @router.get("/", response_model=List[schemas.VacationType])
 async def read_vacation_types(
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Retrieve vacation types.
     """
-    result = await db.execute(select(models.VacationType).where(models.VacationType.is_active == True))
-    return result.scalars().all()
+    return await type_registry.active(db)
 
 @router.post("/", response_model=schemas.VacationType)
 async def create_vacation_type(
     *,
     db: AsyncSession = Depends(get_db),
     type_in: schemas.VacationTypeCreate,
-    current_user: models.User = Depends(deps.get_current_active_admin),
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Create new vacation type. Only for Admin.
@@ -35,3 +35,47 @@ async def create_vacation_type(
     await db.commit()
     await db.refresh(vacation_type)
     return vacation_type
+
+@router.put("/{type_id}", response_model=schemas.VacationType)
+async def update_vacation_type(
+    *,
+    db: AsyncSession = Depends(get_db),
+    type_id: int,
+    type_in: schemas.VacationTypeUpdate,
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Update a vacation type. Only for Admin.
+
+    Balances already granted are not recalculated; policy changes apply from
+    the next accrual run.
+    """
+    vacation_type = await db.get(models.VacationType, type_id)
+    if not vacation_type:
+        raise HTTPException(status_code=404, detail="Vacation type not found")
+    changes = type_in.model_dump(exclude_unset=True)
+    for field, value in changes.items():
+        setattr(vacation_type, field, value)
+    audit.record(db, current_user, "vacation_type.updated", vacation_type, changes.keys())
+    await db.commit()
+    return vacation_type
+
+@router.delete("/{type_id}", response_model=schemas.VacationType)
+async def deactivate_vacation_type(
+    *,
+    db: AsyncSession = Depends(get_db),
+    type_id: int,
+    current_user: deps.Principal = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Deactivate a vacation type. Only for Admin.
+
+    Existing requests and balances keep it; it can no longer be requested.
+    """
+    vacation_type = await db.get(models.VacationType, type_id)
+    if not vacation_type:
+        raise HTTPException(status_code=404, detail="Vacation type not found")
+    vacation_type.is_active = False
+    audit.record(db, current_user, "vacation_type.deactivated", vacation_type, ("is_active",))
+    await db.commit()
+    return vacation_type
@@ -0,0 +1,124 @@
+"""
+Leave entitlement per user, vacation type and year, in closed form.
+
+A type's policy is its `accrual` and `carry_over_days`:
+
+* "annual": the year's default_days are granted at once, prorated by month
+  for people who join during the year (the month they join counts).
+* "monthly": default_days / 12 is earned at the start of every month worked,
+  so as of a date the entitlement is default_days * months / 12.
+
+Both add what was left of the previous year, capped at carry_over_days.
+Amounts are quarter-days (app.utils.units), rounded to the nearest quarter.
+
+entitlement_quarters() answers for one balance in Python (read_user_balance
+uses it for monthly types, whose stored total lags until the next batch);
+materialize() writes the same formula for every balance of a year with two
+set-based statements, run monthly by the "accrue_balances" job.
+"""
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Integer, and_, case, cast, exists, extract, func, insert, literal, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app import models
+from app.core.type_registry import VacationTypeInfo
+from app.utils.units import QUARTERS_PER_DAY, prorate, to_quarters
+
+ANNUAL = "annual"
+MONTHLY = "monthly"
+
+
+def months_earned(accrual: str, start_date: Optional[date], year: int, as_of: date) -> int:
+    """Months of `year` counted towards the entitlement as of as_of (0-12)."""
+    if start_date is None or start_date.year < year:
+        first = 1
+    elif start_date.year == year:
+        first = start_date.month
+    else:
+        return 0
+    if as_of.year < year:
+        return 0
+    if accrual == MONTHLY and as_of.year == year:
+        last = as_of.month
+    else:
+        last = 12
+    return max(last - first + 1, 0)
+
+
+def carried_quarters(previous: Optional[models.VacationBalance], carry_over_days: int) -> int:
+    """What was left of the previous year's balance, capped by the type's carry-over."""
+    if previous is None:
+        return 0
+    remaining = (previous.total_quarters or 0) - (previous.used_quarters or 0)
+    return min(max(remaining, 0), to_quarters(carry_over_days))
+
+
+def entitlement_quarters(
+    vacation_type: VacationTypeInfo,
+    start_date: Optional[date],
+    year: int,
+    as_of: date,
+    previous: Optional[models.VacationBalance] = None,
+) -> int:
+    months = months_earned(vacation_type.accrual, start_date, year, as_of)
+    earned = prorate(to_quarters(vacation_type.default_days or 0), months, 12)
+    return earned + carried_quarters(previous, vacation_type.carry_over_days or 0)
+
+
+async def materialize(db: AsyncSession, as_of: date) -> int:
+    """
+    Create missing balances of as_of's year for active users and types, then
+    set every balance of that year to its entitlement as of as_of. Returns the
+    number of balances written. The caller commits.
+    """
+    year = as_of.year
+    users, types, balances = models.User, models.VacationType, models.VacationBalance
+
+    has_balance = exists().where(
+        balances.user_id == users.id, balances.type_id == types.id, balances.year == year
+    )
+    await db.execute(
+        insert(balances).from_select(
+            ["user_id", "type_id", "year", "total_quarters", "used_quarters"],
+            select(users.id, types.id, literal(year), literal(0), literal(0))
+            .join(types, true())
+            .where(users.is_active == True, types.is_active == True)
+            .where(~has_balance),
+        )
+    )
+
+    # months_earned() in SQL
+    first = case(
+        (or_(users.start_date.is_(None), users.start_date < date(year, 1, 1)), 1),
+        (users.start_date <= date(year, 12, 31), cast(extract("month", users.start_date), Integer)),
+        else_=13,
+    )
+    last = case((types.accrual == MONTHLY, as_of.month), else_=12)
+    months = case((last - first + 1 > 0, last - first + 1), else_=0)
+    # prorate(), rounding half up to a whole quarter-day
+    earned = (2 * func.coalesce(types.default_days, 0) * QUARTERS_PER_DAY * months + 12) // 24
+
+    # carried_quarters() in SQL
+    previous = aliased(balances)
+    remaining = func.coalesce(previous.total_quarters, 0) - func.coalesce(previous.used_quarters, 0)
+    cap = func.coalesce(types.carry_over_days, 0) * QUARTERS_PER_DAY
+    carried = (
+        select(case((remaining < 0, 0), (remaining > cap, cap), else_=remaining))
+        .where(
+            previous.user_id == balances.user_id,
+            previous.type_id == balances.type_id,
+            previous.year == year - 1,
+        )
+        .scalar_subquery()
+    )
+
+    result = await db.execute(
+        update(balances)
+        .where(and_(balances.year == year, balances.user_id == users.id, balances.type_id == types.id))
+        .values(total_quarters=earned + func.coalesce(carried, 0))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
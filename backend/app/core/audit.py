@@ -0,0 +1,94 @@
+"""
+Append-only audit trail of request and user changes.
+
+Endpoints call record() next to the mutation; it only computes the diff from
+SQLAlchemy's attribute history and appends it to a per-session buffer. The
+buffer is written as one multi-row INSERT when the transaction commits, so a
+request that changes several things costs one extra statement, and audit rows
+exist if and only if the changes they describe were committed.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.audit import AuditEvent
+
+_BUFFER_KEY = "audit_buffer"
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_jsonable(v) for v in value)
+    if hasattr(value, "__table__"):
+        # Related rows are referenced by id
+        return value.id
+    return value
+
+
+def diff(entity: Any, fields: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """{field: {"old": ..., "new": ...}} for fields changed since the entity was loaded."""
+    state = inspect(entity)
+    changes = {}
+    for field in fields:
+        history = state.attrs[field].history
+        if not history.has_changes():
+            continue
+        if field in state.mapper.relationships and state.mapper.relationships[field].uselist:
+            unchanged = list(history.unchanged)
+            old = unchanged + list(history.deleted)
+            new = unchanged + list(history.added)
+        else:
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+        changes[field] = {"old": _jsonable(old), "new": _jsonable(new)}
+    return changes
+
+
+def record(
+    db: AsyncSession,
+    actor: Optional[Any],
+    action: str,
+    entity: Any,
+    fields: Iterable[str],
+) -> None:
+    """
+    Buffer an audit event for entity's pending changes to `fields`. Call it
+    after mutating and before flushing (flushing resets attribute history).
+    """
+    db.sync_session.info.setdefault(_BUFFER_KEY, []).append({
+        "actor_id": actor.id if actor is not None else None,
+        "action": action,
+        "entity": entity,
+        "changes": diff(entity, fields),
+        "created_at": datetime.utcnow(),
+    })
+
+
+@event.listens_for(Session, "before_commit")
+def _write_buffered_events(session):
+    buffered = session.info.pop(_BUFFER_KEY, None)
+    if not buffered:
+        return
+    # New entities get their ids here
+    session.flush()
+    session.execute(insert(AuditEvent), [
+        {
+            "actor_id": entry["actor_id"],
+            "action": entry["action"],
+            "entity_type": entry["entity"].__tablename__,
+            "entity_id": entry["entity"].id,
+            "changes": entry["changes"],
+            "created_at": entry["created_at"],
+        }
+        for entry in buffered
+    ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_buffered_events(session):
+    session.info.pop(_BUFFER_KEY, None)
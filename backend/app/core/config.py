@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import EmailStr
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
@@ -8,11 +9,75 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Log every SQL statement (development only; costly under load)
+    DB_ECHO: bool = False
+    # Connections per process; gunicorn runs WEB_CONCURRENCY such processes
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30 * 24 * 60 # 30 days
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # How often each process reloads revoked token versions from the database
+    TOKEN_REVOCATION_POLL_SECONDS: float = 5.0
+    # Token verification library: "jose" (python-jose) or "pyjwt" (needs PyJWT installed);
+    # compare them with benchmarks/bench_auth.py on the target machine
+    JWT_BACKEND: str = "jose"
+    # Verified tokens remembered per process (until they expire)
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # Reports
+    REPORT_CACHE_TTL_SECONDS: int = 60
+    # Vacation types kept in memory per process (see app.core.type_registry)
+    VACATION_TYPE_CACHE_TTL_SECONDS: int = 60
+
+    # Background jobs
+    JOBS_RUN_IN_PROCESS: bool = True
+    JOBS_POLL_INTERVAL_SECONDS: float = 5.0
+    JOBS_BATCH_SIZE: int = 20
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_LOCK_TIMEOUT_SECONDS: int = 300
+
+    # Telegram notifications (messages are only logged when no token is set)
+    TELEGRAM_BOT_TOKEN: Optional[str] = None
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
+    NOTIFY_BATCH_WINDOW_SECONDS: float = 2.0
+    NOTIFY_CHAT_INTERVAL_SECONDS: float = 1.0
+    NOTIFY_RATE_PER_SECOND: float = 25.0
+
+    # Live updates (GET /events): "memory" (single process) or "postgres" (LISTEN/NOTIFY)
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Idempotency-Key support on POST/PUT/PATCH
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_CACHE_SIZE: int = 1024
+
+    # Rate limiting: "memory" (per process) or "database" (shared by all workers)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10     # per client IP
+    RATE_LIMIT_ACCOUNT_PER_MINUTE: int = 5    # per login email
+    RATE_LIMIT_READ_PER_MINUTE: int = 600     # GET/HEAD, per user (or IP when anonymous)
+    RATE_LIMIT_WRITE_PER_MINUTE: int = 120    # other methods, per user (or IP)
+    # Use the first X-Forwarded-For address as the client IP (only behind a trusted proxy)
+    RATE_LIMIT_TRUST_PROXY: bool = False
+    # Concurrent bcrypt verifications; further logins wait instead of starving the CPU
+    PASSWORD_HASH_CONCURRENCY: int = 4
+    # Hash for new passwords: a passlib scheme and its cost (None = passlib's default,
+    # 12 for bcrypt). Weaker stored hashes are upgraded on the user's next login.
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_ROUNDS: Optional[int] = None
+    
+
+    # Length of a working day; part-day leave is booked in quarters of it
+    WORKDAY_HOURS: int = 8
+
+    # Startup warmup (GET /ready turns green when it is done)
+    WARMUP_DB_CONNECTIONS: int = 2
+    WARMUP_RETRY_SECONDS: float = 5.0
     
     # Defaults for dev
     model_config = SettingsConfigDict(
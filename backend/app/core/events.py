@@ -0,0 +1,264 @@
+"""
+In-process pub/sub feeding the Server-Sent Events stream (GET /events).
+
+Endpoints publish small JSON events to topics after they commit:
+
+* ``user:{id}``  - changes to that user's own requests
+* ``team:{id}``  - changes to requests that user reviews (manager / explicit approver)
+* ``all``        - every request change (admins)
+
+With EVENTS_BACKEND=postgres every publish goes through NOTIFY on one channel
+and each worker process relays what it LISTENs to its local subscribers, so a
+client connected to worker A sees approvals handled by worker B. The default
+"memory" backend only reaches subscribers in the same process.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "vacation_events"
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", topics: Iterable[str], maxsize: int):
+        self.broker = broker
+        self.topics = set(topics)
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            # Slow consumer: drop the oldest event rather than block publishers
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventBroker:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._fanout: Optional["PostgresFanout"] = None
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(self, topics, self.queue_size)
+        for topic in subscription.topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def subscriber_count(self) -> int:
+        return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+    def publish_local(self, topics: Iterable[str], event: Dict[str, Any]) -> None:
+        """Deliver to this process's subscribers; each subscriber gets an event once."""
+        delivered: Set[Subscription] = set()
+        for topic in topics:
+            for subscription in self._subscribers.get(topic, ()):
+                if subscription not in delivered:
+                    subscription.put(event)
+                    delivered.add(subscription)
+
+    async def publish(self, topics: Iterable[str], event: Dict[str, Any]) -> None:
+        topics = list(topics)
+        if self._fanout is not None:
+            try:
+                await self._fanout.notify(topics, event)
+                return
+            except Exception:
+                logger.exception("NOTIFY failed, delivering locally only")
+        self.publish_local(topics, event)
+
+    async def start(self) -> None:
+        if settings.EVENTS_BACKEND == "postgres" and self._fanout is None:
+            self._fanout = PostgresFanout(self)
+            await self._fanout.start()
+
+    async def stop(self) -> None:
+        if self._fanout is not None:
+            await self._fanout.stop()
+            self._fanout = None
+
+
+class PostgresFanout:
+    """
+    Relays events between API processes through LISTEN/NOTIFY on a dedicated
+    connection. A background task keeps that connection up: it connects with
+    exponential backoff (retry_interval, doubling, capped at max_retry_interval),
+    pings it every ping_interval and reconnects when it is lost. Meanwhile
+    publishes are delivered locally only, and events NOTIFYed by other
+    processes are missed.
+    """
+
+    def __init__(
+        self,
+        broker: EventBroker,
+        *,
+        retry_interval: float = 1.0,
+        max_retry_interval: float = 60.0,
+        ping_interval: float = 30.0,
+    ):
+        self.broker = broker
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.ping_interval = ping_interval
+        self.connection = None
+        self.connected = asyncio.Event()
+        self._lost = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        connection = await asyncpg.connect(dsn)
+        try:
+            await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except Exception:
+            await connection.close()
+            raise
+        connection.add_termination_listener(self._on_termination)
+        self._lost.clear()
+        self.connection = connection
+        self.connected.set()
+
+    def _on_termination(self, connection) -> None:
+        if connection is self.connection:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        connection, self.connection = self.connection, None
+        self.connected.clear()
+        self._lost.set()
+        if connection is not None and not connection.is_closed():
+            connection.terminate()
+
+    async def _ping(self) -> None:
+        try:
+            async with self._lock:
+                await self.connection.execute("SELECT 1")
+        except Exception:
+            logger.warning("LISTEN connection is not answering, reconnecting")
+            self._disconnect()
+
+    async def run(self) -> None:
+        failures = 0
+        while True:
+            if self.connection is None:
+                try:
+                    await self._connect()
+                except Exception:
+                    delay = min(self.retry_interval * 2 ** failures, self.max_retry_interval)
+                    failures += 1
+                    logger.exception("LISTEN connection failed, retrying in %ss", delay)
+                    await asyncio.sleep(delay)
+                    continue
+                if failures:
+                    logger.info("LISTEN connection restored")
+                failures = 0
+            try:
+                await asyncio.wait_for(self._lost.wait(), timeout=self.ping_interval)
+            except asyncio.TimeoutError:
+                await self._ping()
+            else:
+                logger.warning("LISTEN connection lost, reconnecting")
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        message = json.loads(payload)
+        self.broker.publish_local(message["topics"], message["event"])
+
+    async def notify(self, topics: Iterable[str], event: Dict[str, Any]) -> None:
+        if self.connection is None:
+            raise ConnectionError("LISTEN connection is down")
+        payload = json.dumps({"topics": list(topics), "event": event}, default=str)
+        async with self._lock:
+            await self.connection.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, payload)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            self.connected.clear()
+            await connection.close()
+
+
+def topics_for_user(user_id: int, role: str) -> Set[str]:
+    topics = {f"user:{user_id}", f"team:{user_id}"}
+    if role == "admin":
+        topics.add("all")
+    return topics
+
+
+async def publish_request_event(event_type: str, request, owner) -> None:
+    """
+    Publish a request change to its owner, everyone who reviews the owner and admins.
+    `request` is a VacationRequestResponse; `owner` the requesting models.User.
+    """
+    reviewer_ids = {owner.manager_id, *(a.id for a in owner.approvers)} - {None}
+    topics = [f"user:{owner.id}", "all", *(f"team:{reviewer_id}" for reviewer_id in sorted(reviewer_ids))]
+    await broker.publish(topics, {"type": event_type, "request": request.model_dump(mode="json")})
+
+
+async def sse_stream(
+    topics: Iterable[str],
+    is_disconnected,
+    heartbeat: float = 15.0,
+    still_authorized: Optional[Callable[[], bool]] = None,
+) -> AsyncIterator[str]:
+    """
+    Subscribe to topics and format their events as text/event-stream chunks,
+    with keep-alive comments. The subscription lives exactly as long as the stream.
+
+    still_authorized is checked before every event and keep-alive, so at least
+    once per heartbeat; once it fails the stream sends a stream.closed event
+    and ends.
+    """
+    with broker.subscribe(topics) as subscription:
+        yield ": connected\n\n"
+        while not await is_disconnected():
+            event = await subscription.get(timeout=heartbeat)
+            if still_authorized is not None and not still_authorized():
+                yield 'event: stream.closed\ndata: {"reason": "unauthorized"}\n\n'
+                return
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+broker = EventBroker()
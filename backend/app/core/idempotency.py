@@ -0,0 +1,201 @@
+"""
+Idempotency-Key support for mutating endpoints.
+
+A client sends the same `Idempotency-Key` header on every retry of one logical
+operation. The first request reserves the key, runs normally and stores its
+response; retries get the stored response replayed (with an
+`Idempotent-Replayed: true` header) instead of creating a duplicate request or
+failing with "Request is not pending".
+
+Keys are scoped to the caller, kept for IDEMPOTENCY_TTL_SECONDS in the
+idempotency_keys table (shared by all workers) and fronted by a small
+per-process LRU so hot retries don't hit the database.
+
+/auth/* is left out: its responses are credentials, which must not sit in
+plaintext in the table or the LRU, and replaying a refresh would hand out a
+token pair again without the single-use claim of the refresh token.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import subject_from_authorization
+from app.models.idempotency import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+METHODS = {"POST", "PUT", "PATCH"}
+MAX_KEY_LENGTH = 255
+# Responses that depend on who is asking or on timing, not on the request itself
+NOT_STORED = {401, 403, 409, 429}
+# Responses carrying tokens; the key is ignored there
+EXCLUDED_PREFIXES = (f"{settings.API_V1_STR}/auth/",)
+PURGE_INTERVAL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+    def replay(self) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type=self.content_type,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+
+class IdempotencyStore:
+    def __init__(self, session_factory=None, cache_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.cache = TTLCache(
+            maxsize=cache_size or settings.IDEMPOTENCY_CACHE_SIZE,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+        self._last_purge = 0.0
+
+    def _session(self):
+        if self.session_factory is None:
+            from app.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+        return self.session_factory()
+
+    async def reserve(self, scope: str, key: str, fingerprint: str):
+        """
+        Claim the key for a new request. Returns None if claimed, otherwise the
+        existing row (completed or still in progress).
+        """
+        cached = self.cache.get((scope, key))
+        if cached is not None:
+            return cached
+
+        now = datetime.utcnow()
+        async with self._session() as db:
+            existing = await db.get(IdempotencyKey, (scope, key))
+            if existing is not None and existing.expires_at <= now:
+                await db.delete(existing)
+                await db.flush()
+                existing = None
+            if existing is None:
+                db.add(IdempotencyKey(
+                    scope=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+                ))
+                try:
+                    await db.commit()
+                    return None
+                except IntegrityError:
+                    # Lost the race against a concurrent retry
+                    await db.rollback()
+                    existing = await db.get(IdempotencyKey, (scope, key))
+            return self._to_stored(existing)
+
+    def _to_stored(self, row: Optional[IdempotencyKey]):
+        if row is None or row.status_code is None:
+            return row
+        return StoredResponse(row.fingerprint, row.status_code, row.content_type, row.body)
+
+    async def complete(self, scope: str, key: str, stored: StoredResponse) -> None:
+        async with self._session() as db:
+            row = await db.get(IdempotencyKey, (scope, key))
+            if row is None:
+                return
+            row.status_code = stored.status_code
+            row.content_type = stored.content_type
+            row.body = stored.body
+            remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+            if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+            await db.commit()
+        # Never outlive the database row
+        self.cache.set((scope, key), stored, ttl=max(remaining, 0))
+
+    async def release(self, scope: str, key: str) -> None:
+        """Forget a reservation whose request failed, so a retry runs again."""
+        async with self._session() as db:
+            await db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope)
+                .where(IdempotencyKey.key == key)
+                .where(IdempotencyKey.status_code.is_(None))
+            )
+            await db.commit()
+
+
+store = IdempotencyStore()
+
+
+def _scope(request: Request) -> str:
+    subject = subject_from_authorization(request.headers.get("Authorization"))
+    return f"user:{subject}" if subject else "anonymous"
+
+
+def _fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}?{request.url.query}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        key = request.headers.get(HEADER)
+        if key is None or request.method not in METHODS or request.url.path.startswith(EXCLUDED_PREFIXES):
+            return await call_next(request)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JSONResponse(status_code=400, content={"detail": f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters"})
+
+        scope = _scope(request)
+        fingerprint = _fingerprint(request, await request.body())
+        existing = await store.reserve(scope, key, fingerprint)
+        if existing is not None:
+            if existing.fingerprint != fingerprint:
+                return JSONResponse(
+                    status_code=422,
+                    content={"detail": f"{HEADER} was already used for a different request"},
+                )
+            if isinstance(existing, StoredResponse):
+                return existing.replay()
+            return JSONResponse(
+                status_code=409,
+                content={"detail": f"A request with this {HEADER} is still being processed"},
+            )
+
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except Exception:
+            await store.release(scope, key)
+            raise
+
+        if response.status_code >= 500 or response.status_code in NOT_STORED:
+            await store.release(scope, key)
+        else:
+            await store.complete(scope, key, StoredResponse(
+                fingerprint, response.status_code, response.headers.get("content-type"), body
+            ))
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            media_type=response.media_type,
+        )
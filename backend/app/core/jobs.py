@@ -0,0 +1,210 @@
+"""
+Durable background jobs without an external broker.
+
+enqueue() adds a row to the jobs table inside the caller's transaction (a
+transactional outbox): the job exists if and only if the request's writes were
+committed. JobWorker claims due rows, runs the registered handler and deletes
+the row on success, or reschedules it with exponential backoff on failure.
+
+Workers run either inside the API process (JOBS_RUN_IN_PROCESS, started from
+the app lifespan) or standalone via `python worker.py`. Several workers can
+share the table; on Postgres claims use FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, delete, func, or_, and_, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+handlers: Dict[str, Handler] = {}
+
+# Set after a transaction that enqueued jobs commits, so idle workers in this
+# process pick the work up immediately instead of waiting for the next poll.
+_wakeup = asyncio.Event()
+
+
+def job(kind: str) -> Callable[[Handler], Handler]:
+    """
+    Register a handler for jobs of this kind.
+
+    Handlers receive the worker's session and the job payload. They run inside a
+    savepoint and must not commit; the worker commits once the job is done. An
+    exception with a `retry_after` attribute (seconds) delays the retry at least
+    that long.
+    """
+    def decorator(fn: Handler) -> Handler:
+        handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    delay: Optional[timedelta] = None,
+    max_attempts: Optional[int] = None,
+    group_key: Optional[str] = None,
+) -> models.Job:
+    """
+    Add a job to the caller's session; it becomes visible when the caller commits.
+    group_key marks jobs a handler may look up and take over together.
+    """
+    queued = models.Job(
+        kind=kind,
+        payload=payload or {},
+        group_key=group_key,
+        status="pending",
+        attempts=0,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_after=datetime.utcnow() + (delay or timedelta()),
+    )
+    db.add(queued)
+    db.sync_session.info["jobs_enqueued"] = True
+    return queued
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session):
+    if session.info.pop("jobs_enqueued", False):
+        _wakeup.set()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_enqueued(session):
+    session.info.pop("jobs_enqueued", None)
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retry number `attempts` (2s, 4s, 8s, ... capped at 10 minutes)."""
+    return timedelta(seconds=min(2 ** attempts, 600))
+
+
+async def queue_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Queue depth per status and kind, plus the age of the oldest due job."""
+    result = await db.execute(
+        select(models.Job.status, models.Job.kind, func.count(models.Job.id))
+        .group_by(models.Job.status, models.Job.kind)
+    )
+    by_status: Dict[str, int] = {}
+    by_kind: Dict[str, Dict[str, int]] = {}
+    for status, kind, count in result.all():
+        by_status[status] = by_status.get(status, 0) + count
+        by_kind.setdefault(kind, {})[status] = count
+
+    oldest = await db.scalar(
+        select(func.min(models.Job.run_after))
+        .where(models.Job.status == "pending")
+        .where(models.Job.run_after <= datetime.utcnow())
+    )
+    return {
+        "by_status": by_status,
+        "by_kind": by_kind,
+        "oldest_due_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+    }
+
+
+class JobWorker:
+    def __init__(
+        self,
+        session_factory=None,
+        *,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.JOBS_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def _claim(self, db: AsyncSession):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT_SECONDS)
+        result = await db.execute(
+            select(models.Job)
+            .where(
+                or_(
+                    and_(models.Job.status == "pending", models.Job.run_after <= now),
+                    # Worker died mid-job
+                    and_(models.Job.status == "running", models.Job.locked_at < stale),
+                )
+            )
+            .order_by(models.Job.run_after, models.Job.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = result.scalars().all()
+        for queued in claimed:
+            queued.status = "running"
+            queued.locked_at = now
+            queued.attempts += 1
+        await db.commit()
+        return claimed
+
+    async def run_once(self) -> int:
+        """Claim and run one batch of due jobs. Returns how many were processed."""
+        async with self.session_factory() as db:
+            claimed = await self._claim(db)
+            for queued in claimed:
+                handler = handlers.get(queued.kind)
+                try:
+                    if handler is None:
+                        raise LookupError(f"No handler registered for job kind '{queued.kind}'")
+                    async with db.begin_nested():
+                        await handler(db, dict(queued.payload or {}))
+                except Exception as exc:
+                    logger.exception("Job %s (%s) failed on attempt %s", queued.id, queued.kind, queued.attempts)
+                    queued.last_error = f"{type(exc).__name__}: {exc}"
+                    queued.locked_at = None
+                    if queued.attempts >= queued.max_attempts:
+                        queued.status = "failed"
+                    else:
+                        queued.status = "pending"
+                        # A handler told to slow down (e.g. a 429) waits at least that long
+                        delay = max(backoff(queued.attempts), timedelta(seconds=getattr(exc, "retry_after", 0)))
+                        queued.run_after = datetime.utcnow() + delay
+                else:
+                    await db.execute(delete(models.Job).where(models.Job.id == queued.id))
+                await db.commit()
+            return len(claimed)
+
+    async def run_forever(self) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("Job worker iteration failed")
+                processed = 0
+            if processed >= self.batch_size:
+                continue
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        _wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
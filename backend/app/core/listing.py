@@ -0,0 +1,112 @@
+"""
+The request_list read table behind request list views.
+
+GET /requests/, the approval inbox and the dashboard show each request with
+its user's and reviewer's names. Rather than loading those users per page,
+request_list keeps one flat row per request with the names already in it, so
+a page is one indexed scan. Types are not copied; their names and colors come
+from the type registry.
+
+Every flush that writes requests through the ORM writes their rows too: new
+requests are copied with one INSERT ... SELECT, changed ones get an UPDATE
+of the changed columns, and renaming a user renames their rows. Code that
+changes vacation_requests with Core statements calls refresh() itself.
+"""
+from typing import Collection
+
+from sqlalchemy import delete, event, insert, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from app.models.user import User
+from app.models.vacation import VacationRequest, request_list
+
+
+# request_list columns taken as they are from vacation_requests
+_COPIED_COLUMNS = [c.name for c in request_list.c if c.name not in ("id", "user_name", "reviewer_name")]
+
+
+def _refresh_statements(request_ids: Collection[int]):
+    """Delete the rows of request_ids and copy them again from vacation_requests."""
+    owner = aliased(User)
+    reviewer = aliased(User)
+    source = (
+        select(
+            VacationRequest.id,
+            VacationRequest.user_id,
+            owner.name,
+            VacationRequest.type_id,
+            VacationRequest.start_date,
+            VacationRequest.end_date,
+            VacationRequest.business_quarters,
+            VacationRequest.status,
+            VacationRequest.comment,
+            VacationRequest.reviewer_id,
+            reviewer.name,
+            VacationRequest.reviewer_comment,
+            VacationRequest.reviewed_at,
+            VacationRequest.created_at,
+        )
+        .join(owner, owner.id == VacationRequest.user_id)
+        .outerjoin(reviewer, reviewer.id == VacationRequest.reviewer_id)
+        .where(VacationRequest.id.in_(request_ids))
+    )
+    return (
+        delete(request_list).where(request_list.c.id.in_(request_ids)),
+        insert(request_list).from_select([c.name for c in request_list.c], source),
+    )
+
+
+async def refresh(db: AsyncSession, request_ids: Collection[int]) -> None:
+    """Rebuild the rows of requests changed (or deleted) without the ORM."""
+    if not request_ids:
+        return
+    for statement in _refresh_statements(request_ids):
+        await db.execute(statement)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_request_list(session, flush_context):
+    requests = [obj for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, VacationRequest)]
+    renamed = [
+        obj for obj in session.dirty
+        if isinstance(obj, User) and inspect(obj).attrs.name.history.has_changes()
+    ]
+    if not requests and not renamed:
+        return
+
+    connection = session.connection()
+    new_ids = [obj.id for obj in requests if obj in session.new]
+    if new_ids:
+        connection.execute(_refresh_statements(new_ids)[1])
+    deleted_ids = [obj.id for obj in requests if obj in session.deleted]
+    if deleted_ids:
+        connection.execute(delete(request_list).where(request_list.c.id.in_(deleted_ids)))
+    for obj in requests:
+        if obj in session.dirty:
+            _copy_changes(connection, obj)
+
+    for user in renamed:
+        connection.execute(
+            update(request_list).where(request_list.c.user_id == user.id).values(user_name=user.name)
+        )
+        connection.execute(
+            update(request_list).where(request_list.c.reviewer_id == user.id).values(reviewer_name=user.name)
+        )
+
+
+def _copy_changes(connection, request: VacationRequest) -> None:
+    """Copy a flushed request's changed columns (reviews, cancellations) onto its row."""
+    state = inspect(request)
+    values = {
+        name: getattr(request, name)
+        for name in _COPIED_COLUMNS
+        if state.attrs[name].history.has_changes()
+    }
+    if not values:
+        return
+    if "user_id" in values:
+        values["user_name"] = select(User.name).where(User.id == request.user_id).scalar_subquery()
+    if "reviewer_id" in values:
+        values["reviewer_name"] = select(User.name).where(User.id == request.reviewer_id).scalar_subquery()
+    connection.execute(update(request_list).where(request_list.c.id == request.id).values(**values))
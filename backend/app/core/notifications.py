@@ -0,0 +1,155 @@
+"""
+Outgoing user notifications (Telegram).
+
+Request endpoints never talk to Telegram: they enqueue a `notify_request` job
+(see app.tasks) in their own transaction. That job resolves recipients and
+enqueues one `send_notification` job per chat, so every message is a row in
+the jobs table (the outbox) until Telegram has accepted it. A send job waits
+out the batch window, then takes the chat's other queued messages with it in
+one Telegram message and deletes their rows in the same transaction; if the
+send fails, nothing is deleted and the job is retried.
+
+NotificationSender applies the rate limits (per chat and globally) inside the
+job, before any row is locked: short waits are slept through, longer ones and
+upstream 429s are raised as RateLimited so the worker reschedules the job for
+after retry_after.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects longer messages
+MAX_MESSAGE_LENGTH = 4096
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after}s")
+        # Honoured by app.core.jobs when rescheduling the job
+        self.retry_after = retry_after
+
+
+class Transport(Protocol):
+    async def send(self, chat_id: int, text: str) -> None:
+        ...
+
+
+class LogTransport:
+    """Used when no bot token is configured: messages only go to the log."""
+
+    async def send(self, chat_id: int, text: str) -> None:
+        logger.info("Notification for chat %s: %s", chat_id, text)
+
+
+class TelegramTransport:
+    def __init__(self, token: str, base_url: str = "https://api.telegram.org", timeout: float = 10.0):
+        import httpx
+
+        self.url = f"{base_url.rstrip('/')}/bot{token}/sendMessage"
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def send(self, chat_id: int, text: str) -> None:
+        response = await self.client.post(self.url, json={"chat_id": chat_id, "text": text})
+        if response.status_code == 429:
+            retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+            raise RateLimited(float(retry_after))
+        # 5xx and anything else unexpected: the job is retried with backoff
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def default_transport() -> Transport:
+    if settings.TELEGRAM_BOT_TOKEN:
+        return TelegramTransport(settings.TELEGRAM_BOT_TOKEN, settings.TELEGRAM_API_URL)
+    return LogTransport()
+
+
+def pack(messages: List[str]) -> List[str]:
+    """Join messages into as few Telegram-sized texts as possible."""
+    packed: List[str] = []
+    for message in messages:
+        message = message[:MAX_MESSAGE_LENGTH]
+        if packed and len(packed[-1]) + 2 + len(message) <= MAX_MESSAGE_LENGTH:
+            packed[-1] = f"{packed[-1]}\n\n{message}"
+        else:
+            packed.append(message)
+    return packed
+
+
+class NotificationSender:
+    def __init__(
+        self,
+        transport: Optional[Transport] = None,
+        *,
+        chat_interval: Optional[float] = None,
+        rate_per_second: Optional[float] = None,
+        max_wait: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.transport = transport
+        self.chat_interval = settings.NOTIFY_CHAT_INTERVAL_SECONDS if chat_interval is None else chat_interval
+        self.rate_per_second = settings.NOTIFY_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+
+        self._next_allowed: Dict[int, float] = {}
+        self._tokens = self.rate_per_second
+        self._tokens_at = clock()
+        self.sent = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.rate_per_second, self._tokens + (now - self._tokens_at) * self.rate_per_second)
+        self._tokens_at = now
+
+    def _wait(self, chat_id: int) -> float:
+        """Seconds until both this chat's interval and the global budget allow a send."""
+        now = self.clock()
+        self._refill(now)
+        global_wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate_per_second
+        return max(self._next_allowed.get(chat_id, 0.0) - now, global_wait)
+
+    async def wait_turn(self, chat_id: int) -> None:
+        """
+        Wait until this chat's interval and the global budget allow a send,
+        and claim that send. Raises RateLimited instead when the wait is
+        longer than max_wait. Call it before taking any row locks.
+        """
+        wait = self._wait(chat_id)
+        if wait > self.max_wait:
+            raise RateLimited(wait)
+        if wait > 0:
+            await self.sleep(wait)
+            self._refill(self.clock())
+        self._tokens -= 1
+        self._next_allowed[chat_id] = self.clock() + self.chat_interval
+
+    async def deliver(self, chat_id: int, text: str) -> None:
+        """
+        Hand one message to the transport, right away (see wait_turn). Raises
+        RateLimited when Telegram answers 429, and the transport's error when
+        the send fails; the caller's job is retried.
+        """
+        if self.transport is None:
+            self.transport = default_transport()
+        try:
+            await self.transport.send(chat_id, text)
+        except RateLimited as exc:
+            self._next_allowed[chat_id] = self.clock() + exc.retry_after
+            raise
+        self.sent += 1
+
+    async def send(self, chat_id: int, text: str) -> None:
+        await self.wait_turn(chat_id)
+        await self.deliver(chat_id, text)
+
+
+sender = NotificationSender()
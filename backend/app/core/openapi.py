@@ -0,0 +1,64 @@
+"""
+Serve the committed OpenAPI schema instead of building it on the first /docs hit.
+
+FastAPI generates the schema lazily, walking every route and pydantic model on
+the first request to /openapi.json - on a freshly started worker that is the
+slowest request it serves. generate_openapi.py writes docs/openapi.json together
+with docs/openapi.sha256, a hash of the modules that define the API surface.
+When the hash still matches the code, the file is served as-is; otherwise the
+schema is generated as before, so a stale file is never served.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import fastapi
+import pydantic
+from fastapi import FastAPI
+
+from app.core.config import settings
+
+APP_DIR = Path(__file__).resolve().parents[1]
+DOCS_DIR = APP_DIR.parent / "docs"
+SCHEMA_PATH = DOCS_DIR / "openapi.json"
+HASH_PATH = DOCS_DIR / "openapi.sha256"
+
+# Everything routes, parameters and response models are declared in
+API_SOURCES = ("main.py", "api", "schemas", "core/config.py")
+
+
+def source_hash() -> str:
+    digest = hashlib.sha256()
+    digest.update(f"fastapi={fastapi.__version__};pydantic={pydantic.VERSION};prefix={settings.API_V1_STR}".encode())
+    for source in API_SOURCES:
+        path = APP_DIR / source
+        for file in sorted(path.rglob("*.py")) if path.is_dir() else [path]:
+            digest.update(file.relative_to(APP_DIR).as_posix().encode())
+            digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def load_precomputed() -> Optional[Dict[str, Any]]:
+    """The committed schema, or None when it is missing or the API changed since it was written."""
+    try:
+        if HASH_PATH.read_text().strip() != source_hash():
+            return None
+        return json.loads(SCHEMA_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def generate(app: FastAPI) -> Dict[str, Any]:
+    """Build the schema from the routes, bypassing the precomputed file."""
+    app.openapi_schema = None
+    return FastAPI.openapi(app)
+
+
+def use_precomputed_openapi(app: FastAPI) -> None:
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            app.openapi_schema = load_precomputed() or generate(app)
+        return app.openapi_schema
+
+    app.openapi = openapi
@@ -0,0 +1,128 @@
+"""
+Yearly partitions of vacation_requests, and archiving closed years.
+
+On Postgres vacation_requests is partitioned by range of start_date, one
+partition per calendar year (vacation_requests_y2026) plus a default
+partition for years that have none yet. A query that bounds start_date only
+reads the partitions of those years, so overlapping() adds such a bound to
+"requests overlapping these dates" predicates; that is exact because no
+request is longer than MAX_REQUEST_DAYS. SQLite has no partitions and uses
+the same predicates with the date index.
+
+archive_year() moves a finished year out of the database into a gzipped CSV
+file, dropping its partition. Both are run by archive.py.
+"""
+import csv
+import gzip
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+
+MAX_REQUEST_DAYS = 366
+
+DEFAULT_PARTITION = "vacation_requests_default"
+
+
+def partition_name(year: int) -> str:
+    return f"vacation_requests_y{year}"
+
+
+def overlapping(columns, start: date, end: date):
+    """Requests (a model, or a table's .c) overlapping start..end, bounded so Postgres skips other years."""
+    return and_(
+        columns.start_date <= end,
+        columns.end_date >= start,
+        columns.start_date >= start - timedelta(days=MAX_REQUEST_DAYS - 1),
+    )
+
+
+def in_year(columns, year: int):
+    """Requests starting in year, i.e. the rows of that year's partition."""
+    return and_(columns.start_date >= date(year, 1, 1), columns.start_date < date(year + 1, 1, 1))
+
+
+async def _partition_exists(db: AsyncSession, year: int) -> bool:
+    return await db.scalar(text("SELECT to_regclass(:name)"), {"name": partition_name(year)}) is not None
+
+
+async def ensure_partitions(db: AsyncSession, years: Iterable[int]) -> List[str]:
+    """
+    Create the missing partitions of years (Postgres only), moving rows that
+    landed in the default partition into them. Returns the partitions created.
+    The caller commits.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return []
+    created = []
+    for year in sorted(set(years)):
+        if await _partition_exists(db, year):
+            continue
+        name = partition_name(year)
+        start, end = date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat()
+        await db.execute(text(f"CREATE TABLE {name} (LIKE vacation_requests INCLUDING DEFAULTS)"))
+        await db.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE start_date >= '{start}' AND start_date < '{end}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await db.execute(text(
+            f"ALTER TABLE vacation_requests ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        created.append(name)
+    return created
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+async def archive_year(db: AsyncSession, year: int, directory: Path) -> Tuple[Path, int]:
+    """
+    Write the requests starting in year to directory/vacation_requests_<year>.csv.gz
+    and delete them (and their request_list rows). Only past years without
+    pending requests can be archived, and an existing archive is never
+    overwritten; ValueError otherwise. Balances are kept. The caller commits,
+    after which the file is the only copy. Returns the file and the row count.
+    """
+    if year >= date.today().year:
+        raise ValueError(f"{year} is not over yet")
+    requests = models.VacationRequest.__table__
+    pending = await db.scalar(
+        select(func.count()).select_from(requests)
+        .where(in_year(requests.c, year))
+        .where(requests.c.status == "pending")
+    )
+    if pending:
+        raise ValueError(f"{year} still has {pending} pending requests")
+    path = Path(directory) / f"vacation_requests_{year}.csv.gz"
+    if path.exists():
+        raise ValueError(f"{path} already exists")
+
+    result = await db.execute(select(requests).where(in_year(requests.c, year)).order_by(requests.c.id))
+    rows = result.all()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with gzip.open(partial, "wt", newline="") as archive:
+        writer = csv.writer(archive)
+        writer.writerow(result.keys())
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+    os.replace(partial, path)
+
+    if db.bind.dialect.name == "postgresql" and await _partition_exists(db, year):
+        await db.execute(text(f"DROP TABLE {partition_name(year)}"))
+    # Rows of years without a partition (and everything on SQLite)
+    await db.execute(delete(requests).where(in_year(requests.c, year)))
+    await db.execute(delete(models.request_list).where(in_year(models.request_list.c, year)))
+    return path, len(rows)
@@ -0,0 +1,210 @@
+"""
+Token-bucket rate limiting.
+
+Each policy allows `per_minute` requests per key, refilled continuously, with
+bursts up to the same amount. RateLimitMiddleware applies the per-IP login
+budget and the per-user read/write budgets; /auth/login additionally charges
+the per-account budget before it runs bcrypt.
+
+Buckets live in process memory by default, so each worker enforces its own
+budget. RATE_LIMIT_BACKEND=database keeps them in the rate_limit_buckets table
+instead (one upsert per request), shared by all workers.
+"""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import case
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.security import subject_from_authorization
+from app.models.rate_limit import RateLimitBucket
+
+
+class Backend(Protocol):
+    async def take(self, key: str, rate: float, burst: float, cost: float, now: float) -> Tuple[bool, float]:
+        """Refill the bucket, take `cost` tokens if available. Returns (allowed, tokens left)."""
+        ...
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int = 100_000):
+        # Least recently used buckets are dropped first; a dropped bucket starts full again
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float, cost: float, now: float) -> Tuple[bool, float]:
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class DatabaseBackend:
+    """One atomic upsert per take, so concurrent workers never double-spend a token."""
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+
+    async def take(self, key: str, rate: float, burst: float, cost: float, now: float) -> Tuple[bool, float]:
+        if self.session_factory is None:
+            from app.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+        async with self.session_factory() as db:
+            if db.bind.dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            bucket = RateLimitBucket.__table__.c
+            refill = bucket.tokens + (now - bucket.updated_at) * rate
+            refilled = case((refill > burst, burst), else_=refill)
+            statement = (
+                insert(RateLimitBucket)
+                .values(key=key, tokens=burst - cost, updated_at=now, allowed=cost <= burst)
+                .on_conflict_do_update(
+                    index_elements=[bucket.key],
+                    set_={
+                        "tokens": case((refilled >= cost, refilled - cost), else_=refilled),
+                        "allowed": refilled >= cost,
+                        "updated_at": now,
+                    },
+                )
+                .returning(bucket.allowed, bucket.tokens)
+            )
+            allowed, tokens = (await db.execute(statement)).one()
+            await db.commit()
+            return bool(allowed), tokens
+
+    def __len__(self) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+
+def default_backend() -> Backend:
+    if settings.RATE_LIMIT_BACKEND == "database":
+        return DatabaseBackend()
+    return MemoryBackend()
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": str(self.remaining)}
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+class RateLimit:
+    def __init__(
+        self,
+        name: str,
+        per_minute: int,
+        *,
+        backend: Optional[Backend] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.per_minute = per_minute
+        self.backend = backend
+        self.clock = clock
+        self.allowed = 0
+        self.limited = 0
+
+    async def hit(self, key: str, cost: float = 1.0) -> Decision:
+        if self.backend is None:
+            self.backend = default_backend()
+        rate = self.per_minute / 60.0
+        allowed, tokens = await self.backend.take(f"{self.name}:{key}", rate, self.per_minute, cost, self.clock())
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return Decision(
+            allowed=allowed,
+            limit=self.per_minute,
+            remaining=max(0, int(tokens)),
+            retry_after=0.0 if allowed else (cost - tokens) / rate,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "per_minute": self.per_minute,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "tracked_keys": len(self.backend) if self.backend is not None else 0,
+        }
+
+    def reset(self) -> None:
+        self.allowed = self.limited = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+
+login_ips = RateLimit("login_ip", settings.RATE_LIMIT_LOGIN_PER_MINUTE)
+login_accounts = RateLimit("login_account", settings.RATE_LIMIT_ACCOUNT_PER_MINUTE)
+reads = RateLimit("read", settings.RATE_LIMIT_READ_PER_MINUTE)
+writes = RateLimit("write", settings.RATE_LIMIT_WRITE_PER_MINUTE)
+limits = (login_ips, login_accounts, reads, writes)
+
+
+def too_many_requests(decision: Decision) -> HTTPException:
+    return HTTPException(status_code=429, detail="Too many requests", headers=decision.headers())
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    # Liveness probes and the long-lived event stream are not metered
+    EXEMPT = {"/", "/api/v1/health", "/api/v1/ready", "/api/v1/events/"}
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        path = request.url.path
+        if not settings.RATE_LIMIT_ENABLED or request.method == "OPTIONS" or path in self.EXEMPT:
+            return await call_next(request)
+
+        if path == f"{settings.API_V1_STR}/auth/login":
+            decision = await login_ips.hit(client_ip(request))
+        else:
+            subject = subject_from_authorization(request.headers.get("Authorization"))
+            key = f"user:{subject}" if subject else f"ip:{client_ip(request)}"
+            policy = reads if request.method in ("GET", "HEAD") else writes
+            decision = await policy.hit(key)
+
+        if not decision.allowed:
+            return JSONResponse(status_code=429, content={"detail": "Too many requests"}, headers=decision.headers())
+        response = await call_next(request)
+        response.headers.update(decision.headers())
+        return response
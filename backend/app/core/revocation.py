@@ -0,0 +1,102 @@
+"""
+Token revocation without a per-request database lookup.
+
+Every token embeds the user's token_version at issue time. Deactivating a user
+or changing their role bumps users.token_version; tokens carrying an older
+version are rejected. Each process keeps {user_id: current version} for users
+whose version was ever bumped (a handful of rows), updates it immediately for
+changes it makes itself and reloads it from the database every
+TOKEN_REVOCATION_POLL_SECONDS to pick up changes made by other processes.
+
+The first load runs in the background like app.core.warmup, retried every
+WARMUP_RETRY_SECONDS while the database is unreachable; GET /ready stays
+red until it has succeeded, so revoked tokens are never let through by a
+process serving traffic.
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    def __init__(
+        self,
+        session_factory=None,
+        poll_interval: Optional[float] = None,
+        retry_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval or settings.TOKEN_REVOCATION_POLL_SECONDS
+        self.retry_interval = retry_interval or settings.WARMUP_RETRY_SECONDS
+        self.loaded = False
+        self._versions: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        return version < self._versions.get(user_id, 0)
+
+    def revoke(self, user_id: int, version: int) -> None:
+        """Reject this user's tokens older than `version` in this process right away."""
+        self._versions[user_id] = max(version, self._versions.get(user_id, 0))
+
+    def clear(self) -> None:
+        self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    async def load(self, db: Optional[AsyncSession] = None) -> None:
+        if db is None:
+            if self.session_factory is None:
+                from app.database import AsyncSessionLocal
+                self.session_factory = AsyncSessionLocal
+            async with self.session_factory() as db:
+                return await self.load(db)
+        result = await db.execute(
+            select(models.User.id, models.User.token_version).where(models.User.token_version > 0)
+        )
+        self._versions = dict(result.all())
+        self.loaded = True
+
+    async def run(self) -> None:
+        while not self.loaded:
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Loading revoked token versions failed, retrying in %ss", self.retry_interval)
+                await asyncio.sleep(self.retry_interval)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Reloading revoked token versions failed")
+
+    def start(self) -> None:
+        self.loaded = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def bump_token_version(user: models.User) -> None:
+    """Invalidate every token issued to user; call revocations.revoke after commit."""
+    user.token_version = (user.token_version or 0) + 1
+
+
+revocations = RevocationList()
@@ -1,23 +1,132 @@
+import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
-from passlib.context import CryptContext
+from typing import Any, Dict, Optional, Tuple, Union
+from functools import lru_cache
+import anyio
+from jose import ExpiredSignatureError, JWTError
+from pydantic import ValidationError
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.schemas.token import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def _pwd_context():
+    # passlib and jose.jwt (with its crypto backend) are imported on first use
+    # rather than at startup; only login and token checks need them
+    from passlib.context import CryptContext
+    scheme = settings.PASSWORD_HASH_SCHEME
+    # Existing bcrypt hashes keep verifying after a scheme change
+    schemes = [scheme] if scheme == "bcrypt" else [scheme, "bcrypt"]
+    options = {}
+    if settings.PASSWORD_HASH_ROUNDS is not None:
+        options[f"{scheme}__default_rounds"] = settings.PASSWORD_HASH_ROUNDS
+        options[f"{scheme}__min_desired_rounds"] = settings.PASSWORD_HASH_ROUNDS
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+def _jwt():
+    from jose import jwt
+    return jwt
+
+# bcrypt is deliberately slow; bound how many verifications run at once
+_hash_limiter = anyio.CapacityLimiter(settings.PASSWORD_HASH_CONCURRENCY)
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+def create_access_token(
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    *,
+    role: Optional[str] = None,
+    version: int = 0,
+) -> str:
+    """
+    Short-lived token carrying everything needed to authorize a request
+    (id, role, token version), so deps.get_current_principal needs no query.
+    """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode = {"exp": expire, "sub": str(subject), "type": ACCESS, "ver": version}
+    if role is not None:
+        to_encode["role"] = role
+    encoded_jwt = _jwt().encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(subject: Union[str, Any], *, version: int = 0) -> Tuple[str, str, datetime]:
+    """Returns (token, jti, expires_at); the caller records the jti for rotation."""
+    jti = secrets.token_hex(16)
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"exp": expire, "sub": str(subject), "type": REFRESH, "ver": version, "jti": jti}
+    return _jwt().encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM), jti, expire
+
+def _load_pyjwt():
+    if settings.JWT_BACKEND != "pyjwt":
+        return None
+    import jwt as pyjwt
+    return pyjwt
+
+# Optional alternative verifier; tokens are interchangeable between the two
+_pyjwt = _load_pyjwt()
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Raises jose's ExpiredSignatureError / JWTError on bad tokens, whichever backend verifies."""
+    if _pyjwt is None:
+        return _jwt().decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    try:
+        return _pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except _pyjwt.ExpiredSignatureError as exc:
+        raise ExpiredSignatureError(str(exc))
+    except _pyjwt.InvalidTokenError as exc:
+        raise JWTError(str(exc))
+
+_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+def read_token(token: str) -> TokenPayload:
+    """
+    Verified claims of a token. Every API call (and each middleware) needs
+    them, so verified tokens are cached until their `exp`; revocation is
+    checked separately on every request. Raises like decode_token, or
+    pydantic's ValidationError for malformed claims.
+    """
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+    claims = TokenPayload(**decode_token(token))
+    if claims.exp is not None:
+        ttl = claims.exp - time.time()
+        if ttl > 0:
+            _token_cache.set(token, claims, ttl=ttl)
+    return claims
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (valid, new_hash). new_hash is set when the password is valid but
+    its stored hash uses another scheme or fewer rounds than configured; the
+    caller stores it, so hash cost is raised as users log in.
+    """
+    return _pwd_context().verify_and_update(plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password off the event loop, at most PASSWORD_HASH_CONCURRENCY at a time."""
+    return await anyio.to_thread.run_sync(
+        verify_and_update_password, plain_password, hashed_password, limiter=_hash_limiter
+    )
+
+def subject_from_authorization(authorization: Optional[str]) -> Optional[str]:
+    """The `sub` of a valid "Bearer <token>" header, without touching the database."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return read_token(authorization[7:]).sub
+    except (JWTError, ValidationError):
+        return None
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
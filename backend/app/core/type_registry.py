@@ -0,0 +1,101 @@
+"""
+Vacation types held in memory.
+
+There are a handful of types and they change a few times a year, yet almost
+every endpoint needs their names, colors or policies. Each process keeps them
+as an immutable {id: VacationTypeInfo} mapping (inactive types included, since
+old requests still refer to them) instead of loading them with every query.
+
+Committing a change to a VacationType clears the mapping in the committing
+process. Other processes notice new types right away (an unknown id triggers a
+reload) and edits within VACATION_TYPE_CACHE_TTL_SECONDS.
+"""
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class VacationTypeInfo:
+    id: int
+    name: str
+    is_paid: bool
+    default_days: int
+    color: str
+    is_active: bool
+    accrual: str
+    carry_over_days: int
+
+
+class TypeRegistry:
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.VACATION_TYPE_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._types: Mapping[int, VacationTypeInfo] = MappingProxyType({})
+        self._expires_at = 0.0
+
+    async def load(self, db: AsyncSession) -> Mapping[int, VacationTypeInfo]:
+        result = await db.execute(select(models.VacationType).order_by(models.VacationType.id))
+        self._types = MappingProxyType({
+            row.id: VacationTypeInfo(
+                id=row.id,
+                name=row.name,
+                is_paid=row.is_paid,
+                default_days=row.default_days,
+                color=row.color,
+                is_active=row.is_active,
+                accrual=row.accrual,
+                carry_over_days=row.carry_over_days,
+            )
+            for row in result.scalars()
+        })
+        self._expires_at = time.monotonic() + self.ttl
+        return self._types
+
+    async def all(self, db: AsyncSession) -> Mapping[int, VacationTypeInfo]:
+        if time.monotonic() >= self._expires_at:
+            return await self.load(db)
+        return self._types
+
+    async def resolve(self, db: AsyncSession, type_ids: Iterable[int]) -> Mapping[int, VacationTypeInfo]:
+        """All types, reloaded first if any of type_ids is missing (created by another process)."""
+        types = await self.all(db)
+        if any(type_id not in types for type_id in type_ids):
+            types = await self.load(db)
+        return types
+
+    async def get(self, db: AsyncSession, type_id: int) -> Optional[VacationTypeInfo]:
+        return (await self.resolve(db, (type_id,))).get(type_id)
+
+    async def active(self, db: AsyncSession) -> List[VacationTypeInfo]:
+        return [t for t in (await self.all(db)).values() if t.is_active]
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+
+type_registry = TypeRegistry()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_type_changes(session, flush_context):
+    if any(isinstance(obj, models.VacationType) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["vacation_types_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("vacation_types_changed", False):
+        type_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_type_changes(session):
+    session.info.pop("vacation_types_changed", None)
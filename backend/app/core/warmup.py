@@ -0,0 +1,106 @@
+"""
+Startup warmup, so the first requests after a deploy don't pay one-off costs.
+
+Started from the app lifespan in the background: the process starts serving
+right away (GET /health is green as soon as it is up), and GET /ready turns
+green once warmup has finished. Point the load balancer's readiness / health
+check at /ready so no traffic reaches a cold worker. Warmup:
+
+* configures the SQLAlchemy mappers,
+* opens WARMUP_DB_CONNECTIONS pool connections (at most the pool size),
+* loads the vacation types,
+* runs the common response models once through validation and serialization,
+* loads the bcrypt backend and the JWT library (deferred at import time).
+
+A failed attempt (usually: the database is not reachable yet) is retried
+every WARMUP_RETRY_SECONDS; the process stays not-ready meanwhile.
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Optional
+
+import anyio
+from sqlalchemy import select, text
+from sqlalchemy.orm import configure_mappers
+
+from app import models, schemas
+from app.core import security
+from app.core.config import settings
+from app.core.type_registry import type_registry
+
+logger = logging.getLogger(__name__)
+
+
+async def _open_connections(engine, count: int) -> None:
+    """Hold `count` connections at once, so the pool keeps that many open afterwards."""
+    pool_size = getattr(engine.pool, "size", lambda: count)()
+    async with AsyncExitStack() as stack:
+        for _ in range(min(count, pool_size)):
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execute(text("SELECT 1"))
+
+
+def _load_crypto() -> None:
+    security.verify_password("warmup", security.get_password_hash("warmup"))
+    security.decode_token(security.create_access_token("0", role="employee"))
+
+
+class Warmup:
+    def __init__(self, engine=None, session_factory=None, retry_interval: Optional[float] = None):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.retry_interval = retry_interval or settings.WARMUP_RETRY_SECONDS
+        self.ready = False
+        self.duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> None:
+        if self.engine is None or self.session_factory is None:
+            from app.database import AsyncSessionLocal, engine
+            self.engine = self.engine or engine
+            self.session_factory = self.session_factory or AsyncSessionLocal
+        started = time.monotonic()
+
+        configure_mappers()
+        if settings.WARMUP_DB_CONNECTIONS > 0:
+            await _open_connections(self.engine, settings.WARMUP_DB_CONNECTIONS)
+
+        async with self.session_factory() as db:
+            types = await type_registry.load(db)
+            holidays = (await db.execute(select(models.PublicHoliday).limit(1))).scalars().all()
+            for vacation_type in list(types.values())[:1]:
+                schemas.VacationType.model_validate(vacation_type).model_dump(mode="json")
+            for holiday in holidays:
+                schemas.PublicHoliday.model_validate(holiday).model_dump(mode="json")
+
+        await anyio.to_thread.run_sync(_load_crypto)
+
+        self.duration = time.monotonic() - started
+        self.ready = True
+        logger.info("Warmup finished in %.2fs", self.duration)
+
+    async def run(self) -> None:
+        while not self.ready:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Warmup failed, retrying in %ss", self.retry_interval)
+                await asyncio.sleep(self.retry_interval)
+
+    def start(self) -> None:
+        self.ready = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+warmup = Warmup()
@@ -1,4 +1,6 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
@@ -8,7 +10,14 @@ DATABASE_URL = settings.DATABASE_URL
 if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine_options = {"echo": settings.DB_ECHO}
+if not DATABASE_URL.startswith("sqlite"):
+    engine_options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
+elif make_url(DATABASE_URL).database in (None, "", ":memory:"):
+    # An in-memory database lives in its connection: share one (used by the tests)
+    engine_options.update(poolclass=StaticPool)
+
+engine = create_async_engine(DATABASE_URL, **engine_options)
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
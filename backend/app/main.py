@@ -1,5 +1,9 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
 
 description = """
 ## Vacation Manager API
@@ -57,9 +61,51 @@ tags_metadata = [
         "name": "calendar",
         "description": "Calendar views. Get approved vacation requests in calendar format.",
     },
+    {
+        "name": "dashboard",
+        "description": "Aggregated views. Get everything a page needs on first paint in one call.",
+    },
+    {
+        "name": "reports",
+        "description": "Reporting. Vacation usage aggregated per user, team, type and month.",
+    },
+    {
+        "name": "system",
+        "description": "Operational introspection. Background job queue depth and other runtime state.",
+    },
+    {
+        "name": "events",
+        "description": "Live updates. Server-Sent Events stream of vacation request changes.",
+    },
+    {
+        "name": "audit",
+        "description": "Audit trail. Who changed which request or user, and how.",
+    },
 ]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.core.events import broker
+    from app.core.revocation import revocations
+    from app.core.warmup import warmup
+    warmup.start()
+    await broker.start()
+    revocations.start()
+    worker = None
+    if settings.JOBS_RUN_IN_PROCESS:
+        from app import tasks  # registers job handlers
+        from app.core.jobs import JobWorker
+        worker = JobWorker()
+        worker.start()
+    yield
+    if worker is not None:
+        await worker.stop()
+    await revocations.stop()
+    await broker.stop()
+    await warmup.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Vacation Manager API",
     description=description,
     version="0.1.0",
@@ -96,6 +142,14 @@ if frontend_url:
     # Add onrender.com pattern
     origins.append("https://*.onrender.com")
 
+# Added before CORS so replayed and throttled responses get CORS headers too
+from app.core.idempotency import IdempotencyMiddleware
+app.add_middleware(IdempotencyMiddleware)
+
+# Outside idempotency, so throttled retries never reserve a key
+from app.core.rate_limit import RateLimitMiddleware
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -107,6 +161,10 @@ app.add_middleware(
 from app.api.v1 import api_router
 app.include_router(api_router, prefix="/api/v1")
 
+# Serve docs/openapi.json while it matches the code instead of generating it
+from app.core.openapi import use_precomputed_openapi
+use_precomputed_openapi(app)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Vacation Manager API"}
@@ -114,3 +172,15 @@ async def root():
 @app.get("/api/v1/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/api/v1/ready")
+async def readiness_check():
+    """
+    Green once startup warmup has finished and revoked tokens are loaded;
+    /health only says the process is up.
+    """
+    from app.core.revocation import revocations
+    from app.core.warmup import warmup
+    if not warmup.ready or not revocations.loaded:
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready", "warmup_seconds": round(warmup.duration, 3)}
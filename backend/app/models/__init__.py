@@ -1,3 +1,15 @@
-from .user import User
-from .vacation import VacationType, VacationBalance, VacationRequest
+from .user import User, user_approvers, user_closure
+from .vacation import VacationType, VacationBalance, VacationRequest, request_list
 from .public_holiday import PublicHoliday
+from .job import Job
+from .audit import AuditEvent
+from .idempotency import IdempotencyKey
+from .rate_limit import RateLimitBucket
+from .refresh_token import RefreshToken
+
+# Registers the session hooks that keep user_closure in sync with users.manager_id
+from app.utils import org_tree
+# Registers the session hook that writes buffered audit events on commit
+from app.core import audit
+# Registers the session hook that keeps request_list in sync with vacation_requests
+from app.core import listing
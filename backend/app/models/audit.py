@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from app.database import Base
+from datetime import datetime
+
+class AuditEvent(Base):
+    """Append-only: rows are inserted by app.core.audit and never updated."""
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # No foreign keys: history must outlive the rows it describes
+    actor_id = Column(Integer, nullable=True)
+    action = Column(String, nullable=False)
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    changes = Column(JSON, nullable=False, default=dict)
+
+    __table_args__ = (
+        # GET /audit pages backwards by id within these filters
+        Index("ix_audit_events_entity", "entity_type", "entity_id", "id"),
+        Index("ix_audit_events_actor", "actor_id", "id"),
+        Index("ix_audit_events_action", "action", "id"),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from app.database import Base
+from datetime import datetime
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # "user:{id}" for authenticated callers, "anonymous" otherwise
+    scope = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # Null while the first request is still being processed
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, text
+from app.database import Base
+from datetime import datetime
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    # Jobs of one kind a handler may take over together, e.g. one Telegram chat's messages
+    group_key = Column(String, nullable=True)
+    status = Column(String, default="pending", nullable=False) # pending, running, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Workers poll for due pending jobs; finished jobs are deleted
+        Index(
+            "ix_jobs_pending_run_after",
+            "run_after",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_jobs_pending_kind_group_key",
+            "kind",
+            "group_key",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
@@ -7,4 +7,5 @@ class PublicHoliday(Base):
     id = Column(Integer, primary_key=True, index=True)
     date = Column(Date, nullable=False, unique=True)
     name = Column(String, nullable=False)
-    year = Column(Integer, nullable=False)
+    # GET /holidays/ and the dashboard list a year
+    year = Column(Integer, nullable=False, index=True)
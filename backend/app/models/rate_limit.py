@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Float, Boolean
+from app.database import Base
+
+class RateLimitBucket(Base):
+    """Token buckets shared by all workers when RATE_LIMIT_BACKEND=database."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last refill
+    updated_at = Column(Float, nullable=False)
+    # Outcome of the last take, read back in the same statement
+    allowed = Column(Boolean, nullable=False)
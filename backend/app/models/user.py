@@ -8,7 +8,17 @@ user_approvers = Table(
     "user_approvers",
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
-    Column("approver_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("approver_id", Integer, ForeignKey("users.id"), primary_key=True, index=True),
+)
+
+# Transitive closure of users.manager_id: one row per (ancestor, descendant) pair,
+# including depth-0 self rows. Maintained by app.utils.org_tree on every flush.
+user_closure = Table(
+    "user_closure",
+    Base.metadata,
+    Column("ancestor_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("descendant_id", Integer, ForeignKey("users.id"), primary_key=True, index=True),
+    Column("depth", Integer, nullable=False),
 )
 
 class User(Base):
@@ -19,8 +29,10 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
     role = Column(String, default="employee", nullable=False) # employee, manager, admin
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
+    # Embedded in issued tokens; bumping it revokes every token issued before
+    token_version = Column(Integer, default=0, nullable=False, server_default="0")
 
     telegram_id = Column(BigInteger, unique=True, nullable=True)
     start_date = Column(Date, nullable=True)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DateTime, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DateTime, Text, LargeBinary, UniqueConstraint, Index, Table, text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.utils.units import days_property
 from datetime import datetime
 
 class VacationType(Base):
@@ -12,6 +13,10 @@ class VacationType(Base):
     default_days = Column(Integer, default=0)
     color = Column(String, default="#3B82F6")
     is_active = Column(Boolean, default=True)
+    # Entitlement policy, see app.core.accrual: "annual" or "monthly"
+    accrual = Column(String, nullable=False, default="annual", server_default="annual")
+    # Unused days that move on to the next year
+    carry_over_days = Column(Integer, nullable=False, default=0, server_default="0")
 
 class VacationBalance(Base):
     __tablename__ = "vacation_balances"
@@ -20,14 +25,23 @@ class VacationBalance(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     type_id = Column(Integer, ForeignKey("vacation_types.id"), nullable=False)
     year = Column(Integer, nullable=False)
-    total_days = Column(Integer, default=0)
-    used_days = Column(Integer, default=0)
+    # Quarter-days (app.utils.units); total_days / used_days are the same in days
+    total_quarters = Column(Integer, default=0)
+    used_quarters = Column(Integer, default=0)
+    total_days = days_property("total_quarters")
+    used_days = days_property("used_quarters")
 
     user = relationship("User", back_populates="balances")
     vacation_type = relationship("VacationType")
 
-    __table_args__ = (UniqueConstraint('user_id', 'type_id', 'year', name='uq_user_type_year'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'type_id', 'year', name='uq_user_type_year'),
+        # A year's balances: reports (everyone), dashboard and balance views (one user)
+        Index("ix_vacation_balances_year_user_id", "year", "user_id"),
+    )
 
+# On Postgres the table is partitioned by year of start_date, with primary key
+# (id, start_date); see app.core.partitions
 class VacationRequest(Base):
     __tablename__ = "vacation_requests"
 
@@ -36,7 +50,12 @@ class VacationRequest(Base):
     type_id = Column(Integer, ForeignKey("vacation_types.id"), nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
-    business_days = Column(Integer, nullable=False)
+    # Quarter-days (app.utils.units); business_days is the same in days
+    business_quarters = Column(Integer, nullable=False)
+    business_days = days_property("business_quarters")
+    # Which days of the range were counted (utils.dates.business_day_mask), so
+    # a later holiday can be subtracted without re-walking the range
+    day_mask = Column(LargeBinary, nullable=True)
     status = Column(String, default="pending", index=True) # pending, approved, rejected, cancelled
     comment = Column(Text, nullable=True)
     reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -47,3 +66,57 @@ class VacationRequest(Base):
     user = relationship("User", foreign_keys=[user_id], back_populates="vacation_requests")
     vacation_type = relationship("VacationType")
     reviewer = relationship("User", foreign_keys=[reviewer_id], back_populates="reviewed_requests")
+
+    __table_args__ = (
+        # Approval inbox: only the (small) pending slice is indexed
+        Index(
+            "ix_vacation_requests_pending_user_id",
+            "user_id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        # Requests overlapping a date (holiday recompute, calendar)
+        Index("ix_vacation_requests_start_date_end_date", "start_date", "end_date"),
+        # Someone's requests by date: reports and calendars scoped to a manager
+        Index("ix_vacation_requests_user_id_start_date", "user_id", "start_date"),
+        # Approved requests by date: calendar and usage reports
+        Index(
+            "ix_vacation_requests_approved_start_date_end_date",
+            "start_date",
+            "end_date",
+            postgresql_where=text("status = 'approved'"),
+            sqlite_where=text("status = 'approved'"),
+        ),
+    )
+
+# One flat row per request with the user's and reviewer's names, for list
+# views. Maintained by app.core.listing on every flush; no foreign keys,
+# so it can be rewritten freely.
+request_list = Table(
+    "request_list",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("user_name", String, nullable=False),
+    Column("type_id", Integer, nullable=False),
+    Column("start_date", Date, nullable=False),
+    Column("end_date", Date, nullable=False),
+    Column("business_quarters", Integer, nullable=False),
+    Column("status", String),
+    Column("comment", Text),
+    Column("reviewer_id", Integer),
+    Column("reviewer_name", String),
+    Column("reviewer_comment", Text),
+    Column("reviewed_at", DateTime),
+    Column("created_at", DateTime),
+    # Someone's own requests, newest first (dashboard, GET /requests/)
+    Index("ix_request_list_user_id_start_date", "user_id", "start_date"),
+    # Approval inbox in arrival order; only the pending slice is indexed
+    Index(
+        "ix_request_list_pending_created_at",
+        "created_at",
+        "id",
+        postgresql_where=text("status = 'pending'"),
+        sqlite_where=text("status = 'pending'"),
+    ),
+)
@@ -1,4 +1,4 @@
-from .token import Token, TokenPayload
+from .token import Token, TokenPayload, TokenRefresh
 from .user import User, UserCreate, UserUpdate
 from .vacation import (
     VacationType, VacationTypeCreate, VacationTypeUpdate,
@@ -8,3 +8,7 @@ from .vacation import (
 from .public_holiday import PublicHoliday, PublicHolidayCreate
 from .calendar import CalendarEntry
 from .common import PaginatedResponse
+from .dashboard import Dashboard
+from .report import UsageReport, UserUsage, TypeUsage, MonthUsage
+from .system import JobQueueStats, RateLimitPolicyStats
+from .audit import AuditEvent, AuditPage
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class AuditEvent(BaseModel):
+    id: int
+    created_at: datetime
+    actor_id: Optional[int] = None
+    action: str
+    entity_type: str
+    entity_id: int
+    changes: Dict[str, Any]
+
+    class Config:
+        from_attributes = True
+
+class AuditPage(BaseModel):
+    items: List[AuditEvent]
+    # Pass as `cursor` to get the next (older) page; null on the last page
+    next_cursor: Optional[int] = None
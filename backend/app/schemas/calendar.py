@@ -8,3 +8,5 @@ class CalendarEntry(BaseModel):
     type_name: str
     type_color: str
     status: str
+    # Leave taken that day: 1, a part day, or 0 on weekends and holidays
+    days: float = 1.0
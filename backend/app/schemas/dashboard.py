@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List
+
+from .user import User
+from .vacation import VacationType, VacationBalanceResponse, VacationRequestResponse
+from .public_holiday import PublicHoliday
+
+class Dashboard(BaseModel):
+    user: User
+    year: int
+    balances: List[VacationBalanceResponse]
+    requests: List[VacationRequestResponse]
+    pending_approvals: List[VacationRequestResponse] = []
+    vacation_types: List[VacationType]
+    holidays: List[PublicHoliday]
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class UserUsage(BaseModel):
+    user_id: int
+    user_name: str
+    manager_id: Optional[int] = None
+    type_id: int
+    type_name: str
+    total_days: float
+    used_days: float
+    remaining_days: float
+
+class TypeUsage(BaseModel):
+    type_id: int
+    type_name: str
+    total_days: float
+    used_days: float
+    remaining_days: float
+
+class MonthUsage(BaseModel):
+    month: int
+    type_id: int
+    type_name: str
+    used_days: float
+
+class UsageReport(BaseModel):
+    year: int
+    manager_id: Optional[int] = None
+    users: List[UserUsage]
+    by_type: List[TypeUsage]
+    by_month: List[MonthUsage]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Dict
+
+class JobQueueStats(BaseModel):
+    by_status: Dict[str, int]
+    by_kind: Dict[str, Dict[str, int]]
+    oldest_due_seconds: float
+
+class RateLimitPolicyStats(BaseModel):
+    per_minute: int
+    allowed: int
+    limited: int
+    # Buckets currently held in this process (0 with the database backend)
+    tracked_keys: int
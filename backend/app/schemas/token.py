@@ -4,6 +4,21 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    # Access token lifetime in seconds
+    expires_in: Optional[int] = None
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
+    exp: Optional[int] = None
+    # Tokens issued before refresh tokens existed carry neither type nor version
+    type: str = "access"
+    ver: int = 0
+    role: Optional[str] = None
+
+    class Config:
+        # Instances are shared through the verified-token cache
+        frozen = True
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 
 # Vacation Types
 class VacationTypeBase(BaseModel):
@@ -9,6 +9,9 @@ class VacationTypeBase(BaseModel):
     default_days: int = 0
     color: str = "#3B82F6"
     is_active: bool = True
+    # default_days granted at once ("annual") or earned month by month ("monthly")
+    accrual: Literal["annual", "monthly"] = "annual"
+    carry_over_days: int = 0
 
 class VacationTypeCreate(VacationTypeBase):
     pass
@@ -19,6 +22,16 @@ class VacationTypeUpdate(BaseModel):
     default_days: Optional[int] = None
     color: Optional[str] = None
     is_active: Optional[bool] = None
+    accrual: Optional[Literal["annual", "monthly"]] = None
+    carry_over_days: Optional[int] = None
+
+    # Fields are optional to leave them out, not to null them: the columns are NOT NULL
+    @field_validator("*")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be left out, but not set to null")
+        return value
 
 class VacationType(VacationTypeBase):
     id: int
@@ -27,10 +40,11 @@ class VacationType(VacationTypeBase):
         from_attributes = True
 
 # Vacation Balances
+# Days are multiples of 0.25 (stored as quarter-days, see app.utils.units)
 class VacationBalanceBase(BaseModel):
     year: int
-    total_days: int
-    used_days: int = 0
+    total_days: float
+    used_days: float = 0
 
 class VacationBalance(VacationBalanceBase):
     id: int
@@ -46,9 +60,9 @@ class VacationBalanceResponse(BaseModel):
     type_id: int
     type_name: str
     year: int
-    total_days: int
-    used_days: int
-    remaining_days: int
+    total_days: float
+    used_days: float
+    remaining_days: float
 
 # Vacation Requests
 class VacationRequestBase(BaseModel):
@@ -58,7 +72,8 @@ class VacationRequestBase(BaseModel):
     comment: Optional[str] = None
 
 class VacationRequestCreate(VacationRequestBase):
-    pass
+    # Part-day leave: hours off on start_date (== end_date), in quarter-day steps
+    hours: Optional[float] = None
 
 class VacationRequestUpdate(BaseModel):
     pass # Status updates happen via specific endpoints
@@ -66,7 +81,7 @@ class VacationRequestUpdate(BaseModel):
 class VacationRequest(VacationRequestBase):
     id: int
     user_id: int
-    business_days: int
+    business_days: float
     status: str
     created_at: datetime
     reviewer_id: Optional[int] = None
@@ -88,7 +103,7 @@ class VacationRequestResponse(BaseModel):
     type_color: str
     start_date: date
     end_date: date
-    business_days: int
+    business_days: float
     status: str
     comment: Optional[str] = None
     reviewer_id: Optional[int] = None
@@ -0,0 +1,9 @@
+"""Gunicorn worker class for the production profile (see gunicorn.conf.py)."""
+from uvicorn.workers import UvicornWorker as _UvicornWorker
+
+
+class UvicornWorker(_UvicornWorker):
+    # uvicorn's "auto" silently falls back to asyncio/h11 when uvloop or
+    # httptools are missing; in production that is a misconfiguration, so
+    # fail loudly instead
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
@@ -0,0 +1,205 @@
+"""
+Background job handlers. Imported by the API lifespan and by worker.py so that
+both register the same handlers with app.core.jobs.
+
+Handlers don't clear the usage report cache: it lives in each web process,
+which a standalone worker cannot reach, so balance changes made here show up
+in reports within REPORT_CACHE_TTL_SECONDS.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Tuple
+from sqlalchemy import select, update, delete, or_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app import models
+from app.core import accrual, jobs, listing
+from app.core.config import settings
+from app.core.jobs import job
+from app.core.notifications import pack, sender
+from app.core.partitions import overlapping
+from app.core.type_registry import type_registry
+from app.utils.dates import business_day_mask, clear_days, count_business_days, daily_quarters
+from app.utils.units import QUARTERS_PER_DAY
+
+@job("initialize_balances")
+async def initialize_balances(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Create the year's balances for a new user: their entitlement so far under
+    each type's accrual policy (app.core.accrual). Safe to retry: types that already have a balance for the year are skipped.
+    """
+    user = await db.get(models.User, payload["user_id"])
+    if user is None or not user.start_date:
+        return
+    year = payload["year"]
+
+    vacation_types = await type_registry.active(db)
+
+    result = await db.execute(
+        select(models.VacationBalance.type_id)
+        .where(models.VacationBalance.user_id == user.id)
+        .where(models.VacationBalance.year == year)
+    )
+    existing = set(result.scalars().all())
+
+    for vt in vacation_types:
+        if vt.id in existing:
+            continue
+        db.add(models.VacationBalance(
+            user_id=user.id,
+            type_id=vt.id,
+            year=year,
+            total_quarters=accrual.entitlement_quarters(vt, user.start_date, year, as_of=date.today()),
+            used_quarters=0
+        ))
+    await db.flush()
+
+@job("notify_request")
+async def notify_request(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Tell reviewers about a new request, or the requester about a decision,
+    via Telegram for everyone who has a telegram_id: one send_notification
+    job per chat, held back for the batch window.
+    """
+    result = await db.execute(
+        select(models.VacationRequest)
+        .options(
+            selectinload(models.VacationRequest.reviewer),
+            selectinload(models.VacationRequest.user).selectinload(models.User.manager),
+            selectinload(models.VacationRequest.user).selectinload(models.User.approvers),
+        )
+        .where(models.VacationRequest.id == payload["request_id"])
+    )
+    request = result.scalars().first()
+    if request is None:
+        return
+
+    vacation_type = await type_registry.get(db, request.type_id)
+    period = f"{request.start_date.isoformat()} – {request.end_date.isoformat()}"
+    if payload["event"] == "created":
+        recipients = [request.user.manager, *request.user.approvers]
+        text = (
+            f"{request.user.name} requested {vacation_type.name} for {period} "
+            f"({request.business_days:g} business days)."
+        )
+    else:
+        recipients = [request.user]
+        reviewer = request.reviewer.name if request.reviewer else "a reviewer"
+        text = f"Your {vacation_type.name} request for {period} was {payload['event']} by {reviewer}."
+
+    chat_ids = {u.telegram_id for u in recipients if u is not None and u.telegram_id}
+    for chat_id in sorted(chat_ids):
+        jobs.enqueue(
+            db, "send_notification", {"chat_id": chat_id, "text": text},
+            delay=timedelta(seconds=settings.NOTIFY_BATCH_WINDOW_SECONDS),
+            group_key=f"chat:{chat_id}",
+        )
+
+@job("send_notification")
+async def send_notification(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Send one queued notification, with as many of the chat's other queued ones
+    as fit in the same Telegram message. Their jobs are deleted in this
+    transaction, so a message is only gone once Telegram has accepted it; if
+    the send fails this job is retried and the others stay queued.
+    """
+    chat_id = payload["chat_id"]
+    # Rate-limit sleeps happen before any of the chat's rows are locked
+    await sender.wait_turn(chat_id)
+    result = await db.execute(
+        select(models.Job)
+        .where(models.Job.kind == "send_notification")
+        .where(models.Job.status == "pending")
+        .where(models.Job.group_key == f"chat:{chat_id}")
+        .order_by(models.Job.id)
+        .with_for_update(skip_locked=True)
+    )
+    texts, taken = [payload["text"]], []
+    for queued in result.scalars():
+        if len(pack([*texts, queued.payload["text"]])) > 1:
+            break
+        texts.append(queued.payload["text"])
+        taken.append(queued.id)
+
+    await sender.deliver(chat_id, pack(texts)[0])
+    if taken:
+        await db.execute(delete(models.Job).where(models.Job.id.in_(taken)))
+
+@job("recount_business_days")
+async def recount_business_days(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Take new public holidays out of the requests spanning them and give the
+    days back to balances of approved requests, in two bulk UPDATEs (then
+    their request_list rows are rebuilt). Only overlapping requests are read
+    (date range index, partitions of those years). Safe to retry: a day
+    already cleared from a request's mask is not subtracted again.
+    """
+    dates = sorted(date.fromisoformat(d) for d in payload["dates"])
+    requests = models.VacationRequest
+    result = await db.execute(
+        select(
+            requests.id, requests.user_id, requests.type_id, requests.status,
+            requests.start_date, requests.end_date, requests.business_quarters, requests.day_mask,
+        )
+        .where(or_(*(overlapping(requests, d, d) for d in dates)))
+    )
+    rows = result.all()
+    if not rows:
+        return
+
+    # Requests from before day masks existed are recounted from scratch
+    legacy = [row for row in rows if row.day_mask is None]
+    holidays = set()
+    if legacy:
+        result = await db.execute(
+            select(models.PublicHoliday.date)
+            .where(models.PublicHoliday.date >= min(row.start_date for row in legacy))
+            .where(models.PublicHoliday.date <= max(row.end_date for row in legacy))
+        )
+        holidays = set(result.scalars().all()) | set(dates)
+
+    recounted = []
+    refunds: Dict[Tuple[int, int, int], int] = {}
+    for row in rows:
+        if row.day_mask is None:
+            mask = business_day_mask(row.start_date, row.end_date, holidays)
+            per_day = QUARTERS_PER_DAY
+        else:
+            mask = clear_days(row.day_mask, row.start_date, dates)
+            per_day = daily_quarters(row.business_quarters, row.day_mask)
+        if mask == row.day_mask:
+            continue
+        quarters = count_business_days(mask) * per_day
+        recounted.append({"b_id": row.id, "day_mask": mask, "business_quarters": quarters})
+        if row.status == "approved" and quarters != row.business_quarters:
+            # Same balance year as approve_request charged
+            key = (row.user_id, row.type_id, row.start_date.year)
+            refunds[key] = refunds.get(key, 0) + row.business_quarters - quarters
+
+    if recounted:
+        table = requests.__table__
+        await db.execute(update(table).where(table.c.id == bindparam("b_id")), recounted)
+        await listing.refresh(db, [change["b_id"] for change in recounted])
+    if refunds:
+        table = models.VacationBalance.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.user_id == bindparam("b_user_id"))
+            .where(table.c.type_id == bindparam("b_type_id"))
+            .where(table.c.year == bindparam("b_year"))
+            .values(used_quarters=table.c.used_quarters - bindparam("b_quarters")),
+            [
+                {"b_user_id": user_id, "b_type_id": type_id, "b_year": year, "b_quarters": refund}
+                for (user_id, type_id, year), refund in refunds.items()
+            ],
+        )
+
+@job("accrue_balances")
+async def accrue_balances(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Materialize entitlements as of payload["as_of"] (default today) for every
+    balance of that year; see accrual.materialize. Enqueued monthly by
+    accrue.py. Safe to retry: it recomputes rather than adds.
+    """
+    as_of = date.fromisoformat(payload["as_of"]) if payload.get("as_of") else date.today()
+    await accrual.materialize(db, as_of)
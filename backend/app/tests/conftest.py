@@ -1,35 +1,203 @@
 import asyncio
+import hashlib
+import os
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+from sqlalchemy.engine import make_url
+
+# Tests never touch the DATABASE_URL of the environment they run in.
+# TEST_DATABASE_URL picks the backend:
+#   unset                      SQLite in memory, one database per process
+#   sqlite+aiosqlite:///path   a SQLite file per xdist worker
+#   postgresql://.../name      name_<worker> per xdist worker, cloned from name_template,
+#                              which is built once with `alembic upgrade head`
+# Run in parallel with `pytest -n auto` (pytest-xdist).
+TEST_DATABASE_URL = make_url(os.getenv("TEST_DATABASE_URL", "sqlite+aiosqlite://"))
+WORKER = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+
+if TEST_DATABASE_URL.get_backend_name() == "postgresql":
+    TEMPLATE_DB = f"{TEST_DATABASE_URL.database}_template"
+    WORKER_URL = TEST_DATABASE_URL.set(drivername="postgresql+asyncpg", database=f"{TEST_DATABASE_URL.database}_{WORKER}")
+elif TEST_DATABASE_URL.database not in (None, "", ":memory:"):
+    path = Path(TEST_DATABASE_URL.database)
+    WORKER_URL = TEST_DATABASE_URL.set(database=str(path.with_name(f"{path.stem}_{WORKER}{path.suffix}")))
+else:
+    WORKER_URL = TEST_DATABASE_URL
+
+# Before anything imports app.core.config
+os.environ["DATABASE_URL"] = WORKER_URL.render_as_string(hide_password=False)
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# bcrypt's minimum cost: fixtures hash in ~1ms instead of ~250ms
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from app.database import Base, engine, get_db
 from app.main import app
-from app.core.config import settings
 from app import models
-from app.core import security
+from app.core import rate_limit, security
+from app.core.type_registry import type_registry
+from app.core.revocation import revocations
 
-# Use the same database for tests but with a different schema or just clean it up
-# For simplicity, we use the same DB but wrap each test in a transaction
-DATABASE_URL = settings.DATABASE_URL
-if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
-
-engine = create_async_engine(DATABASE_URL)
 TestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Serializes template builds between xdist workers
+TEMPLATE_LOCK_ID = 727_100_002
+
+def migrations_hash() -> str:
+    digest = hashlib.sha256()
+    for path in sorted((BACKEND_DIR / "alembic" / "versions").glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def migrate(url: str) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.attributes["database_url"] = url
+    command.upgrade(config, "head")
+
+async def create_worker_database() -> None:
+    """
+    (Re)create this worker's Postgres database as a copy of the migrated
+    template. The template is rebuilt only when the migrations changed, so
+    a run costs one file-level copy per worker instead of running every
+    migration.
+    """
+    import anyio
+
+    admin = create_async_engine(
+        TEST_DATABASE_URL.set(drivername="postgresql+asyncpg"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    fingerprint = migrations_hash()
+    async with admin.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": TEMPLATE_LOCK_ID})
+        try:
+            current = await conn.scalar(
+                text("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = :name"),
+                {"name": TEMPLATE_DB},
+            )
+            if current != fingerprint:
+                await conn.execute(text(f'DROP DATABASE IF EXISTS "{TEMPLATE_DB}"'))
+                await conn.execute(text(f'CREATE DATABASE "{TEMPLATE_DB}"'))
+                template_url = WORKER_URL.set(database=TEMPLATE_DB).render_as_string(hide_password=False)
+                await anyio.to_thread.run_sync(migrate, template_url)
+                await conn.execute(text(f"COMMENT ON DATABASE \"{TEMPLATE_DB}\" IS '{fingerprint}'"))
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_URL.database}"'))
+            await conn.execute(text(f'CREATE DATABASE "{WORKER_URL.database}" TEMPLATE "{TEMPLATE_DB}"'))
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": TEMPLATE_LOCK_ID})
+    await admin.dispose()
+
+async def drop_worker_database() -> None:
+    admin = create_async_engine(
+        TEST_DATABASE_URL.set(drivername="postgresql+asyncpg"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    async with admin.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_URL.database}"'))
+    await admin.dispose()
+
+# An HTTP call running the same statement this many times is an N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "allow_repeated_queries: don't fail on N+1 query patterns")
+
+class QueryRecorder:
+    """
+    SQL statements issued by each HTTP call a test makes through `client`.
+
+    Every call is checked for N+1 patterns: the same statement (parameters
+    aside) run N_PLUS_ONE_THRESHOLD or more times, e.g. a lazy load per row.
+    """
+
+    def __init__(self, check_repeats: bool = True):
+        self.check_repeats = check_repeats
+        self.calls: List[Tuple[str, List[str]]] = []
+        self._current = None
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._current is not None:
+            self._current.append(statement)
+
+    async def _on_request(self, request):
+        self._current = []
+
+    async def _on_response(self, response):
+        statements, self._current = self._current or [], None
+        call = f"{response.request.method} {response.request.url.path}"
+        self.calls.append((call, statements))
+        repeated = self.repeated(statements)
+        if self.check_repeats and repeated:
+            details = "\n".join(f"  {count}x {sql}" for sql, count in repeated.items())
+            raise AssertionError(f"N+1 queries in {call}:\n{details}")
+
+    @staticmethod
+    def repeated(statements: List[str]) -> Dict[str, int]:
+        counts = Counter(s for s in statements if not s.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK TO")))
+        return {sql: count for sql, count in counts.items() if count >= N_PLUS_ONE_THRESHOLD}
+
+    @property
+    def last(self) -> List[str]:
+        """Statements of the most recent HTTP call."""
+        return self.calls[-1][1] if self.calls else []
+
+    @contextmanager
+    def assert_max_queries(self, limit: int):
+        """Fail if the HTTP calls made inside the block issue more than `limit` statements."""
+        start = len(self.calls)
+        yield
+        statements = [sql for _, calls in self.calls[start:] for sql in calls]
+        assert len(statements) <= limit, (
+            f"{len(statements)} queries, expected at most {limit}:\n" + "\n".join(f"  {sql}" for sql in statements)
+        )
+
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
 
 @pytest.fixture(scope="session", autouse=True)
-async def db_engine():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def db_engine(anyio_backend):
+    # Requesting anyio_backend makes this run in the test event loop even when
+    # the first test of a worker is a plain function
+    if WORKER_URL.get_backend_name() == "postgresql":
+        await create_worker_database()
+    else:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
     yield engine
-    # In a real environment we might want to keep the DB, but for tests we can clean up
-    # However, dropping all might be risky if we share the DB with dev
-    # For now let's just make sure we are in a clean state if possible or just rely on transactions
+    await engine.dispose()
+    if WORKER_URL.get_backend_name() == "postgresql":
+        await drop_worker_database()
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Every test starts with full rate limit buckets."""
+    for limit in rate_limit.limits:
+        limit.reset()
+
+@pytest.fixture(autouse=True)
+def reset_revocations():
+    """Revocations recorded by one test must not leak into the next."""
+    revocations.clear()
+    yield
+    revocations.clear()
+
+@pytest.fixture(autouse=True)
+def reset_type_registry():
+    """Vacation types loaded by one test are rolled back with its transaction."""
+    type_registry.invalidate()
+    yield
+    type_registry.invalidate()
 
 @pytest.fixture
 async def db():
@@ -41,12 +209,21 @@ async def db():
         await transaction.rollback()
 
 @pytest.fixture
-async def client(db):
+def queries(request):
+    """Records the SQL of every HTTP call made through `client`, see QueryRecorder."""
+    recorder = QueryRecorder(check_repeats=request.node.get_closest_marker("allow_repeated_queries") is None)
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder._on_execute)
+    yield recorder
+    event.remove(engine.sync_engine, "before_cursor_execute", recorder._on_execute)
+
+@pytest.fixture
+async def client(db, queries):
     def override_get_db():
         yield db
 
     app.dependency_overrides[get_db] = override_get_db
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    hooks = {"request": [queries._on_request], "response": [queries._on_response]}
+    async with AsyncClient(app=app, base_url="http://test", event_hooks=hooks) as ac:
         yield ac
     app.dependency_overrides.clear()
 
@@ -80,11 +257,11 @@ async def admin_user(db: AsyncSession):
 
 @pytest.fixture
 async def normal_user_token(normal_user):
-    return security.create_access_token(normal_user.id)
+    return security.create_access_token(normal_user.id, role=normal_user.role)
 
 @pytest.fixture
 async def admin_user_token(admin_user):
-    return security.create_access_token(admin_user.id)
+    return security.create_access_token(admin_user.id, role=admin_user.role)
 
 @pytest.fixture
 async def auth_client(client, normal_user_token):
@@ -0,0 +1,85 @@
+"""Tests for leave accrual: the closed-form entitlement and the monthly batch job."""
+import pytest
+from datetime import date
+from httpx import AsyncClient
+from sqlalchemy import select
+from app import models
+from app import tasks  # registers job handlers
+from app.core import accrual
+
+
+def months_by_loop(policy, start_date, year, as_of):
+    """The entitlement rule month by month, to check the closed form against."""
+    months = 0
+    for month in range(1, 13):
+        joined = start_date is None or (start_date.year, start_date.month) <= (year, month)
+        if policy == accrual.MONTHLY:
+            reached = (year, month) <= (as_of.year, as_of.month)
+        else:
+            reached = as_of.year >= year
+        months += joined and reached
+    return months
+
+
+def test_months_earned_matches_month_by_month_rule():
+    """Test months_earned against the month-by-month definition for many dates."""
+    starts = [None, date(2024, 6, 15), date(2025, 1, 1), date(2025, 7, 31), date(2025, 12, 1), date(2026, 2, 2)]
+    as_ofs = [date(2024, 12, 31), date(2025, 1, 1), date(2025, 6, 30), date(2025, 7, 1), date(2025, 12, 31), date(2026, 3, 1)]
+    for policy in (accrual.ANNUAL, accrual.MONTHLY):
+        for start in starts:
+            for as_of in as_ofs:
+                assert accrual.months_earned(policy, start, 2025, as_of) == months_by_loop(policy, start, 2025, as_of), (policy, start, as_of)
+
+
+@pytest.mark.anyio
+async def test_monthly_balance_reported_as_accrued(auth_client: AsyncClient, db, normal_user: models.User):
+    """Test read_user_balance reports a monthly type's entitlement with capped carry-over, not the stored total."""
+    year = date.today().year - 1
+    vtype = models.VacationType(name="Accruing", color="green", default_days=24, accrual="monthly", carry_over_days=5)
+    db.add(vtype)
+    await db.commit()
+    db.add_all([
+        models.VacationBalance(user_id=normal_user.id, type_id=vtype.id, year=year - 1, total_days=20, used_days=12),
+        models.VacationBalance(user_id=normal_user.id, type_id=vtype.id, year=year, total_days=0, used_days=1.5),
+    ])
+    await db.commit()
+
+    response = await auth_client.get(f"/api/v1/users/{normal_user.id}/balance?year={year}")
+    assert response.status_code == 200
+    [balance] = response.json()
+    # A full past year (24) plus 5 of the 8 days left the year before
+    assert (balance["total_days"], balance["used_days"], balance["remaining_days"]) == (29, 1.5, 27.5)
+
+
+@pytest.mark.anyio
+async def test_accrue_balances_job(db, normal_user: models.User):
+    """Test the batch job creates and sets balances for every active user like the closed form."""
+    monthly = models.VacationType(name="Monthly", default_days=12, accrual="monthly", carry_over_days=5)
+    annual = models.VacationType(name="Annual", default_days=24)
+    joiner = models.User(email="joiner@example.com", password_hash="x", name="Joiner", role="employee", start_date=date(2026, 3, 10))
+    leaver = models.User(email="leaver@example.com", password_hash="x", name="Leaver", role="employee", is_active=False)
+    db.add_all([monthly, annual, joiner, leaver])
+    await db.commit()
+    db.add(models.VacationBalance(user_id=normal_user.id, type_id=monthly.id, year=2025, total_days=12, used_days=2))
+    await db.commit()
+    ids = {"user": normal_user.id, "joiner": joiner.id, "leaver": leaver.id, "monthly": monthly.id, "annual": annual.id}
+
+    for _ in range(2):  # a rerun changes nothing
+        await tasks.accrue_balances(db, {"as_of": "2026-04-15"})
+        await db.commit()
+
+    db.expire_all()
+    result = await db.execute(select(models.VacationBalance).where(models.VacationBalance.year == 2026))
+    totals = {(b.user_id, b.type_id): b.total_days for b in result.scalars()}
+    assert totals[(ids["user"], ids["monthly"])] == 4 + 5  # Jan-Apr, plus 5 of 10 days carried over
+    assert totals[(ids["user"], ids["annual"])] == 24
+    assert totals[(ids["joiner"], ids["monthly"])] == 2  # Mar-Apr
+    assert totals[(ids["joiner"], ids["annual"])] == 20  # 10 of 12 months
+    assert not any(user_id == ids["leaver"] for user_id, _ in totals)
+
+    # The same numbers as the per-balance calculation
+    joiner = await db.get(models.User, ids["joiner"])
+    for type_id in (ids["monthly"], ids["annual"]):
+        vtype = await db.get(models.VacationType, type_id)
+        expected = accrual.entitlement_quarters(vtype, joiner.start_date, 2026, date(2026, 4, 15))
+        assert totals[(ids["joiner"], type_id)] * 4 == expected
@@ -0,0 +1,98 @@
+"""Tests for the audit trail."""
+import pytest
+from datetime import date
+from httpx import AsyncClient
+from sqlalchemy import select
+from app import models
+
+
+@pytest.fixture
+async def pending_request(db, normal_user: models.User):
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    req = models.VacationRequest(
+        user_id=normal_user.id, type_id=vtype.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    db.add(req)
+    await db.commit()
+    return req
+
+
+@pytest.mark.anyio
+async def test_request_transitions_are_audited(admin_client: AsyncClient, db, admin_user, pending_request):
+    """Test approving a request records who changed what, from and to."""
+    response = await admin_client.post(f"/api/v1/requests/{pending_request.id}/approve", json={})
+    assert response.status_code == 200
+
+    events = (await db.execute(select(models.AuditEvent))).scalars().all()
+    assert len(events) == 1
+    event = events[0]
+    assert (event.actor_id, event.action, event.entity_type, event.entity_id) == (
+        admin_user.id, "request.approved", "vacation_requests", pending_request.id
+    )
+    assert event.changes["status"] == {"old": "pending", "new": "approved"}
+    assert event.changes["reviewer_id"] == {"old": None, "new": admin_user.id}
+
+
+@pytest.mark.anyio
+async def test_user_update_is_audited(admin_client: AsyncClient, db, normal_user: models.User):
+    """Test role changes are recorded, unchanged fields and passwords are not."""
+    response = await admin_client.put(f"/api/v1/users/{normal_user.id}", json={
+        "role": "manager", "name": normal_user.name, "password": "secret",
+    })
+    assert response.status_code == 200
+
+    event = (await db.execute(select(models.AuditEvent))).scalars().one()
+    assert event.action == "user.updated"
+    assert event.changes == {"role": {"old": "employee", "new": "manager"}}
+
+
+@pytest.mark.anyio
+async def test_created_request_gets_its_id(auth_client: AsyncClient, db, pending_request):
+    """Test events for new rows reference the id assigned at flush."""
+    response = await auth_client.post("/api/v1/requests/", json={
+        "type_id": pending_request.type_id,
+        "start_date": "2026-08-03",
+        "end_date": "2026-08-04",
+    })
+    assert response.status_code == 200
+
+    event = (await db.execute(select(models.AuditEvent))).scalars().one()
+    assert event.entity_id == response.json()["id"]
+    assert event.changes["start_date"] == {"old": None, "new": "2026-08-03"}
+
+
+@pytest.mark.anyio
+async def test_audit_cursor_pagination(admin_client: AsyncClient, db, pending_request):
+    """Test pages walk backwards through history without overlap."""
+    db.add_all([
+        models.AuditEvent(action="test", entity_type="vacation_requests", entity_id=pending_request.id, changes={})
+        for _ in range(5)
+    ])
+    db.add(models.AuditEvent(action="test", entity_type="users", entity_id=1, changes={}))
+    await db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"entity_type": "vacation_requests", "entity_id": pending_request.id, "limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await admin_client.get("/api/v1/audit/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(e["id"] for e in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_audit_as_employee(auth_client: AsyncClient):
+    """Test the audit trail is admin-only."""
+    response = await auth_client.get("/api/v1/audit/")
+    assert response.status_code == 400
@@ -1,8 +1,16 @@
 """Tests for authentication endpoints."""
+import asyncio
 import pytest
+from datetime import datetime, timedelta
+from jose import ExpiredSignatureError, JWTError, jwt
 from httpx import AsyncClient
+from sqlalchemy import delete
 from app import models
+from app.api.v1 import auth
 from app.core import security
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.main import app
 
 
 @pytest.mark.anyio
@@ -83,3 +91,232 @@ async def test_login_inactive_user(client: AsyncClient, db):
         data={"username": "inactive@example.com", "password": "password"}
     )
     assert response.status_code == 400
+
+
+@pytest.fixture
+def stronger_hashing(monkeypatch):
+    """Raise the configured bcrypt cost above the one the test fixtures hash with."""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+    security._pwd_context.cache_clear()
+    yield
+    monkeypatch.undo()
+    security._pwd_context.cache_clear()
+
+
+@pytest.mark.anyio
+async def test_login_rehashes_outdated_hash(client: AsyncClient, db, normal_user: models.User, stronger_hashing):
+    """Test a valid login replaces a hash weaker than configured, and only then."""
+    old_hash = normal_user.password_hash
+    assert old_hash.startswith("$2b$04$")
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": normal_user.email, "password": "wrongpassword"}
+    )
+    assert response.status_code == 401
+    await db.refresh(normal_user)
+    assert normal_user.password_hash == old_hash
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": normal_user.email, "password": "testpassword"}
+    )
+    assert response.status_code == 200
+    await db.refresh(normal_user)
+    assert normal_user.password_hash.startswith("$2b$05$")
+    assert security.verify_password("testpassword", normal_user.password_hash)
+
+    # Already up to date: left alone
+    upgraded = normal_user.password_hash
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": normal_user.email, "password": "testpassword"}
+    )
+    assert response.status_code == 200
+    await db.refresh(normal_user)
+    assert normal_user.password_hash == upgraded
+
+
+@pytest.mark.anyio
+async def test_refresh_token_rotation(client: AsyncClient, normal_user: models.User):
+    """Test refresh tokens are exchanged for a new pair and work only once."""
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "testuser@example.com", "password": "testpassword"}
+    )
+    tokens = response.json()
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] == settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    me = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+
+    # Replaying the used token looks like theft: every session of the user ends
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    me = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 401
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_concurrent_refreshes_detect_reuse(db, monkeypatch):
+    """Test two refreshes racing with one token: only one succeeds and the user is signed out."""
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("needs concurrent transactions on separate connections")
+
+    # Committed for real, so both requests' own sessions see it
+    async with AsyncSessionLocal() as setup:
+        user = models.User(email="racer@example.com", password_hash="x", name="Racer")
+        setup.add(user)
+        await setup.commit()
+        tokens = await auth.issue_tokens(setup, user)
+
+    # Hold whichever request gets through first until the other has caught up,
+    # or for half a second when it is blocked waiting on the first
+    arrived, both = [], asyncio.Event()
+    issue_tokens = auth.issue_tokens
+
+    async def rendezvous(session, racer):
+        arrived.append(racer.id)
+        if len(arrived) == 2:
+            both.set()
+        try:
+            await asyncio.wait_for(both.wait(), timeout=0.5)
+        except asyncio.TimeoutError:
+            pass
+        return await issue_tokens(session, racer)
+
+    monkeypatch.setattr(auth, "issue_tokens", rendezvous)
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as racing:
+            refresh = {"refresh_token": tokens["refresh_token"]}
+            responses = await asyncio.gather(
+                racing.post("/api/v1/auth/refresh", json=refresh),
+                racing.post("/api/v1/auth/refresh", json=refresh),
+            )
+        assert sorted(r.status_code for r in responses) == [200, 401]
+        async with AsyncSessionLocal() as check:
+            assert (await check.get(models.User, user.id)).token_version == 1
+    finally:
+        async with AsyncSessionLocal() as cleanup:
+            await cleanup.execute(delete(models.RefreshToken).where(models.RefreshToken.user_id == user.id))
+            await cleanup.execute(delete(models.user_closure).where(models.user_closure.c.descendant_id == user.id))
+            await cleanup.execute(delete(models.User).where(models.User.id == user.id))
+            await cleanup.commit()
+
+
+@pytest.mark.anyio
+async def test_access_token_cannot_refresh(client: AsyncClient, normal_user_token: str):
+    """Test only refresh tokens are accepted by /auth/refresh, and vice versa."""
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": normal_user_token})
+    assert response.status_code == 401
+
+    refresh_token, _, _ = security.create_refresh_token(1)
+    response = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {refresh_token}"})
+    assert response.status_code == 403
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("sub", [None, "not-a-number"])
+async def test_refresh_token_without_valid_subject(client: AsyncClient, sub):
+    """Test a signed refresh token with a missing or malformed subject is a 401, not a 500."""
+    claims = {"exp": datetime.utcnow() + timedelta(minutes=5), "type": security.REFRESH, "jti": "abc"}
+    if sub is not None:
+        claims["sub"] = sub
+    token = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_deactivation_revokes_tokens(client: AsyncClient, normal_user_token: str, admin_user_token: str, normal_user: models.User):
+    """Test a deactivated user's tokens stop working immediately, even where no user row is loaded."""
+    user_headers = {"Authorization": f"Bearer {normal_user_token}"}
+    assert (await client.get("/api/v1/requests/", headers=user_headers)).status_code == 200
+
+    response = await client.delete(
+        f"/api/v1/users/{normal_user.id}", headers={"Authorization": f"Bearer {admin_user_token}"}
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/api/v1/requests/", headers=user_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+
+@pytest.mark.anyio
+async def test_role_change_revokes_tokens(client: AsyncClient, normal_user_token: str, admin_user_token: str, normal_user: models.User):
+    """Test tokens carrying a stale role are rejected."""
+    response = await client.put(
+        f"/api/v1/users/{normal_user.id}",
+        json={"role": "manager"},
+        headers={"Authorization": f"Bearer {admin_user_token}"},
+    )
+    assert response.status_code == 200
+    response = await client.get("/api/v1/requests/", headers={"Authorization": f"Bearer {normal_user_token}"})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_expired_token(client: AsyncClient, normal_user: models.User):
+    """Test expired access tokens get 401 so clients know to refresh."""
+    token = security.create_access_token(normal_user.id, expires_delta=timedelta(seconds=-1), role="employee")
+    response = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has expired"
+
+
+@pytest.mark.anyio
+async def test_revocations_reload_from_database(db, normal_user: models.User):
+    """Test other processes' revocations are picked up from users.token_version."""
+    from app.core.revocation import revocations
+
+    normal_user.token_version = 3
+    await db.commit()
+    await revocations.load(db)
+    assert revocations.is_revoked(normal_user.id, 2)
+    assert not revocations.is_revoked(normal_user.id, 3)
+
+
+def test_verified_tokens_are_cached(monkeypatch):
+    """Test a token is verified once, then served from the cache until it expires."""
+    calls = []
+    decode = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda token: calls.append(token) or decode(token))
+    monkeypatch.setattr(security, "_token_cache", security.TTLCache(maxsize=10))
+
+    token = security.create_access_token(7, role="manager")
+    first = security.read_token(token)
+    assert security.read_token(token) is first
+    assert (first.sub, first.role, first.type) == ("7", "manager", "access")
+    assert len(calls) == 1
+
+    # Already expired tokens are rejected and never cached
+    expired = security.create_access_token(7, expires_delta=timedelta(seconds=-1), role="manager")
+    for _ in range(2):
+        with pytest.raises(ExpiredSignatureError):
+            security.read_token(expired)
+    assert len(security._token_cache) == 1
+
+
+@pytest.mark.parametrize("backend", ["jose", "pyjwt"])
+def test_jwt_backends_agree(monkeypatch, backend):
+    """Test both verification backends accept the same tokens and raise the same errors."""
+    if backend == "pyjwt":
+        pyjwt = pytest.importorskip("jwt")
+        monkeypatch.setattr(security, "_pyjwt", pyjwt)
+    else:
+        monkeypatch.setattr(security, "_pyjwt", None)
+
+    token = security.create_access_token(3, role="employee", version=2)
+    assert security.decode_token(token)["ver"] == 2
+    with pytest.raises(ExpiredSignatureError):
+        security.decode_token(security.create_access_token(3, expires_delta=timedelta(seconds=-1)))
+    with pytest.raises(JWTError):
+        security.decode_token(token[:-2] + "xx")
@@ -113,3 +113,28 @@ async def test_calendar_only_shows_approved(auth_client: AsyncClient, db, normal
     # All returned requests should be approved
     for item in data:
         assert item["status"] == "approved"
+
+
+@pytest.mark.anyio
+async def test_calendar_filtered_by_manager_subtree(admin_client: AsyncClient, db, normal_user: models.User):
+    """Test manager_id narrows the calendar to everyone below the manager, without the manager."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    manager = models.User(email="boss@example.com", password_hash="x", name="Boss", role="manager")
+    db.add_all([vtype, manager])
+    await db.commit()
+    report = models.User(email="report@example.com", password_hash="x", name="Report", manager_id=manager.id)
+    db.add(report)
+    await db.commit()
+
+    for user in (manager, report, normal_user):
+        db.add(models.VacationRequest(
+            user_id=user.id, type_id=vtype.id, business_days=1, status="approved",
+            start_date=date(2026, 6, 1), end_date=date(2026, 6, 1),
+        ))
+    await db.commit()
+
+    response = await admin_client.get(
+        f"/api/v1/calendar/?start_date=2026-06-01&end_date=2026-06-30&manager_id={manager.id}"
+    )
+    assert response.status_code == 200
+    assert {entry["user_id"] for entry in response.json()} == {report.id}
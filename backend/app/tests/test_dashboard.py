@@ -0,0 +1,75 @@
+"""Tests for the aggregated dashboard endpoint."""
+import pytest
+from datetime import date
+from httpx import AsyncClient
+from app import models
+
+
+@pytest.fixture
+async def vacation_type(db):
+    """Create a vacation type for testing."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    await db.refresh(vtype)
+    return vtype
+
+
+@pytest.mark.anyio
+async def test_dashboard_combines_page_data(auth_client: AsyncClient, db, queries, normal_user: models.User, vacation_type: models.VacationType):
+    """Test dashboard returns user, balances, requests, types and holidays in one payload."""
+    db.add_all([
+        models.VacationBalance(user_id=normal_user.id, type_id=vacation_type.id, year=2026, total_days=20, used_days=5),
+        models.VacationRequest(
+            user_id=normal_user.id,
+            type_id=vacation_type.id,
+            start_date=date(2026, 7, 1),
+            end_date=date(2026, 7, 3),
+            business_days=3,
+            status="pending"
+        ),
+        models.PublicHoliday(date=date(2026, 1, 1), name="New Year", year=2026),
+    ])
+    await db.commit()
+
+    with queries.assert_max_queries(8):
+        response = await auth_client.get("/api/v1/dashboard/?year=2026")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["user"]["id"] == normal_user.id
+    assert data["year"] == 2026
+    assert data["balances"][0]["remaining_days"] == 15
+    assert data["requests"][0]["type_name"] == "Annual Leave"
+    assert any(t["id"] == vacation_type.id for t in data["vacation_types"])
+    assert [h["name"] for h in data["holidays"]] == ["New Year"]
+    # Employees have nothing to approve
+    assert data["pending_approvals"] == []
+
+
+@pytest.mark.anyio
+async def test_dashboard_pending_approvals_for_admin(admin_client: AsyncClient, db, normal_user: models.User, vacation_type: models.VacationType):
+    """Test admin dashboard lists other users' pending requests."""
+    req = models.VacationRequest(
+        user_id=normal_user.id,
+        type_id=vacation_type.id,
+        start_date=date(2026, 7, 1),
+        end_date=date(2026, 7, 3),
+        business_days=3,
+        status="pending"
+    )
+    db.add(req)
+    await db.commit()
+    await db.refresh(req)
+
+    response = await admin_client.get("/api/v1/dashboard/?year=2026")
+    assert response.status_code == 200
+    data = response.json()
+    assert req.id in [r["id"] for r in data["pending_approvals"]]
+    assert data["requests"] == []
+
+
+@pytest.mark.anyio
+async def test_dashboard_requires_auth(client: AsyncClient):
+    """Test dashboard is not available anonymously."""
+    response = await client.get("/api/v1/dashboard/")
+    assert response.status_code == 401
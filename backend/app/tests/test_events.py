@@ -0,0 +1,160 @@
+"""Tests for the live event stream."""
+import asyncio
+import json
+import time
+import pytest
+from datetime import date
+from fastapi.dependencies.utils import get_dependant
+from httpx import AsyncClient
+from sqlalchemy import text
+from app import models
+from app.api import deps
+from app.core import security
+from app.core.revocation import revocations
+from app.core.events import EventBroker, PostgresFanout, broker, sse_stream, topics_for_user
+from app.database import get_db
+
+
+@pytest.mark.anyio
+async def test_broker_delivers_once_per_subscriber():
+    """Test a subscriber on several matching topics receives an event once."""
+    local = EventBroker(queue_size=2)
+    with local.subscribe({"user:1", "all"}) as subscription, local.subscribe({"user:2"}) as other:
+        local.publish_local(["user:1", "all"], {"type": "a"})
+        assert await subscription.get(timeout=0.01) == {"type": "a"}
+        assert await subscription.get(timeout=0.01) is None
+        assert await other.get(timeout=0.01) is None
+
+        # A slow consumer loses the oldest events, not the newest
+        for n in range(3):
+            local.publish_local(["user:1"], {"type": str(n)})
+        assert [(await subscription.get(timeout=0.01))["type"] for _ in range(2)] == ["1", "2"]
+    assert local.subscriber_count() == 0
+
+
+@pytest.mark.anyio
+async def test_approval_reaches_owner_and_manager(admin_client: AsyncClient, db):
+    """Test approving a request publishes to the owner's and the manager's streams."""
+    manager = models.User(email="boss@example.com", password_hash="x", name="Boss", role="manager")
+    db.add(manager)
+    await db.commit()
+    employee = models.User(email="emp@example.com", password_hash="x", name="Emp", manager_id=manager.id)
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add_all([employee, vtype])
+    await db.commit()
+    req = models.VacationRequest(
+        user_id=employee.id, type_id=vtype.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    db.add(req)
+    await db.commit()
+
+    with broker.subscribe(topics_for_user(employee.id, employee.role)) as own, \
+            broker.subscribe(topics_for_user(manager.id, manager.role)) as team, \
+            broker.subscribe(topics_for_user(999, "employee")) as stranger:
+        response = await admin_client.post(f"/api/v1/requests/{req.id}/approve", json={})
+        assert response.status_code == 200
+
+        for subscription in (own, team):
+            event = await subscription.get(timeout=0.1)
+            assert event["type"] == "request.approved"
+            assert event["request"]["id"] == req.id
+            assert event["request"]["status"] == "approved"
+        assert await stranger.get(timeout=0.01) is None
+
+
+@pytest.mark.anyio
+async def test_sse_stream_format():
+    """Test events are framed as SSE messages with keep-alives in between."""
+    async def connected():
+        return False
+
+    stream = sse_stream({"user:42"}, connected, heartbeat=0.01)
+    assert await stream.__anext__() == ": connected\n\n"
+    assert await stream.__anext__() == ": keep-alive\n\n"
+
+    broker.publish_local(["user:42"], {"type": "request.created", "request": {"id": 7}})
+    chunk = await stream.__anext__()
+    assert chunk.startswith("event: request.created\ndata: ")
+    assert json.loads(chunk.split("data: ", 1)[1]) == {"type": "request.created", "request": {"id": 7}}
+    await stream.aclose()
+    assert broker.subscriber_count() == 0
+
+
+@pytest.mark.anyio
+async def test_stream_accepts_query_token(db, normal_user: models.User):
+    """Test EventSource clients can authenticate with ?token= instead of a header."""
+    token = security.create_access_token(normal_user.id, role=normal_user.role)
+    principal = await deps.get_current_principal_for_stream(header_token=None, token=token)
+    assert principal.id == normal_user.id
+
+
+@pytest.mark.anyio
+async def test_stream_does_not_hold_a_request_session():
+    """Test the stream's auth dependency doesn't keep a get_db session open for the stream's lifetime."""
+    def calls(dependant):
+        for dependency in dependant.dependencies:
+            yield dependency.call
+            yield from calls(dependency)
+
+    dependant = get_dependant(path="/", call=deps.get_current_principal_for_stream)
+    assert get_db not in set(calls(dependant))
+
+
+@pytest.mark.anyio
+async def test_postgres_fanout_reconnects(db):
+    """Test the LISTEN connection comes back after the server drops it, and relays again."""
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("LISTEN/NOTIFY needs Postgres")
+
+    local = EventBroker()
+    fanout = PostgresFanout(local, retry_interval=0.05)
+    await fanout.start()
+    try:
+        await asyncio.wait_for(fanout.connected.wait(), timeout=5)
+        first = fanout.connection
+        await db.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": first.get_server_pid()})
+        for _ in range(200):
+            if fanout.connection is not None and fanout.connection is not first:
+                break
+            await asyncio.sleep(0.025)
+        assert fanout.connection is not None and fanout.connection is not first
+
+        with local.subscribe({"user:1"}) as subscription:
+            await fanout.notify(["user:1"], {"type": "request.created"})
+            assert await subscription.get(timeout=2) == {"type": "request.created"}
+    finally:
+        await fanout.stop()
+
+
+@pytest.mark.anyio
+async def test_stream_requires_auth(client: AsyncClient):
+    """Test the stream rejects anonymous clients."""
+    response = await client.get("/api/v1/events/")
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_stream_closes_when_token_expires_or_is_revoked(db, normal_user: models.User):
+    """Test an open stream ends at the first heartbeat after its token stops being valid."""
+    async def connected():
+        return False
+
+    token = security.create_access_token(normal_user.id, role=normal_user.role)
+    principal = await deps.get_current_principal_for_stream(header_token=token, token=None)
+    stream = sse_stream({f"user:{normal_user.id}"}, connected, heartbeat=0.01, still_authorized=principal.still_valid)
+    assert await stream.__anext__() == ": connected\n\n"
+    assert await stream.__anext__() == ": keep-alive\n\n"
+
+    revocations.revoke(normal_user.id, principal.token_version + 1)
+    try:
+        assert (await stream.__anext__()).startswith("event: stream.closed\n")
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+    finally:
+        revocations.clear()
+    assert broker.subscriber_count() == 0
+
+    expired = deps.Principal(id=normal_user.id, role=normal_user.role, token_expires_at=int(time.time()) - 1)
+    assert not expired.still_valid()
+    assert principal.still_valid()
@@ -1,8 +1,12 @@
 """Tests for public holiday endpoints."""
 import pytest
+from contextlib import asynccontextmanager
 from datetime import date
 from httpx import AsyncClient
+from sqlalchemy import select
 from app import models
+from app import tasks  # registers job handlers
+from app.core import jobs
 
 
 @pytest.mark.anyio
@@ -76,3 +80,77 @@ async def test_holidays_ordered_by_date(auth_client: AsyncClient, db):
     # Verify they're in chronological order
     dates = [h["date"] for h in data]
     assert dates == sorted(dates)
+
+
+@pytest.mark.anyio
+async def test_new_holiday_applies_to_next_request(admin_client: AsyncClient, db):
+    """Test a holiday counts for the next request, including one added by another process."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    week = {"type_id": vtype.id, "start_date": "2026-08-03", "end_date": "2026-08-07"}
+
+    response = await admin_client.post("/api/v1/requests/", json=week)
+    assert response.json()["business_days"] == 5
+
+    response = await admin_client.post("/api/v1/holidays/", json={
+        "date": "2026-08-05", "name": "Midweek Holiday", "year": 2026,
+    })
+    assert response.status_code == 200
+
+    response = await admin_client.post("/api/v1/requests/", json=week)
+    assert response.json()["business_days"] == 4
+
+    # Written straight to the table, as another API process would
+    db.add(models.PublicHoliday(date=date(2026, 8, 6), name="Another Holiday", year=2026))
+    await db.commit()
+    response = await admin_client.post("/api/v1/requests/", json=week)
+    assert response.json()["business_days"] == 3
+
+
+@pytest.mark.anyio
+async def test_new_holiday_recounts_existing_requests(admin_client: AsyncClient, db, admin_user: models.User, normal_user: models.User):
+    """Test a new holiday is taken out of overlapping requests and refunded to approved balances."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    db.add_all([
+        models.VacationBalance(user_id=admin_user.id, type_id=vtype.id, year=2026, total_days=20, used_days=0),
+        models.VacationBalance(user_id=normal_user.id, type_id=vtype.id, year=2026, total_days=20, used_days=5),
+    ])
+    # Stored before day masks existed
+    legacy = models.VacationRequest(
+        user_id=normal_user.id, type_id=vtype.id, start_date=date(2026, 8, 3), end_date=date(2026, 8, 7),
+        business_days=5, status="approved",
+    )
+    db.add(legacy)
+    await db.commit()
+    legacy_id, admin_id, user_id = legacy.id, admin_user.id, normal_user.id
+
+    response = await admin_client.post("/api/v1/requests/", json={"type_id": vtype.id, "start_date": "2026-08-03", "end_date": "2026-08-14"})
+    overlapping = response.json()["id"]
+    assert response.json()["business_days"] == 10
+    assert (await admin_client.post(f"/api/v1/requests/{overlapping}/approve")).status_code == 200
+    response = await admin_client.post("/api/v1/requests/", json={"type_id": vtype.id, "start_date": "2026-09-07", "end_date": "2026-09-11"})
+    elsewhere = response.json()["id"]
+
+    response = await admin_client.post("/api/v1/holidays/", json={"date": "2026-08-05", "name": "Midweek Holiday", "year": 2026})
+    assert response.status_code == 200
+
+    @asynccontextmanager
+    async def use_db():
+        yield db
+
+    await jobs.JobWorker(session_factory=use_db).run_once()
+    assert (await db.execute(select(models.Job))).scalars().all() == []
+    # A retried job changes nothing
+    await tasks.recount_business_days(db, {"dates": ["2026-08-05"]})
+
+    db.expire_all()
+    counts = {r.id: r.business_days for r in (await db.execute(select(models.VacationRequest))).scalars()}
+    assert counts == {legacy_id: 4, overlapping: 9, elsewhere: 5}
+    listed = {r["id"]: r["business_days"] for r in (await admin_client.get("/api/v1/requests/")).json()}
+    assert listed == counts
+    assert (await db.get(models.VacationRequest, legacy_id)).day_mask is not None
+    used = {b.user_id: b.used_days for b in (await db.execute(select(models.VacationBalance))).scalars()}
+    assert used == {admin_id: 9, user_id: 4}
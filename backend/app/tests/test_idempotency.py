@@ -0,0 +1,136 @@
+"""Tests for Idempotency-Key support."""
+import pytest
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select
+from app import models
+from app.core.idempotency import store
+
+
+@pytest.fixture(autouse=True)
+def idempotency_store(db):
+    """Point the store at the test session and start every test with a cold cache."""
+    @asynccontextmanager
+    async def use_db():
+        yield db
+
+    store.session_factory = use_db
+    store.cache.clear()
+    yield store
+    store.session_factory = None
+    store.cache.clear()
+
+
+@pytest.fixture
+async def vacation_type(db):
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    return vtype
+
+
+@pytest.mark.anyio
+async def test_retried_create_is_replayed(auth_client: AsyncClient, db, vacation_type, idempotency_store):
+    """Test a retried POST returns the first response without creating a second request."""
+    payload = {"type_id": vacation_type.id, "start_date": "2026-06-01", "end_date": "2026-06-05"}
+    headers = {"Idempotency-Key": "create-1"}
+
+    first = await auth_client.post("/api/v1/requests/", json=payload, headers=headers)
+    assert first.status_code == 200
+    assert "idempotent-replayed" not in first.headers
+
+    # Replayed from the memory cache, then from the database
+    for clear_cache in (False, True):
+        if clear_cache:
+            idempotency_store.cache.clear()
+        retry = await auth_client.post("/api/v1/requests/", json=payload, headers=headers)
+        assert retry.status_code == 200
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert retry.json() == first.json()
+
+    rows = (await db.execute(select(models.VacationRequest))).scalars().all()
+    assert len(rows) == 1
+
+
+@pytest.mark.anyio
+async def test_retried_approve_is_replayed(admin_client: AsyncClient, db, normal_user, vacation_type):
+    """Test retrying an approval returns the approval instead of 'Request is not pending'."""
+    req = models.VacationRequest(
+        user_id=normal_user.id, type_id=vacation_type.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    db.add(req)
+    await db.commit()
+
+    headers = {"Idempotency-Key": "approve-1"}
+    first = await admin_client.post(f"/api/v1/requests/{req.id}/approve", json={}, headers=headers)
+    retry = await admin_client.post(f"/api/v1/requests/{req.id}/approve", json={}, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["status"] == "approved"
+
+    # Without the key the retry is a new operation
+    again = await admin_client.post(f"/api/v1/requests/{req.id}/approve", json={})
+    assert again.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_key_reused_for_different_request(auth_client: AsyncClient, vacation_type):
+    """Test reusing a key with a different body is rejected."""
+    headers = {"Idempotency-Key": "create-2"}
+    payload = {"type_id": vacation_type.id, "start_date": "2026-06-01", "end_date": "2026-06-05"}
+    assert (await auth_client.post("/api/v1/requests/", json=payload, headers=headers)).status_code == 200
+
+    payload["end_date"] = "2026-06-10"
+    response = await auth_client.post("/api/v1/requests/", json=payload, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_key_in_progress(auth_client: AsyncClient, db, normal_user, vacation_type, idempotency_store):
+    """Test a retry arriving while the first attempt still runs gets 409, and expired keys are reusable."""
+    payload = {"type_id": vacation_type.id, "start_date": "2026-06-01", "end_date": "2026-06-05"}
+    response = await auth_client.post("/api/v1/requests/", json=payload, headers={"Idempotency-Key": "probe"})
+    row = await db.get(models.IdempotencyKey, (f"user:{normal_user.id}", "probe"))
+
+    db.add(models.IdempotencyKey(
+        scope=row.scope, key="busy", fingerprint=row.fingerprint,
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+    ))
+    await db.commit()
+    response = await auth_client.post("/api/v1/requests/", json=payload, headers={"Idempotency-Key": "busy"})
+    assert response.status_code == 409
+
+    row.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await db.commit()
+    idempotency_store.cache.clear()
+    response = await auth_client.post("/api/v1/requests/", json=payload, headers={"Idempotency-Key": "probe"})
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_unauthenticated_request_is_not_stored(client: AsyncClient, db, vacation_type):
+    """Test responses that depend on the caller's credentials are not replayed."""
+    payload = {"type_id": vacation_type.id, "start_date": "2026-06-01", "end_date": "2026-06-05"}
+    response = await client.post("/api/v1/requests/", json=payload, headers={"Idempotency-Key": "anon-1"})
+    assert response.status_code == 401
+    assert (await db.execute(select(models.IdempotencyKey))).scalars().all() == []
+
+
+@pytest.mark.anyio
+async def test_auth_responses_are_not_stored(client: AsyncClient, db, normal_user):
+    """Test login and refresh ignore the key: tokens are never stored, and a replayed refresh still counts as reuse."""
+    headers = {"Idempotency-Key": "auth-1"}
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": normal_user.email, "password": "testpassword"}, headers=headers
+    )
+    assert response.status_code == 200
+    refresh = {"refresh_token": response.json()["refresh_token"]}
+
+    first = await client.post("/api/v1/auth/refresh", json=refresh, headers=headers)
+    assert first.status_code == 200
+    retry = await client.post("/api/v1/auth/refresh", json=refresh, headers=headers)
+    assert retry.status_code == 401
+    assert "idempotent-replayed" not in retry.headers
+    assert (await db.execute(select(models.IdempotencyKey))).scalars().all() == []
@@ -0,0 +1,102 @@
+"""Tests for the background job queue."""
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from httpx import AsyncClient
+from sqlalchemy import select
+from app import models
+from app import tasks  # registers job handlers
+from app.core import jobs
+
+
+@pytest.fixture
+def worker(db):
+    """A worker that runs jobs on the test session."""
+    @asynccontextmanager
+    async def use_db():
+        yield db
+
+    return jobs.JobWorker(session_factory=use_db, batch_size=10)
+
+
+@pytest.fixture
+def failing_handler():
+    @jobs.job("test_always_fails")
+    async def always_fails(db, payload):
+        raise RuntimeError("boom")
+
+    yield
+    jobs.handlers.pop("test_always_fails", None)
+
+
+@pytest.mark.anyio
+async def test_create_user_defers_balance_initialization(admin_client: AsyncClient, db, worker):
+    """Test create_user enqueues balance initialization and the worker performs it."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=24)
+    db.add(vtype)
+    await db.commit()
+
+    response = await admin_client.post("/api/v1/users/", json={
+        "email": "joiner@example.com",
+        "name": "Joiner",
+        "password": "password",
+        "start_date": f"{datetime.utcnow().year}-07-01",
+    })
+    assert response.status_code == 200
+    user_id = response.json()["id"]
+
+    queued = (await db.execute(select(models.Job).where(models.Job.kind == "initialize_balances"))).scalars().all()
+    assert [j.payload["user_id"] for j in queued] == [user_id]
+
+    assert await worker.run_once() == 1
+
+    balances = (await db.execute(
+        select(models.VacationBalance).where(models.VacationBalance.user_id == user_id)
+    )).scalars().all()
+    assert [(b.type_id, b.total_days) for b in balances] == [(vtype.id, 12)]
+    assert (await db.execute(select(models.Job))).scalars().all() == []
+
+
+@pytest.mark.anyio
+async def test_failed_job_is_rescheduled(db, worker, failing_handler):
+    """Test a failing job goes back to pending with backoff, then fails for good."""
+    queued = jobs.enqueue(db, "test_always_fails", {"n": 1}, max_attempts=2)
+    await db.commit()
+
+    assert await worker.run_once() == 1
+    await db.refresh(queued)
+    assert queued.status == "pending"
+    assert queued.attempts == 1
+    assert queued.run_after > datetime.utcnow()
+    assert "boom" in queued.last_error
+
+    # Not due yet
+    assert await worker.run_once() == 0
+
+    queued.run_after = datetime.utcnow()
+    await db.commit()
+    assert await worker.run_once() == 1
+    await db.refresh(queued)
+    assert queued.status == "failed"
+    assert queued.attempts == 2
+
+
+@pytest.mark.anyio
+async def test_job_queue_stats(admin_client: AsyncClient, db):
+    """Test admins can see queue depth per status and kind."""
+    jobs.enqueue(db, "initialize_balances", {"user_id": 1, "year": 2026})
+    jobs.enqueue(db, "initialize_balances", {"user_id": 2, "year": 2026})
+    await db.commit()
+
+    response = await admin_client.get("/api/v1/system/jobs")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["by_status"]["pending"] == 2
+    assert data["by_kind"]["initialize_balances"] == {"pending": 2}
+
+
+@pytest.mark.anyio
+async def test_job_queue_stats_as_employee(auth_client: AsyncClient):
+    """Test queue stats are admin-only."""
+    response = await auth_client.get("/api/v1/system/jobs")
+    assert response.status_code == 400
@@ -0,0 +1,242 @@
+"""Tests for Telegram notifications."""
+import json
+import threading
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from httpx import AsyncClient
+from sqlalchemy import event, select
+from app import models
+from app import tasks  # registers job handlers
+from app.core import jobs
+from app.core.notifications import NotificationSender, RateLimited, TelegramTransport
+from app.database import engine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_telegram():
+    """A local HTTP server standing in for api.telegram.org."""
+    received = []
+    state = {"fail_next": None}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status, state["fail_next"] = state["fail_next"], None
+            if status == 429:
+                payload = {"ok": False, "parameters": {"retry_after": 5}}
+                self.send_response(429)
+            elif status is not None:
+                payload = {"ok": False}
+                self.send_response(status)
+            else:
+                received.append({"path": self.path, **body})
+                payload = {"ok": True}
+                self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(payload).encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield {"url": f"http://127.0.0.1:{server.server_port}", "received": received, "state": state}
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def telegram_sender(fake_telegram, monkeypatch):
+    """The sender used by send_notification jobs, talking to the fake server on a fake clock."""
+    transport = TelegramTransport("test-token", fake_telegram["url"])
+    clock = FakeClock()
+    sender = NotificationSender(
+        transport, chat_interval=1, rate_per_second=2, max_wait=2, clock=clock, sleep=clock.sleep
+    )
+    monkeypatch.setattr(tasks, "sender", sender)
+    yield sender
+    await transport.aclose()
+
+
+@pytest.fixture
+def worker(db):
+    @asynccontextmanager
+    async def use_db():
+        yield db
+
+    return jobs.JobWorker(session_factory=use_db, batch_size=10)
+
+
+def send(db, chat_id, text, delay=None):
+    """Queue a message as notify_request does."""
+    return jobs.enqueue(
+        db, "send_notification", {"chat_id": chat_id, "text": text}, delay=delay, group_key=f"chat:{chat_id}"
+    )
+
+
+async def queued_notifications(db):
+    result = await db.execute(select(models.Job).where(models.Job.kind == "send_notification").order_by(models.Job.id))
+    return result.scalars().all()
+
+
+@pytest.mark.anyio
+async def test_sender_rate_limits(telegram_sender, fake_telegram):
+    """Test per-chat spacing, the global budget and upstream 429s are respected."""
+    clock = telegram_sender.clock
+    await telegram_sender.send(1, "hello")
+    await telegram_sender.send(2, "hello")
+    assert clock.slept == []
+
+    # Global budget is 2 messages per second
+    await telegram_sender.send(3, "hello")
+    assert clock.slept == [0.5]
+
+    # Chat 1 must wait for its interval
+    await telegram_sender.send(1, "again")
+    assert clock.slept[-1] == pytest.approx(0.5)
+
+    # Upstream says slow down: too long to wait in the job, so it is raised
+    clock.now += 1
+    fake_telegram["state"]["fail_next"] = 429
+    with pytest.raises(RateLimited):
+        await telegram_sender.send(1, "later")
+    with pytest.raises(RateLimited) as raised:
+        await telegram_sender.send(1, "later")
+    assert raised.value.retry_after == pytest.approx(5)
+    clock.now += 5
+    await telegram_sender.send(1, "later")
+    assert [m["text"] for m in fake_telegram["received"] if m["chat_id"] == 1] == ["hello", "again", "later"]
+    assert fake_telegram["received"][0]["path"] == "/bottest-token/sendMessage"
+
+
+@pytest.mark.anyio
+async def test_send_jobs_batch_per_chat(db, worker, telegram_sender, fake_telegram):
+    """Test a due message takes the chat's other queued messages with it, in one send."""
+    later = timedelta(seconds=60)
+    send(db, 1, "first")
+    send(db, 1, "second", delay=later)
+    other = send(db, 2, "other chat", delay=later)
+    await db.commit()
+
+    assert await worker.run_once() == 1
+    assert [(m["chat_id"], m["text"]) for m in fake_telegram["received"]] == [(1, "first\n\nsecond")]
+    assert [j.id for j in await queued_notifications(db)] == [other.id]
+
+    other.run_after = datetime.utcnow()
+    await db.commit()
+    assert await worker.run_once() == 1
+    assert [m["text"] for m in fake_telegram["received"]] == ["first\n\nsecond", "other chat"]
+    assert await queued_notifications(db) == []
+
+
+@pytest.mark.anyio
+async def test_send_job_sleeps_before_locking_the_chat(db, worker, telegram_sender, fake_telegram):
+    """Test rate-limit waits happen before the chat's queued rows are read and locked."""
+    statements, locked_when_sleeping = [], []
+    clock = telegram_sender.clock
+
+    def record(conn, cursor, statement, *args):
+        # The chat's queued messages, not the worker's claim
+        if "jobs.group_key = " in statement:
+            statements.append(statement)
+
+    async def sleep(seconds):
+        locked_when_sleeping.append(len(statements))
+        await clock.sleep(seconds)
+
+    telegram_sender.sleep = sleep
+    await telegram_sender.send(1, "earlier")
+    send(db, 1, "now")
+    await db.commit()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert await worker.run_once() == 1
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert locked_when_sleeping == [0]
+    assert len(statements) == 1
+    assert [m["text"] for m in fake_telegram["received"]] == ["earlier", "now"]
+
+
+@pytest.mark.anyio
+async def test_failed_send_keeps_messages_queued(db, worker, telegram_sender, fake_telegram):
+    """Test a 5xx or 429 from Telegram leaves every message queued and the job retried."""
+    queued = send(db, 1, "first")
+    send(db, 1, "second", delay=timedelta(seconds=60))
+    await db.commit()
+
+    fake_telegram["state"]["fail_next"] = 502
+    assert await worker.run_once() == 1
+    await db.refresh(queued)
+    assert queued.status == "pending"
+    assert len(await queued_notifications(db)) == 2
+
+    # 429: rescheduled for after retry_after (5s), beyond the 4s backoff
+    queued.run_after = datetime.utcnow()
+    await db.commit()
+    fake_telegram["state"]["fail_next"] = 429
+    before = datetime.utcnow()
+    assert await worker.run_once() == 1
+    await db.refresh(queued)
+    assert queued.status == "pending"
+    assert queued.run_after >= before + timedelta(seconds=5)
+    assert len(await queued_notifications(db)) == 2
+    assert fake_telegram["received"] == []
+
+    queued.run_after = datetime.utcnow()
+    await db.commit()
+    telegram_sender.clock.now += 5
+    assert await worker.run_once() == 1
+    assert [m["text"] for m in fake_telegram["received"]] == ["first\n\nsecond"]
+    assert await queued_notifications(db) == []
+
+
+@pytest.mark.anyio
+async def test_request_lifecycle_notifies_via_job(auth_client: AsyncClient, db, normal_user: models.User, worker, telegram_sender, fake_telegram):
+    """Test creating a request queues the manager's message as a job, sent by the worker."""
+    manager = models.User(email="boss@example.com", password_hash="x", name="Boss", role="manager", telegram_id=555)
+    db.add(manager)
+    await db.commit()
+    normal_user.manager_id = manager.id
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+
+    response = await auth_client.post("/api/v1/requests/", json={
+        "type_id": vtype.id,
+        "start_date": "2026-06-01",
+        "end_date": "2026-06-05",
+    })
+    assert response.status_code == 200
+    assert await queued_notifications(db) == []
+
+    await worker.run_once()
+    [queued] = await queued_notifications(db)
+    assert queued.payload["chat_id"] == 555
+    assert "Test User requested Annual Leave" in queued.payload["text"]
+    # Held back for the batch window
+    assert fake_telegram["received"] == []
+
+    queued.run_after = datetime.utcnow()
+    await db.commit()
+    await worker.run_once()
+    assert [m["chat_id"] for m in fake_telegram["received"]] == [555]
+    assert await queued_notifications(db) == []
@@ -0,0 +1,116 @@
+"""Tests for yearly request partitions and archiving."""
+import csv
+import gzip
+from datetime import date
+
+import pytest
+from sqlalchemy import select, text
+from app import models
+from app.core import partitions
+
+
+@pytest.fixture
+async def requests_by_year(db, normal_user: models.User):
+    """An approved request starting in each of 2021-2023, one crossing into 2024."""
+    vtype = models.VacationType(name="Annual Leave", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    requests = [
+        models.VacationRequest(
+            user_id=normal_user.id, type_id=vtype.id, start_date=start, end_date=end,
+            business_days=1, day_mask=b"\x01", status="approved",
+        )
+        for start, end in [
+            (date(2021, 6, 1), date(2021, 6, 1)),
+            (date(2022, 6, 1), date(2022, 6, 1)),
+            (date(2023, 12, 29), date(2024, 1, 2)),
+        ]
+    ]
+    db.add_all(requests)
+    await db.commit()
+    return requests
+
+
+@pytest.mark.anyio
+async def test_overlapping_finds_longest_request(db, requests_by_year):
+    """Test the start_date bound of overlapping() still finds requests of the maximum length."""
+    longest = models.VacationRequest(
+        user_id=requests_by_year[0].user_id, type_id=requests_by_year[0].type_id,
+        start_date=date(2024, 1, 2), end_date=date(2025, 1, 1), business_days=0, status="approved",
+    )
+    db.add(longest)
+    await db.commit()
+    assert (longest.end_date - longest.start_date).days + 1 == partitions.MAX_REQUEST_DAYS
+
+    found = await db.execute(
+        select(models.VacationRequest.id)
+        .where(partitions.overlapping(models.VacationRequest, date(2025, 1, 1), date(2025, 1, 31)))
+    )
+    assert found.scalars().all() == [longest.id]
+    found = await db.execute(
+        select(models.VacationRequest.id)
+        .where(partitions.overlapping(models.VacationRequest, date(2024, 1, 1), date(2024, 1, 1)))
+        .order_by(models.VacationRequest.id)
+    )
+    assert found.scalars().all() == [requests_by_year[2].id]
+
+
+@pytest.mark.anyio
+async def test_archive_year(db, requests_by_year, tmp_path):
+    """Test a finished year is written to a gzipped CSV and deleted, leaving other years."""
+    path, count = await partitions.archive_year(db, 2023, tmp_path)
+    await db.commit()
+
+    assert count == 1
+    with gzip.open(path, "rt", newline="") as archive:
+        [row] = list(csv.DictReader(archive))
+    assert (row["id"], row["start_date"], row["end_date"], row["day_mask"]) == (
+        str(requests_by_year[2].id), "2023-12-29", "2024-01-02", "01",
+    )
+
+    remaining = (await db.execute(select(models.VacationRequest.id).order_by(models.VacationRequest.id))).scalars().all()
+    assert remaining == [requests_by_year[0].id, requests_by_year[1].id]
+    listed = (await db.execute(select(models.request_list.c.id).order_by(models.request_list.c.id))).scalars().all()
+    assert listed == remaining
+
+    with pytest.raises(ValueError, match="already exists"):
+        await partitions.archive_year(db, 2023, tmp_path)
+    with pytest.raises(ValueError, match="not over yet"):
+        await partitions.archive_year(db, date.today().year, tmp_path)
+    requests_by_year[1].status = "pending"
+    await db.commit()
+    with pytest.raises(ValueError, match="1 pending"):
+        await partitions.archive_year(db, 2022, tmp_path)
+
+
+@pytest.mark.anyio
+async def test_partitions_created_and_pruned(db, requests_by_year, tmp_path):
+    """Test new partitions take their rows from the default one and queries skip other years."""
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("partitions exist on Postgres only")
+
+    async def partition_of(request):
+        return await db.scalar(
+            text("SELECT tableoid::regclass::text FROM vacation_requests WHERE id = :id"), {"id": request.id}
+        )
+
+    # The migration creates partitions from the first request's year on
+    assert await partition_of(requests_by_year[2]) == "vacation_requests_default"
+    assert await partitions.ensure_partitions(db, [2021, 2022, 2023]) == [
+        "vacation_requests_y2021", "vacation_requests_y2022", "vacation_requests_y2023",
+    ]
+    assert await partitions.ensure_partitions(db, [2023]) == []
+    assert await partition_of(requests_by_year[2]) == "vacation_requests_y2023"
+
+    query = select(models.VacationRequest.id).where(
+        partitions.overlapping(models.VacationRequest, date(2024, 1, 1), date(2024, 1, 31))
+    )
+    compiled = query.compile(db.bind, compile_kwargs={"literal_binds": True})
+    plan = "\n".join((await db.execute(text(f"EXPLAIN {compiled}"))).scalars())
+    assert "vacation_requests_y2023" in plan
+    assert "vacation_requests_y2021" not in plan and "vacation_requests_y2022" not in plan
+
+    # Archiving drops the year's partition
+    await partitions.archive_year(db, 2021, tmp_path)
+    assert await db.scalar(text("SELECT to_regclass('vacation_requests_y2021')")) is None
+    assert await db.get(models.VacationRequest, requests_by_year[1].id) is not None
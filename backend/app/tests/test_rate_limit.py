@@ -0,0 +1,92 @@
+"""Tests for rate limiting."""
+import pytest
+from contextlib import asynccontextmanager
+from httpx import AsyncClient
+from app import models
+from app.core import rate_limit
+from app.core.rate_limit import DatabaseBackend, MemoryBackend, RateLimit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def lower_limits():
+    """Shrink the login budgets so tests can exhaust them."""
+    saved = {limit: limit.per_minute for limit in rate_limit.limits}
+    rate_limit.login_ips.per_minute = 3
+    rate_limit.login_accounts.per_minute = 2
+    yield
+    for limit, per_minute in saved.items():
+        limit.per_minute = per_minute
+
+
+async def _exercise_bucket(backend):
+    clock = FakeClock()
+    limit = RateLimit("test", 2, backend=backend, clock=clock)
+    assert (await limit.hit("k")).allowed
+    assert (await limit.hit("k")).allowed
+    denied = await limit.hit("k")
+    assert not denied.allowed
+    assert denied.remaining == 0
+    assert denied.retry_after == pytest.approx(30)
+    # Other keys have their own bucket
+    assert (await limit.hit("other")).allowed
+
+    clock.now += 30
+    assert (await limit.hit("k")).allowed
+    assert not (await limit.hit("k")).allowed
+    assert (limit.allowed, limit.limited) == (4, 2)
+
+
+@pytest.mark.anyio
+async def test_memory_token_bucket():
+    """Test buckets refill continuously and never exceed their burst."""
+    await _exercise_bucket(MemoryBackend())
+
+
+@pytest.mark.anyio
+async def test_database_token_bucket(db):
+    """Test the shared backend makes the same decisions as the in-memory one."""
+    @asynccontextmanager
+    async def use_db():
+        yield db
+
+    await _exercise_bucket(DatabaseBackend(session_factory=use_db))
+
+
+@pytest.mark.anyio
+async def test_login_is_limited_per_ip(client: AsyncClient, lower_limits):
+    """Test login attempts beyond the IP budget are rejected before any password check."""
+    for n in range(3):
+        response = await client.post("/api/v1/auth/login", data={"username": f"u{n}@example.com", "password": "x"})
+        assert response.status_code == 401
+    response = await client.post("/api/v1/auth/login", data={"username": "u9@example.com", "password": "x"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+@pytest.mark.anyio
+async def test_login_is_limited_per_account(client: AsyncClient, normal_user: models.User, lower_limits):
+    """Test one account can't be guessed at faster than its own budget."""
+    for _ in range(2):
+        response = await client.post("/api/v1/auth/login", data={"username": normal_user.email, "password": "wrong"})
+        assert response.status_code == 401
+    response = await client.post("/api/v1/auth/login", data={"username": normal_user.email.upper(), "password": "testpassword"})
+    assert response.status_code == 429
+
+
+@pytest.mark.anyio
+async def test_api_responses_carry_limit_headers(admin_client: AsyncClient):
+    """Test reads are metered per user and report their budget."""
+    response = await admin_client.get("/api/v1/system/rate-limits")
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Limit"] == str(rate_limit.reads.per_minute)
+    assert int(response.headers["X-RateLimit-Remaining"]) == rate_limit.reads.per_minute - 1
+    assert response.json()["read"]["allowed"] == 1
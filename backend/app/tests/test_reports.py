@@ -0,0 +1,144 @@
+"""Tests for reporting endpoints."""
+import pytest
+from datetime import date
+from httpx import AsyncClient
+from app import models
+from app.api.v1.reports import usage_report_cache
+from app.core import security
+
+
+@pytest.fixture(autouse=True)
+def clear_report_cache():
+    usage_report_cache.clear()
+    yield
+    usage_report_cache.clear()
+
+
+@pytest.fixture
+async def org(db, normal_user):
+    """Create manager -> team lead -> engineer, with normal_user outside the tree."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    await db.refresh(vtype)
+
+    manager = models.User(email="vp@example.com", password_hash="x", name="VP", role="manager")
+    db.add(manager)
+    await db.commit()
+    await db.refresh(manager)
+
+    lead = models.User(email="lead@example.com", password_hash="x", name="Lead", role="manager", manager_id=manager.id)
+    db.add(lead)
+    await db.commit()
+    await db.refresh(lead)
+
+    engineer = models.User(email="eng@example.com", password_hash="x", name="Engineer", role="employee", manager_id=lead.id)
+    db.add(engineer)
+    await db.commit()
+    await db.refresh(engineer)
+
+    db.add_all([
+        models.VacationBalance(user_id=lead.id, type_id=vtype.id, year=2026, total_days=20, used_days=3),
+        models.VacationBalance(user_id=engineer.id, type_id=vtype.id, year=2026, total_days=20, used_days=5),
+        models.VacationBalance(user_id=normal_user.id, type_id=vtype.id, year=2026, total_days=20, used_days=1),
+        models.VacationRequest(
+            user_id=engineer.id, type_id=vtype.id, status="approved", business_days=5,
+            start_date=date(2026, 3, 2), end_date=date(2026, 3, 6),
+        ),
+        models.VacationRequest(
+            user_id=lead.id, type_id=vtype.id, status="approved", business_days=3,
+            start_date=date(2026, 3, 9), end_date=date(2026, 3, 11),
+        ),
+        models.VacationRequest(
+            user_id=normal_user.id, type_id=vtype.id, status="approved", business_days=1,
+            start_date=date(2026, 5, 4), end_date=date(2026, 5, 4),
+        ),
+    ])
+    await db.commit()
+    return {"type": vtype, "manager": manager, "lead": lead, "engineer": engineer}
+
+
+@pytest.mark.anyio
+async def test_usage_report_as_admin(admin_client: AsyncClient, org, normal_user: models.User):
+    """Test admin report covers the whole company."""
+    response = await admin_client.get("/api/v1/reports/usage?year=2026")
+    assert response.status_code == 200
+    data = response.json()
+    user_ids = {row["user_id"] for row in data["users"]}
+    assert {org["lead"].id, org["engineer"].id, normal_user.id} <= user_ids
+
+    by_type = next(t for t in data["by_type"] if t["type_id"] == org["type"].id)
+    assert by_type["total_days"] == 60
+    assert by_type["used_days"] == 9
+    assert by_type["remaining_days"] == 51
+
+    months = {(m["month"], m["type_id"]): m["used_days"] for m in data["by_month"]}
+    assert months[(3, org["type"].id)] == 8
+    assert months[(5, org["type"].id)] == 1
+
+
+@pytest.mark.anyio
+async def test_usage_report_manager_subtree(client: AsyncClient, org, normal_user: models.User):
+    """Test managers only see their (recursive) subtree."""
+    token = security.create_access_token(org["manager"].id, role=org["manager"].role)
+    response = await client.get(
+        "/api/v1/reports/usage?year=2026",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["manager_id"] == org["manager"].id
+    assert {row["user_id"] for row in data["users"]} == {org["lead"].id, org["engineer"].id}
+    assert [m["used_days"] for m in data["by_month"]] == [8]
+
+
+@pytest.mark.anyio
+async def test_usage_report_manager_cannot_see_other_tree(client: AsyncClient, org):
+    """Test a manager cannot ask for a subtree outside their own."""
+    token = security.create_access_token(org["lead"].id, role=org["lead"].role)
+    response = await client.get(
+        f"/api/v1/reports/usage?year=2026&manager_id={org['manager'].id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_usage_report_as_employee(auth_client: AsyncClient):
+    """Test regular employees cannot read reports."""
+    response = await auth_client.get("/api/v1/reports/usage")
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_usage_report_cache_invalidated_on_approve(admin_client: AsyncClient, db, org):
+    """Test approving a request refreshes the cached report."""
+    response = await admin_client.get("/api/v1/reports/usage?year=2026")
+    before = response.json()["by_type"][0]["used_days"]
+
+    req = models.VacationRequest(
+        user_id=org["engineer"].id, type_id=org["type"].id, status="pending", business_days=2,
+        start_date=date(2026, 4, 1), end_date=date(2026, 4, 2),
+    )
+    db.add(req)
+    await db.commit()
+    await db.refresh(req)
+    response = await admin_client.post(f"/api/v1/requests/{req.id}/approve")
+    assert response.status_code == 200
+
+    response = await admin_client.get("/api/v1/reports/usage?year=2026")
+    assert response.json()["by_type"][0]["used_days"] == before + 2
+
+
+@pytest.mark.anyio
+async def test_usage_report_cache_invalidated_on_manager_change(admin_client: AsyncClient, org, normal_user: models.User):
+    """Test moving a user to another manager refreshes cached subtree reports."""
+    url = f"/api/v1/reports/usage?year=2026&manager_id={org['manager'].id}"
+    response = await admin_client.get(url)
+    assert normal_user.id not in {row["user_id"] for row in response.json()["users"]}
+
+    response = await admin_client.put(f"/api/v1/users/{normal_user.id}", json={"manager_id": org["lead"].id})
+    assert response.status_code == 200
+
+    response = await admin_client.get(url)
+    assert normal_user.id in {row["user_id"] for row in response.json()["users"]}
@@ -70,9 +70,46 @@ async def test_create_request_invalid_dates(auth_client: AsyncClient, vacation_t
     response = await auth_client.post("/api/v1/requests/", json=request_data)
     assert response.status_code == 400
 
+    # Longer than a year: the calendar could not find it by partition
+    request_data.update(start_date="2026-01-01", end_date="2027-01-02")
+    response = await auth_client.post("/api/v1/requests/", json=request_data)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Requests cannot be longer than 366 days"
+
 
 @pytest.mark.anyio
-async def test_list_my_requests(auth_client: AsyncClient, db, normal_user: models.User, vacation_type: models.VacationType):
+async def test_part_day_requests(admin_client: AsyncClient, db, admin_user: models.User, vacation_type: models.VacationType):
+    """Test hourly leave is booked in quarter days and balances, reports and calendar add it up exactly."""
+    db.add(models.VacationBalance(user_id=admin_user.id, type_id=vacation_type.id, year=2026, total_days=20, used_days=0))
+    await db.commit()
+    day = {"type_id": vacation_type.id, "start_date": "2026-06-02", "end_date": "2026-06-02"}
+
+    assert (await admin_client.post("/api/v1/requests/", json={**day, "hours": 3})).status_code == 400
+    assert (await admin_client.post("/api/v1/requests/", json={**day, "hours": 10})).status_code == 400
+    response = await admin_client.post("/api/v1/requests/", json={**day, "end_date": "2026-06-03", "hours": 4})
+    assert response.status_code == 400
+
+    ids = []
+    for hours, start in ((2, "2026-06-02"), (4, "2026-06-03"), (2, "2026-06-04")):
+        response = await admin_client.post("/api/v1/requests/", json={**day, "start_date": start, "end_date": start, "hours": hours})
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+    assert response.json()["business_days"] == 0.25
+    for request_id in ids:
+        assert (await admin_client.post(f"/api/v1/requests/{request_id}/approve")).status_code == 200
+
+    response = await admin_client.get(f"/api/v1/users/{admin_user.id}/balance?year=2026")
+    assert [(b["used_days"], b["remaining_days"]) for b in response.json()] == [(1.0, 19.0)]
+    response = await admin_client.get("/api/v1/reports/usage?year=2026")
+    assert response.json()["by_month"][0]["used_days"] == 1.0
+    response = await admin_client.get("/api/v1/calendar/?start_date=2026-06-01&end_date=2026-06-07")
+    assert sorted((e["date"], e["days"]) for e in response.json()) == [
+        ("2026-06-02", 0.25), ("2026-06-03", 0.5), ("2026-06-04", 0.25),
+    ]
+
+
+@pytest.mark.anyio
+async def test_list_my_requests(auth_client: AsyncClient, db, queries, normal_user: models.User, vacation_type: models.VacationType):
     """Test listing user's own requests."""
     # Create some requests
     req1 = models.VacationRequest(
@@ -94,7 +131,9 @@ async def test_list_my_requests(auth_client: AsyncClient, db, normal_user: model
     db.add_all([req1, req2])
     await db.commit()
 
-    response = await auth_client.get("/api/v1/requests/")
+    # The request_list rows and the vacation types, however many users and reviewers
+    with queries.assert_max_queries(2):
+        response = await auth_client.get("/api/v1/requests/")
     assert response.status_code == 200
     data = response.json()
     assert len(data) >= 2
@@ -161,7 +200,7 @@ async def test_cannot_access_other_user_request(auth_client: AsyncClient, db, va
 
 
 @pytest.mark.anyio
-async def test_approve_request_as_admin(admin_client: AsyncClient, db, normal_user: models.User, vacation_type: models.VacationType):
+async def test_approve_request_as_admin(admin_client: AsyncClient, db, queries, normal_user: models.User, vacation_type: models.VacationType):
     """Test admin can approve vacation requests."""
     req = models.VacationRequest(
         user_id=normal_user.id,
@@ -175,15 +214,43 @@ async def test_approve_request_as_admin(admin_client: AsyncClient, db, normal_us
     await db.commit()
     await db.refresh(req)
 
-    response = await admin_client.post(
-        f"/api/v1/requests/{req.id}/approve",
-        json={"comment": "Approved"}
-    )
+    with queries.assert_max_queries(10):
+        response = await admin_client.post(
+            f"/api/v1/requests/{req.id}/approve",
+            json={"comment": "Approved"}
+        )
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "approved"
 
 
+@pytest.mark.anyio
+async def test_request_list_follows_changes(admin_client: AsyncClient, db, admin_user: models.User, normal_user: models.User, vacation_type: models.VacationType):
+    """Test listed requests pick up reviews and renamed users and reviewers."""
+    req = models.VacationRequest(
+        user_id=normal_user.id,
+        type_id=vacation_type.id,
+        start_date=date(2026, 7, 1),
+        end_date=date(2026, 7, 3),
+        business_days=3,
+        status="pending"
+    )
+    db.add(req)
+    await db.commit()
+    assert (await admin_client.post(f"/api/v1/requests/{req.id}/approve")).status_code == 200
+
+    normal_user.name = "Renamed User"
+    admin_user.name = "Renamed Admin"
+    await db.commit()
+
+    [listed] = (await admin_client.get("/api/v1/requests/")).json()
+    assert (listed["status"], listed["user_name"], listed["reviewer_name"]) == ("approved", "Renamed User", "Renamed Admin")
+
+    await db.delete(req)
+    await db.commit()
+    assert (await admin_client.get("/api/v1/requests/")).json() == []
+
+
 @pytest.mark.anyio
 async def test_reject_request(admin_client: AsyncClient, db, normal_user: models.User, vacation_type: models.VacationType):
     """Test rejecting vacation request."""
@@ -227,7 +294,7 @@ async def test_employee_cannot_approve(auth_client: AsyncClient, db, normal_user
         f"/api/v1/requests/{req.id}/approve",
         json={"comment": "Trying to approve"}
     )
-    assert response.status_code == 400
+    assert response.status_code == 403
 
 
 @pytest.mark.anyio
@@ -270,3 +337,129 @@ async def test_can_cancel_approved_request(auth_client: AsyncClient, db, normal_
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "cancelled"
+
+
+@pytest.mark.anyio
+async def test_list_requests_filtered_by_manager_subtree(admin_client: AsyncClient, db, normal_user: models.User, manager_user: models.User, vacation_type: models.VacationType):
+    """Test manager_id narrows the list to that manager's team, without the manager."""
+    report = models.User(
+        email="report@example.com",
+        password_hash="x",
+        name="Direct Report",
+        role="employee",
+        manager_id=manager_user.id
+    )
+    db.add(report)
+    await db.commit()
+    await db.refresh(report)
+
+    in_team = models.VacationRequest(
+        user_id=report.id, type_id=vacation_type.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    outside = models.VacationRequest(
+        user_id=normal_user.id, type_id=vacation_type.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    own = models.VacationRequest(
+        user_id=manager_user.id, type_id=vacation_type.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    db.add_all([in_team, outside, own])
+    await db.commit()
+
+    response = await admin_client.get(f"/api/v1/requests/?manager_id={manager_user.id}")
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == [in_team.id]
+
+
+@pytest.fixture
+async def team(db, manager_user: models.User, vacation_type: models.VacationType):
+    """A direct report of manager_user, an approvee of manager_user and an unrelated employee, each with a pending request."""
+    report = models.User(email="report@example.com", password_hash="x", name="Report", manager_id=manager_user.id)
+    approvee = models.User(email="approvee@example.com", password_hash="x", name="Approvee", approvers=[manager_user])
+    stranger = models.User(email="stranger@example.com", password_hash="x", name="Stranger")
+    db.add_all([report, approvee, stranger])
+    await db.commit()
+
+    requests = {}
+    for key, user in (("report", report), ("approvee", approvee), ("stranger", stranger)):
+        req = models.VacationRequest(
+            user_id=user.id, type_id=vacation_type.id, business_days=1, status="pending",
+            start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+        )
+        db.add(req)
+        await db.commit()
+        await db.refresh(req)
+        requests[key] = req
+    return requests
+
+
+@pytest.fixture
+async def manager_client(client: AsyncClient, manager_user: models.User):
+    from app.core import security
+    client.headers = {
+        **client.headers,
+        "Authorization": f"Bearer {security.create_access_token(manager_user.id, role=manager_user.role)}"
+    }
+    return client
+
+
+@pytest.mark.anyio
+async def test_inbox_lists_reports_and_approvees(manager_client: AsyncClient, queries, team):
+    """Test the inbox holds pending requests from direct reports and explicit approvees only."""
+    with queries.assert_max_queries(3):
+        response = await manager_client.get("/api/v1/requests/inbox")
+    assert response.status_code == 200
+    ids = [r["id"] for r in response.json()]
+    assert sorted(ids) == sorted([team["report"].id, team["approvee"].id])
+
+
+@pytest.mark.anyio
+async def test_inbox_as_employee(auth_client: AsyncClient, team):
+    """Test employees who approve nobody get an empty inbox."""
+    response = await auth_client.get("/api/v1/requests/inbox")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.anyio
+async def test_explicit_approver_can_approve(manager_client: AsyncClient, team):
+    """Test an explicit approver may approve a request of someone they don't manage."""
+    response = await manager_client.post(f"/api/v1/requests/{team['approvee'].id}/approve")
+    assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+
+
+@pytest.mark.anyio
+async def test_employee_approver_can_approve(auth_client: AsyncClient, db, normal_user: models.User, vacation_type: models.VacationType):
+    """Test an employee listed as someone's approver sees and decides their requests."""
+    approvee = models.User(email="approvee@example.com", password_hash="x", name="Approvee", approvers=[normal_user])
+    db.add(approvee)
+    await db.commit()
+    req = models.VacationRequest(
+        user_id=approvee.id, type_id=vacation_type.id, business_days=1, status="pending",
+        start_date=date(2026, 7, 1), end_date=date(2026, 7, 1),
+    )
+    db.add(req)
+    await db.commit()
+    await db.refresh(req)
+
+    response = await auth_client.get("/api/v1/requests/inbox")
+    assert [r["id"] for r in response.json()] == [req.id]
+    response = await auth_client.get("/api/v1/dashboard/?year=2026")
+    assert [r["id"] for r in response.json()["pending_approvals"]] == [req.id]
+
+    response = await auth_client.post(f"/api/v1/requests/{req.id}/approve")
+    assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+    assert response.json()["reviewer_id"] == normal_user.id
+
+
+@pytest.mark.anyio
+async def test_manager_cannot_review_outside_team(manager_client: AsyncClient, team):
+    """Test a manager cannot approve or reject requests of people they don't review."""
+    response = await manager_client.post(f"/api/v1/requests/{team['stranger'].id}/approve")
+    assert response.status_code == 403
+    response = await manager_client.post(f"/api/v1/requests/{team['stranger'].id}/reject")
+    assert response.status_code == 403
@@ -0,0 +1,132 @@
+"""Tests for cold-start cost: import time, the precomputed OpenAPI schema and warmup."""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app import models
+from app.core import openapi, revocation, warmup
+from app.core.type_registry import type_registry
+from app.main import app
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Autoscaled workers cold-start often; raise this only with a reason
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+# Only needed once a request arrives that uses them
+DEFERRED_MODULES = ("passlib", "jose.jwt", "httpx", "yaml")
+
+
+def import_times() -> dict:
+    """Cumulative import time in microseconds per module for a fresh `import app.main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.anyio
+async def test_cold_start_within_budget():
+    """Test importing the app stays under the budget and defers rarely used libraries."""
+    times = import_times()
+    loaded = [name for name in DEFERRED_MODULES if name in times]
+    assert loaded == [], f"imported at startup: {loaded}"
+    # Best of three, so one noisy run doesn't fail the build
+    best_ms = min([times["app.main"]] + [import_times()["app.main"] for _ in range(2)]) / 1000
+    assert best_ms < IMPORT_TIME_BUDGET_MS, f"import app.main took {best_ms:.0f}ms (budget {IMPORT_TIME_BUDGET_MS:.0f}ms)"
+
+
+@pytest.mark.anyio
+async def test_committed_openapi_is_current():
+    """Test docs/openapi.json and its hash match the code; run generate_openapi.py if not."""
+    assert openapi.HASH_PATH.read_text().strip() == openapi.source_hash()
+    generated = json.loads(json.dumps(openapi.generate(app)))
+    assert json.loads(openapi.SCHEMA_PATH.read_text()) == generated
+
+
+@pytest.mark.anyio
+async def test_openapi_served_from_file(client: AsyncClient, monkeypatch):
+    """Test the committed schema is served while the hash matches, and generated otherwise."""
+    app.openapi_schema = None
+    committed = json.loads(openapi.SCHEMA_PATH.read_text())
+    committed["info"]["title"] = "From file"
+    monkeypatch.setattr(openapi, "load_precomputed", lambda: committed)
+    response = await client.get("/api/v1/openapi.json")
+    assert response.json()["info"]["title"] == "From file"
+
+    app.openapi_schema = None
+    monkeypatch.undo()
+    monkeypatch.setattr(openapi, "source_hash", lambda: "changed")
+    assert openapi.load_precomputed() is None
+    response = await client.get("/api/v1/openapi.json")
+    assert response.json()["info"]["title"] == "Vacation Manager API"
+    app.openapi_schema = None
+
+
+@pytest.mark.anyio
+async def test_ready_after_warmup(client: AsyncClient, db, monkeypatch):
+    """Test /ready stays 503 until warmup has run, while /health is green throughout."""
+    @asynccontextmanager
+    async def use_db():
+        yield db
+
+    cold = warmup.Warmup(engine=db.bind.engine, session_factory=use_db)
+    monkeypatch.setattr(warmup, "warmup", cold)
+    unloaded = revocation.RevocationList(session_factory=use_db)
+    monkeypatch.setattr(revocation, "revocations", unloaded)
+
+    assert (await client.get("/api/v1/health")).status_code == 200
+    response = await client.get("/api/v1/ready")
+    assert response.status_code == 503
+
+    await cold.run_once()
+    # Not before revoked tokens are known
+    assert (await client.get("/api/v1/ready")).status_code == 503
+    await unloaded.load()
+    response = await client.get("/api/v1/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert type_registry._expires_at > 0
+
+
+@pytest.mark.anyio
+async def test_revocations_load_retried_until_database_is_up(db):
+    """Test revoked tokens load in the background, retrying while the database is unreachable."""
+    db.add(models.User(email="revoked@example.com", password_hash="x", name="Revoked", token_version=2))
+    await db.commit()
+    attempts = []
+
+    @asynccontextmanager
+    async def flaky_db():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionRefusedError("database is starting")
+        yield db
+
+    revocations = revocation.RevocationList(session_factory=flaky_db, retry_interval=0.01)
+    revocations.start()
+    try:
+        for _ in range(100):
+            if revocations.loaded:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await revocations.stop()
+    assert revocations.loaded
+    assert len(attempts) == 3
+    assert len(revocations) == 1
@@ -155,3 +155,57 @@ async def test_get_user_balances(auth_client: AsyncClient, db, normal_user: mode
     assert balance_item["total_days"] == 20
     assert balance_item["used_days"] == 5
     assert balance_item["year"] == 2026
+
+
+@pytest.fixture
+async def chain(db):
+    """Create a VP -> lead -> engineer chain and a second, unrelated manager."""
+    vp = models.User(email="vp@example.com", password_hash="x", name="VP", role="manager")
+    other = models.User(email="other-mgr@example.com", password_hash="x", name="Other", role="manager")
+    db.add_all([vp, other])
+    await db.commit()
+    lead = models.User(email="lead@example.com", password_hash="x", name="Lead", role="manager", manager_id=vp.id)
+    db.add(lead)
+    await db.commit()
+    engineer = models.User(email="eng@example.com", password_hash="x", name="Engineer", manager_id=lead.id)
+    db.add(engineer)
+    await db.commit()
+    return {"vp": vp, "other": other, "lead": lead, "engineer": engineer}
+
+
+async def _ancestors(db, user_id):
+    result = await db.execute(
+        select(models.user_closure.c.ancestor_id, models.user_closure.c.depth)
+        .where(models.user_closure.c.descendant_id == user_id)
+    )
+    return dict(result.all())
+
+
+@pytest.mark.anyio
+async def test_closure_tracks_new_users(db, chain):
+    """Test every new user gets a self row plus one row per manager above them."""
+    assert await _ancestors(db, chain["engineer"].id) == {
+        chain["engineer"].id: 0,
+        chain["lead"].id: 1,
+        chain["vp"].id: 2,
+    }
+
+
+@pytest.mark.anyio
+async def test_update_user_manager_moves_subtree(admin_client: AsyncClient, db, chain):
+    """Test changing a manager re-parents the whole subtree in the closure table."""
+    response = await admin_client.put(f"/api/v1/users/{chain['lead'].id}", json={"manager_id": chain["other"].id})
+    assert response.status_code == 200
+
+    assert await _ancestors(db, chain["engineer"].id) == {
+        chain["engineer"].id: 0,
+        chain["lead"].id: 1,
+        chain["other"].id: 2,
+    }
+
+
+@pytest.mark.anyio
+async def test_update_user_manager_rejects_cycle(admin_client: AsyncClient, chain):
+    """Test a user cannot be moved under someone in their own team."""
+    response = await admin_client.put(f"/api/v1/users/{chain['vp'].id}", json={"manager_id": chain["engineer"].id})
+    assert response.status_code == 400
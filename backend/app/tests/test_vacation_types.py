@@ -76,3 +76,72 @@ async def test_vacation_type_defaults(admin_client: AsyncClient, db):
     assert data["name"] == "Unpaid Leave"
     assert data["default_days"] == 0  # Default value
     assert data["is_paid"] is True  # Default value
+
+
+@pytest.mark.anyio
+async def test_listing_served_from_memory(auth_client: AsyncClient, db, queries):
+    """Test vacation types are loaded once and not queried again on later requests."""
+    db.add(models.VacationType(name="Annual Leave", color="blue", default_days=20))
+    await db.commit()
+
+    first = await auth_client.get("/api/v1/vacation-types/")
+    with queries.assert_max_queries(0):
+        second = await auth_client.get("/api/v1/vacation-types/")
+    assert second.json() == first.json()
+
+
+@pytest.mark.anyio
+async def test_update_vacation_type(admin_client: AsyncClient, db):
+    """Test an update is visible in the next listing, without waiting for the cache to expire."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+    assert (await admin_client.get("/api/v1/vacation-types/")).status_code == 200
+
+    response = await admin_client.put(f"/api/v1/vacation-types/{vtype.id}", json={"default_days": 25, "color": "navy"})
+    assert response.status_code == 200
+    assert (response.json()["default_days"], response.json()["name"]) == (25, "Annual Leave")
+
+    [listed] = [t for t in (await admin_client.get("/api/v1/vacation-types/")).json() if t["id"] == vtype.id]
+    assert (listed["default_days"], listed["color"]) == (25, "navy")
+
+    response = await admin_client.put("/api/v1/vacation-types/999999", json={"default_days": 1})
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_update_vacation_type_rejects_null(admin_client: AsyncClient, db):
+    """Test fields can be left out of an update but not set to null."""
+    vtype = models.VacationType(name="Annual Leave", color="blue", default_days=20)
+    db.add(vtype)
+    await db.commit()
+
+    for field in ("name", "is_active"):
+        response = await admin_client.put(f"/api/v1/vacation-types/{vtype.id}", json={field: None})
+        assert response.status_code == 422
+
+    [listed] = [t for t in (await admin_client.get("/api/v1/vacation-types/")).json() if t["id"] == vtype.id]
+    assert listed["name"] == "Annual Leave"
+
+
+@pytest.mark.anyio
+async def test_deactivated_type_cannot_be_requested(admin_client: AsyncClient, db):
+    """Test a deactivated type leaves the listing and new requests, but old requests keep its name."""
+    vtype = models.VacationType(name="Old Leave", color="gray", default_days=5)
+    db.add(vtype)
+    await db.commit()
+    payload = {"type_id": vtype.id, "start_date": "2030-03-04", "end_date": "2030-03-05"}
+    created = await admin_client.post("/api/v1/requests/", json=payload)
+    assert created.status_code == 200
+
+    response = await admin_client.delete(f"/api/v1/vacation-types/{vtype.id}")
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+
+    listed = (await admin_client.get("/api/v1/vacation-types/")).json()
+    assert vtype.id not in [t["id"] for t in listed]
+    response = await admin_client.post("/api/v1/requests/", json={**payload, "start_date": "2030-03-11", "end_date": "2030-03-11"})
+    assert response.status_code == 400
+
+    [old] = (await admin_client.get("/api/v1/requests/")).json()
+    assert (old["id"], old["type_name"]) == (created.json()["id"], "Old Leave")
@@ -1,5 +1,7 @@
 from datetime import date, timedelta
-from typing import List, Set
+from typing import Iterable, List, Set
+
+from app.utils.units import QUARTERS_PER_DAY
 
 def calculate_business_days(start_date: date, end_date: date, holidays: Set[date]) -> int:
     """
@@ -14,3 +16,37 @@ def calculate_business_days(start_date: date, end_date: date, holidays: Set[date
             business_days += 1
         current += timedelta(days=1)
     return business_days
+
+def business_day_mask(start_date: date, end_date: date, holidays: Set[date]) -> bytes:
+    """
+    The business days of [start_date, end_date] as a bitmap: bit i (LSB first)
+    is set when start_date + i days is counted. 46 bytes cover a whole year.
+    """
+    days = (end_date - start_date).days + 1
+    mask = bytearray((days + 7) // 8)
+    for offset in range(days):
+        current = start_date + timedelta(days=offset)
+        if current.weekday() < 5 and current not in holidays:
+            mask[offset // 8] |= 1 << (offset % 8)
+    return bytes(mask)
+
+def count_business_days(mask: bytes) -> int:
+    return int.from_bytes(mask, "little").bit_count()
+
+def clear_days(mask: bytes, start_date: date, days: Iterable[date]) -> bytes:
+    """The mask with the given dates (e.g. new holidays) no longer counted; dates outside it are ignored."""
+    cleared = bytearray(mask)
+    for day in days:
+        offset = (day - start_date).days
+        if 0 <= offset < len(cleared) * 8:
+            cleared[offset // 8] &= ~(1 << (offset % 8)) & 0xFF
+    return bytes(cleared)
+
+def is_counted(mask: bytes, start_date: date, day: date) -> bool:
+    offset = (day - start_date).days
+    return 0 <= offset < len(mask) * 8 and bool(mask[offset // 8] >> (offset % 8) & 1)
+
+def daily_quarters(business_quarters: int, mask: bytes) -> int:
+    """Quarter-days taken on each counted day: a whole day, or the part taken by a part-day request."""
+    counted = count_business_days(mask)
+    return business_quarters // counted if counted else QUARTERS_PER_DAY
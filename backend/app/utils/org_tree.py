@@ -0,0 +1,110 @@
+"""
+Org tree helpers backed by the user_closure table.
+
+Every user has a depth-0 row pointing at themselves plus one row per manager
+above them, so "everyone under X" is a single indexed lookup on ancestor_id
+instead of a recursive walk.
+"""
+from typing import Optional
+from sqlalchemy import select, insert, delete, literal, event, inspect, and_, true
+from sqlalchemy.orm import Session, aliased
+
+from app.models.user import User, user_closure
+
+
+def subtree_ids(root_id: int, include_root: bool = False):
+    """Select of user ids below root_id (optionally including root_id itself)."""
+    query = select(user_closure.c.descendant_id).where(user_closure.c.ancestor_id == root_id)
+    if not include_root:
+        query = query.where(user_closure.c.depth > 0)
+    return query
+
+
+def is_in_subtree_query(root_id: int, user_id: int):
+    """Select returning a row when user_id is root_id or anywhere below it."""
+    return select(user_closure.c.depth).where(
+        and_(user_closure.c.ancestor_id == root_id, user_closure.c.descendant_id == user_id)
+    )
+
+
+def _attach(connection, user_id: int, manager_id: Optional[int]) -> None:
+    """Insert closure rows for a new leaf user."""
+    connection.execute(
+        insert(user_closure).values(ancestor_id=user_id, descendant_id=user_id, depth=0)
+    )
+    if manager_id is not None:
+        connection.execute(
+            insert(user_closure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(
+                    user_closure.c.ancestor_id,
+                    literal(user_id),
+                    user_closure.c.depth + 1,
+                ).where(user_closure.c.descendant_id == manager_id),
+            )
+        )
+
+
+def _move(connection, user_id: int, new_manager_id: Optional[int]) -> None:
+    """Re-parent user_id (and its whole subtree) under new_manager_id."""
+    subtree = select(user_closure.c.descendant_id).where(user_closure.c.ancestor_id == user_id)
+    old_ancestors = select(user_closure.c.ancestor_id).where(
+        and_(user_closure.c.descendant_id == user_id, user_closure.c.ancestor_id != user_id)
+    )
+    # Cut every path that enters the subtree from above
+    connection.execute(
+        delete(user_closure).where(
+            and_(
+                user_closure.c.descendant_id.in_(subtree),
+                user_closure.c.ancestor_id.in_(old_ancestors),
+            )
+        )
+    )
+    if new_manager_id is None:
+        return
+    # Graft: every ancestor of the new manager reaches every node of the subtree
+    above = aliased(user_closure)
+    below = aliased(user_closure)
+    connection.execute(
+        insert(user_closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                above.c.ancestor_id,
+                below.c.descendant_id,
+                above.c.depth + below.c.depth + 1,
+            )
+            # A deliberate cross join, constrained only by the two WHERE terms
+            .select_from(above.join(below, true()))
+            .where(
+                and_(above.c.descendant_id == new_manager_id, below.c.ancestor_id == user_id)
+            ),
+        )
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_user_closure(session, flush_context):
+    new_users = [obj for obj in session.new if isinstance(obj, User)]
+    moved_users = [
+        obj for obj in session.dirty
+        if isinstance(obj, User) and inspect(obj).attrs.manager_id.history.has_changes()
+    ]
+    if not new_users and not moved_users:
+        return
+
+    connection = session.connection()
+
+    # Attach managers before their reports when both are created in one flush
+    pending = {user.id: user for user in new_users}
+    while pending:
+        ready = [u for u in pending.values() if u.manager_id not in pending]
+        if not ready:
+            # A cycle among brand-new users; attach them as roots
+            ready = list(pending.values())
+        for user in ready:
+            manager_id = user.manager_id if user.manager_id not in pending else None
+            _attach(connection, user.id, manager_id)
+            del pending[user.id]
+
+    for user in moved_users:
+        _move(connection, user.id, user.manager_id)
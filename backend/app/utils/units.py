@@ -0,0 +1,52 @@
+"""
+Leave amounts as fixed-point integers.
+
+Request durations and balances are stored, added up and summed in SQL as
+whole quarter-days, so half days and 2-hour leave (with 8-hour days) are exact
+and totals over many rows cannot drift like floats. Days appear only at the
+edges (schemas, constructors): every multiple of 0.25 is an exact float.
+"""
+from numbers import Real
+from typing import Optional
+
+QUARTERS_PER_DAY = 4
+
+
+def to_quarters(days: Real) -> int:
+    """Days (int, float or Decimal) as quarter-days; ValueError unless a multiple of 0.25."""
+    quarters = days * QUARTERS_PER_DAY
+    if quarters != int(quarters):
+        raise ValueError(f"{days} is not a whole number of quarter days")
+    return int(quarters)
+
+
+def to_days(quarters: int) -> float:
+    return quarters / QUARTERS_PER_DAY
+
+
+def hours_to_quarters(hours: Real, workday_hours: int) -> int:
+    """Hours of leave as quarter-days; ValueError unless a multiple of a quarter of the workday."""
+    quarters = hours * QUARTERS_PER_DAY / workday_hours
+    if quarters != int(quarters):
+        raise ValueError(f"{hours}h is not a multiple of {workday_hours / QUARTERS_PER_DAY:g}h")
+    return int(quarters)
+
+
+def prorate(quarters: int, numerator: int, denominator: int) -> int:
+    """quarters * numerator / denominator, rounded half up to a whole quarter-day."""
+    return (2 * quarters * numerator + denominator) // (2 * denominator)
+
+
+def days_property(quarters_attr: str) -> property:
+    """
+    Read/write view in days of an integer quarter-days column, so model
+    constructors and Python code can keep using days. Queries use the column.
+    """
+    def get(self) -> Optional[float]:
+        quarters = getattr(self, quarters_attr)
+        return None if quarters is None else to_days(quarters)
+
+    def set(self, days: Real) -> None:
+        setattr(self, quarters_attr, to_quarters(days))
+
+    return property(get, set)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Yearly maintenance of vacation_requests; run it from cron in early January:
+
+    python archive.py                              # create this and next year's partitions
+    python archive.py --year 2023 --dir /backups   # also archive 2023
+
+On Postgres requests are partitioned by year (see app/core/partitions.py).
+Every run creates the partitions for this year and the next, moving any of
+their rows out of the default partition.
+
+--year moves the requests that start in that year into
+<dir>/vacation_requests_<year>.csv.gz and deletes them from the database,
+dropping the year's partition. The year must be over and have no pending
+requests. Balances are kept, but list views and usage reports no longer show
+that year's requests, so keep the file somewhere safe.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.core import partitions
+from app.database import AsyncSessionLocal, engine
+
+
+async def main(year, directory: Path) -> None:
+    this_year = date.today().year
+    try:
+        async with AsyncSessionLocal() as db:
+            for name in await partitions.ensure_partitions(db, [this_year, this_year + 1]):
+                print(f"Created partition {name}.")
+            if year is not None:
+                path, count = await partitions.archive_year(db, year, directory)
+            await db.commit()
+    finally:
+        await engine.dispose()
+    if year is not None:
+        print(f"Archived {count} requests of {year} to {path}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, help="a finished year to archive")
+    parser.add_argument("--dir", type=Path, default=Path("archive"), help="where archives are written (default: ./archive)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.year, args.dir))
+    except ValueError as error:
+        sys.exit(f"Not archived: {error}")
@@ -0,0 +1,60 @@
+"""
+Microbenchmarks for the per-request authentication path.
+
+Run from the backend directory:
+
+    SECRET_KEY=bench DATABASE_URL=sqlite+aiosqlite:// python benchmarks/bench_auth.py
+
+Prints the mean cost per call of each step. get_current_principal is what
+most endpoints depend on; it should stay a cache lookup plus a dict check.
+"""
+import asyncio
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt as jose_jwt  # noqa: E402
+
+from app.api import deps  # noqa: E402
+from app.core import security  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.schemas.token import TokenPayload  # noqa: E402
+
+
+def report(name: str, fn, number: int = 20_000) -> None:
+    seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print(f"{name:<45} {seconds * 1e6:8.2f} us")
+
+
+def main() -> None:
+    token = security.create_access_token(42, role="manager", version=1)
+    key, algorithms = settings.SECRET_KEY, [settings.ALGORITHM]
+
+    print(f"JWT_BACKEND={settings.JWT_BACKEND}")
+    report("python-jose decode", lambda: jose_jwt.decode(token, key, algorithms=algorithms))
+    try:
+        import jwt as pyjwt
+    except ImportError:
+        print("PyJWT decode                                  (not installed)")
+    else:
+        report("PyJWT decode", lambda: pyjwt.decode(token, key, algorithms=algorithms))
+    payload = security.decode_token(token)
+    report("TokenPayload construction", lambda: TokenPayload(**payload))
+
+    def uncached():
+        security._token_cache.clear()
+        security.read_token(token)
+    report("read_token, cold cache", uncached)
+    report("read_token, warm cache", lambda: security.read_token(token))
+
+    loop = asyncio.new_event_loop()
+    coroutine = deps.principal_from_token
+    report("principal_from_token, warm cache", lambda: loop.run_until_complete(coroutine(None, token)), number=5_000)
+    report("empty run_until_complete (overhead)", lambda: loop.run_until_complete(asyncio.sleep(0)), number=5_000)
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+HTTP throughput benchmark against a running server.
+
+Start the server the way it runs in production (with RATE_LIMIT_ENABLED=false,
+or the per-user read budget turns most responses into 429s), then point this at it:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+    python benchmarks/bench_http.py --url http://127.0.0.1:8000 --token <access token>
+
+Runs `--concurrency` keep-alive clients for `--duration` seconds per path and
+prints requests per second and latency percentiles. Without a token only the
+unauthenticated paths are measured. Compare server profiles (worker count,
+uvicorn vs gunicorn) on the target machine; numbers from a laptop don't
+transfer.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Optional
+
+import httpx
+
+PUBLIC_PATHS = ["/api/v1/health"]
+AUTHENTICATED_PATHS = ["/api/v1/vacation-types/", "/api/v1/holidays/?year=2026"]
+
+
+async def hammer(client: httpx.AsyncClient, path: str, deadline: float, latencies: List[float], errors: List[object]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def measure(url: str, path: str, token: Optional[str], concurrency: int, duration: float) -> None:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=30) as client:
+        await client.get(path)  # connection setup and any lazy server-side work
+        latencies: List[float] = []
+        errors: List[object] = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(hammer(client, path, deadline, latencies, errors) for _ in range(concurrency)))
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{path:<35} {len(latencies) / duration:8.0f} req/s   p50 {p50:6.1f} ms   p99 {p99:6.1f} ms"
+          + (f"   {len(errors)} errors (e.g. {errors[0]})" if errors else ""))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", help="access token for the authenticated paths")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per path")
+    parser.add_argument("paths", nargs="*", help="paths to measure instead of the defaults")
+    args = parser.parse_args()
+
+    paths = args.paths or PUBLIC_PATHS + (AUTHENTICATED_PATHS if args.token else [])
+    print(f"{args.url}, {args.concurrency} concurrent clients, {args.duration:.0f}s per path")
+    for path in paths:
+        await measure(args.url, path, args.token, args.concurrency, args.duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
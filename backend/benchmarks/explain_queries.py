@@ -0,0 +1,242 @@
+"""
+Index audit: every query the main endpoints send, checked with EXPLAIN ANALYZE.
+
+Run from the backend directory against a scratch Postgres database at head:
+
+    export SECRET_KEY=explain DATABASE_URL=postgresql+asyncpg://localhost/vt_explain
+    python migrate.py
+    python benchmarks/explain_queries.py
+
+An empty database is first seeded with a synthetic company (--people users
+under managers, three years of balances, requests and holidays, audit
+events) and ANALYZEd. The script then calls the endpoints in-process as an
+admin, a manager and one of their reports, recording every statement, and
+reruns each under EXPLAIN (ANALYZE) in a rolled-back transaction.
+
+It exits with status 1 if a plan has a sequential scan that filters out more
+than --threshold rows, and more rows than it keeps: a selective predicate
+with no index behind it. Scans that keep most of what they read, like a
+report over everyone, are left alone.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Many calls from one user in a few seconds
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from httpx import AsyncClient  # noqa: E402
+from sqlalchemy import event, func, insert, select  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core import listing, partitions, security  # noqa: E402
+from app.database import AsyncSessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+STATUSES = ["approved"] * 7 + ["pending", "rejected", "cancelled"]
+EXPLAINED = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def batches(rows: list, size: int = 5000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def seed(db, people: int) -> None:
+    rng = random.Random(people)
+    this_year = date.today().year
+    years = range(this_year - 2, this_year + 1)
+
+    admin = models.User(email="admin@example.com", password_hash="-", name="Admin", role="admin")
+    managers = [
+        models.User(email=f"manager{i}@example.com", password_hash="-", name=f"Manager {i}", role="manager", manager=admin)
+        for i in range(max(people // 20, 1))
+    ]
+    employees = [
+        models.User(email=f"user{i}@example.com", password_hash="-", name=f"User {i}", role="employee", manager=rng.choice(managers))
+        for i in range(max(people - len(managers) - 1, 1))
+    ]
+    types = [models.VacationType(name=name, default_days=days) for name, days in [("Annual", 24), ("Sick", 10), ("Unpaid", 0)]]
+    db.add_all([admin, *managers, *employees, *types])
+    await db.flush()
+
+    for year in [*years, this_year + 1]:
+        start = date(year, 1, 1)
+        for day in sorted(rng.sample(range(365), 10)):
+            holiday = start + timedelta(days=day)
+            db.add(models.PublicHoliday(date=holiday, name=f"Holiday {holiday}", year=year))
+    await db.flush()
+
+    users = [admin, *managers, *employees]
+    balances = [
+        {"user_id": u.id, "type_id": t.id, "year": year, "total_quarters": 96, "used_quarters": rng.randrange(0, 96)}
+        for u in users for t in types for year in years
+    ]
+    requests, audit_events = [], []
+    for user in users:
+        for year in years:
+            for _ in range(8):
+                start = date(year, 1, 1) + timedelta(days=rng.randrange(360))
+                days = rng.randint(1, 10)
+                status = rng.choice(STATUSES)
+                reviewed = status in ("approved", "rejected")
+                requests.append({
+                    "user_id": user.id, "type_id": rng.choice(types).id,
+                    "start_date": start, "end_date": start + timedelta(days=days - 1),
+                    "business_quarters": days * 4, "status": status,
+                    "reviewer_id": user.manager_id if reviewed else None,
+                    "reviewed_at": datetime.combine(start, datetime.min.time()) if reviewed else None,
+                    "created_at": datetime.combine(start - timedelta(days=30), datetime.min.time()),
+                })
+                audit_events.append({
+                    "actor_id": user.manager_id or user.id, "action": f"request.{status}",
+                    "entity_type": "vacation_requests", "entity_id": len(requests),
+                    "changes": {}, "created_at": datetime.utcnow(),
+                })
+    for table, rows in [(models.VacationBalance, balances), (models.VacationRequest, requests), (models.AuditEvent, audit_events)]:
+        for batch in batches(rows):
+            await db.execute(insert(table), batch)
+    request_ids = (await db.execute(select(models.VacationRequest.id))).scalars().all()
+    for batch in batches(request_ids):
+        await listing.refresh(db, batch)
+    # As archive.py would have, had the app run through those years
+    await partitions.ensure_partitions(db, years)
+    await db.commit()
+    print(f"Seeded {len(users)} users, {len(requests)} requests, {len(balances)} balances.")
+
+
+async def pick_users(db) -> Dict[str, models.User]:
+    """An admin, the manager with the most reports, and one of those reports."""
+    admin = (await db.execute(select(models.User).where(models.User.role == "admin").limit(1))).scalar_one()
+    manager_id = (await db.execute(
+        select(models.User.manager_id)
+        .where(models.User.manager_id.is_not(None), models.User.role == "employee")
+        .group_by(models.User.manager_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    )).scalar_one()
+    manager = await db.get(models.User, manager_id)
+    employee = (await db.execute(select(models.User).where(models.User.manager_id == manager_id).limit(1))).scalar_one()
+    return {"admin": admin, "manager": manager, "employee": employee}
+
+
+class Recorder:
+    """Statements sent while `label` is set, as (label, statement, parameters)."""
+
+    def __init__(self):
+        self.label = None
+        self.statements: List[Tuple[str, str, object]] = []
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label is not None and not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            self.statements.append((self.label, statement, parameters))
+
+
+async def exercise(users: Dict[str, models.User], recorder: Recorder) -> None:
+    year = date.today().year
+    tokens = {who: security.create_access_token(u.id, role=u.role) for who, u in users.items()}
+    manager_id, employee_id = users["manager"].id, users["employee"].id
+
+    async with AsyncClient(app=app, base_url="http://explain") as client:
+        async def call(who: str, method: str, path: str, **kwargs):
+            recorder.label = f"{method} {path} ({who})"
+            try:
+                response = await client.request(
+                    method, f"/api/v1{path}", headers={"Authorization": f"Bearer {tokens[who]}"}, **kwargs
+                )
+            finally:
+                recorder.label = None
+            if response.status_code >= 400:
+                sys.exit(f"{method} {path} ({who}): {response.status_code} {response.text}")
+            return response.json()
+
+        await call("employee", "GET", "/vacation-types/")
+        await call("employee", "GET", f"/holidays/?year={year}")
+        await call("employee", "GET", f"/users/{employee_id}/balance?year={year}")
+        await call("employee", "GET", "/requests/")
+        await call("manager", "GET", "/dashboard/")
+        await call("manager", "GET", "/requests/inbox")
+        await call("manager", "GET", f"/requests/?manager_id={manager_id}")
+        await call("manager", "GET", f"/calendar/?start_date={year}-07-01&end_date={year}-07-31&manager_id={manager_id}")
+        await call("manager", "GET", f"/reports/usage?year={year}&manager_id={manager_id}")
+        await call("admin", "GET", "/requests/inbox")
+        await call("admin", "GET", f"/calendar/?start_date={year}-07-01&end_date={year}-07-07")
+        await call("admin", "GET", f"/reports/usage?year={year - 1}")
+        await call("admin", "GET", "/users/")
+        await call("admin", "GET", "/audit/?action=request.cancelled")
+        await call("admin", "GET", f"/audit/?actor_id={manager_id}")
+
+        created = await call("employee", "POST", "/requests/", json={
+            "type_id": (await call("employee", "GET", "/vacation-types/"))[0]["id"],
+            "start_date": f"{year + 1}-03-02", "end_date": f"{year + 1}-03-06",
+        })
+        await call("manager", "POST", f"/requests/{created['id']}/approve")
+        await call("employee", "POST", f"/requests/{created['id']}/cancel")
+
+
+def filtered_seq_scans(plan: dict):
+    """(relation, rows kept, rows filtered out) of every sequential scan in the plan."""
+    if plan["Node Type"] == "Seq Scan":
+        loops = plan.get("Actual Loops", 1)
+        yield plan["Relation Name"], plan["Actual Rows"] * loops, plan.get("Rows Removed by Filter", 0) * loops
+    for child in plan.get("Plans", []):
+        yield from filtered_seq_scans(child)
+
+
+async def explain(statement: str, parameters) -> dict:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            result = await conn.exec_driver_sql("EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters)
+            plan = result.scalar()
+        finally:
+            await transaction.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def main(people: int, threshold: int) -> int:
+    if engine.dialect.name != "postgresql":
+        sys.exit("Point DATABASE_URL at a Postgres database; plans on SQLite say nothing about production.")
+
+    async with AsyncSessionLocal() as db:
+        if not await db.scalar(select(func.count()).select_from(models.User)):
+            await seed(db, people)
+        users = await pick_users(db)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+
+    recorder = Recorder()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder.on_execute)
+    try:
+        await exercise(users, recorder)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", recorder.on_execute)
+
+    failures = 0
+    for label, statement, parameters in recorder.statements:
+        for relation, kept, removed in filtered_seq_scans(await explain(statement, parameters)):
+            # Reading most of a table is what a sequential scan is for
+            if removed <= threshold or removed <= kept:
+                continue
+            failures += 1
+            print(f"FAIL {label}: seq scan on {relation} filtered out {removed} rows")
+            print("     " + " ".join(statement.split())[:300])
+    print(f"{len(recorder.statements)} statements explained, {failures} unindexed scans over {threshold} rows.")
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=2000, help="users to seed into an empty database")
+    parser.add_argument("--threshold", type=int, default=1000, help="rows a sequential scan may filter out")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.people, args.threshold)))
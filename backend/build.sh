@@ -7,7 +7,8 @@ pip install --upgrade pip
 pip install -r requirements.txt
 
 echo "Running database migrations..."
-alembic upgrade head
+# Serialized with an advisory lock, so overlapping deploys don't race
+python migrate.py
 
 echo "Build completed successfully!"
 
@@ -11,13 +11,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app.main import app
+from app.core.openapi import generate, source_hash
 
 
 def generate_openapi_specs():
     """Generate OpenAPI specification in JSON and YAML formats."""
 
-    # Get the OpenAPI schema
-    openapi_schema = app.openapi()
+    # Always build from the routes, never from the previous file
+    openapi_schema = generate(app)
 
     # Create docs directory if it doesn't exist
     docs_dir = Path(__file__).parent / "docs"
@@ -29,6 +30,11 @@ def generate_openapi_specs():
         json.dump(openapi_schema, f, indent=2)
     print(f"✓ Generated OpenAPI JSON: {json_path}")
 
+    # The API serves openapi.json directly while this hash matches the code
+    hash_path = docs_dir / "openapi.sha256"
+    hash_path.write_text(source_hash() + "\n")
+    print(f"✓ Recorded API source hash: {hash_path}")
+
     # Write YAML format
     try:
         import yaml
@@ -0,0 +1,55 @@
+"""
+Production server profile: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Gunicorn supervises the workers (restarts crashed ones, graceful reloads on
+HUP); each worker is a uvicorn event loop on uvloop with the httptools parser.
+Everything is tunable through the environment:
+
+    WEB_CONCURRENCY           worker processes (default: one per CPU core)
+    PORT                      listen port (default 8000)
+    GUNICORN_TIMEOUT          seconds before a stuck worker is killed (default 60)
+    GUNICORN_MAX_REQUESTS     recycle a worker after this many requests (0 = never)
+
+Each worker has its own database pool (DB_POOL_SIZE + DB_MAX_OVERFLOW
+connections), so keep WEB_CONCURRENCY * that below Postgres' max_connections.
+With more than one worker set EVENTS_BACKEND=postgres and
+RATE_LIMIT_BACKEND=database, otherwise live updates and rate limit budgets
+stay per worker.
+
+Migrations are not run here; run `python migrate.py` once per deploy.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+# uvloop event loop and httptools parser, see app/server.py
+worker_class = "app.server.UvicornWorker"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+# Behind Render's / a reverse proxy's keep-alive connections
+keepalive = 75
+
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+# Each worker imports the app itself, so every worker runs its own lifespan
+# (warmup, job worker, event broker) with its own event loop and pool
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def when_ready(server):
+    from app.core.config import settings
+
+    if workers > 1:
+        if settings.EVENTS_BACKEND == "memory":
+            server.log.warning("EVENTS_BACKEND=memory with %s workers: live updates only reach clients of the same worker", workers)
+        if settings.RATE_LIMIT_ENABLED and settings.RATE_LIMIT_BACKEND == "memory":
+            server.log.warning("RATE_LIMIT_BACKEND=memory with %s workers: each worker enforces its own budgets", workers)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+One-shot database migration, run once per deploy before the new API starts:
+
+    python migrate.py
+
+Equivalent to `alembic upgrade head`, but on Postgres it first takes a session
+advisory lock, so deploys that overlap (or several containers started at once)
+migrate one after another instead of racing; the later ones find the schema
+already at head and do nothing. The lock is released when the script exits,
+even if it crashes.
+"""
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+# Arbitrary constant shared by every deploy of this app
+MIGRATION_LOCK_ID = 727_100_001
+
+
+def lock_url(database_url: str) -> str:
+    """The sync (psycopg2) URL for the lock connection; alembic itself uses asyncpg."""
+    for prefix in ("postgresql+asyncpg://", "postgres://"):
+        if database_url.startswith(prefix):
+            return "postgresql://" + database_url[len(prefix):]
+    return database_url
+
+
+def main() -> None:
+    database_url = os.environ["DATABASE_URL"]
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+
+    if not lock_url(database_url).startswith("postgresql://"):
+        command.upgrade(config, "head")
+        return
+
+    engine = create_engine(lock_url(database_url), isolation_level="AUTOCOMMIT")
+    with engine.connect() as lock:
+        print("Waiting for the migration lock...")
+        lock.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            command.upgrade(config, "head")
+        finally:
+            lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    engine.dispose()
+    print("Migrations complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Standalone background job worker.
+
+Runs the same handlers as the in-process worker started by the API. Use it when
+the API runs with JOBS_RUN_IN_PROCESS=false so request-serving processes never
+spend time on deferred work:
+
+    python worker.py
+"""
+import asyncio
+import logging
+import os
+import sys
+
+# Set up path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app import tasks  # registers job handlers
+from app.core.jobs import JobWorker
+
+
+async def main():
+    worker = JobWorker()
+    print(f"Job worker started (batch size {worker.batch_size}, poll every {worker.poll_interval}s)")
+    await worker.run_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Job worker stopped.")
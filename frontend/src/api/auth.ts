@@ -12,6 +12,8 @@ export interface User {
 export interface LoginResponse {
     access_token: string;
     token_type: string;
+    refresh_token?: string;
+    expires_in?: number;
 }
 
 export const authApi = {
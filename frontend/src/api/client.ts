@@ -23,15 +23,63 @@ apiClient.interceptors.request.use(
     }
 );
 
+// Access tokens are short-lived: on a 401, exchange the refresh token once
+// (shared by all requests failing at the same time) and retry the request.
+// Refresh tokens are single-use and shared by every tab through localStorage,
+// so tabs take turns via a Web Lock; a tab that waited finds the token already
+// rotated and uses the new one instead of presenting the old one again, which
+// the server would treat as reuse and sign the user out everywhere.
+let refreshing: Promise<string | null> | null = null;
+
+const refreshAccessToken = async (): Promise<string | null> => {
+    const seen = localStorage.getItem('refresh_token');
+    if (!seen) {
+        return null;
+    }
+    const rotatedElsewhere = () => {
+        const current = localStorage.getItem('refresh_token');
+        return current && current !== seen ? localStorage.getItem('token') : null;
+    };
+    const refresh = async (): Promise<string | null> => {
+        if (localStorage.getItem('refresh_token') !== seen) {
+            return rotatedElsewhere();
+        }
+        try {
+            const response = await axios.post(`${API_URL}/auth/refresh`, { refresh_token: seen });
+            localStorage.setItem('token', response.data.access_token);
+            localStorage.setItem('refresh_token', response.data.refresh_token);
+            return response.data.access_token;
+        } catch {
+            // Without Web Locks another tab may have won the race meanwhile
+            return rotatedElsewhere();
+        }
+    };
+    if ('locks' in navigator) {
+        return navigator.locks.request('vt-token-refresh', refresh);
+    }
+    return refresh();
+};
+
 // Add a response interceptor to handle 401 errors
 apiClient.interceptors.response.use(
     (response) => {
         return response;
     },
-    (error) => {
-        if (error.response && error.response.status === 401 && !error.config?.url?.includes('/auth/login')) {
+    async (error) => {
+        const config = error.config;
+        if (error.response && error.response.status === 401 && !config?.url?.includes('/auth/login')) {
+            if (config && !config._retried) {
+                refreshing = refreshing ?? refreshAccessToken().finally(() => { refreshing = null; });
+                const token = await refreshing;
+                if (token) {
+                    config._retried = true;
+                    config.headers.Authorization = `Bearer ${token}`;
+                    return apiClient(config);
+                }
+            }
             // Clear local storage and redirect to login
             localStorage.removeItem('token');
+            localStorage.removeItem('refresh_token');
             window.location.href = '/login';
         }
         return Promise.reject(error);
@@ -4,7 +4,7 @@ import { authApi, type User } from '../api/auth';
 interface AuthContextType {
     user: User | null;
     isLoading: boolean;
-    login: (token: string) => Promise<void>;
+    login: (token: string, refreshToken?: string) => Promise<void>;
     logout: () => void;
     isAuthenticated: boolean;
 }
@@ -36,13 +36,17 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
         }
     }, []);
 
-    const login = async (token: string) => {
+    const login = async (token: string, refreshToken?: string) => {
         localStorage.setItem('token', token);
+        if (refreshToken) {
+            localStorage.setItem('refresh_token', refreshToken);
+        }
         await fetchUser();
     };
 
     const logout = () => {
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         setUser(null);
     };
 
@@ -70,7 +70,7 @@ describe('LoginPage', () => {
     });
 
     it('navigates to home on successful login', async () => {
-        (authApi.login as any).mockResolvedValue({ access_token: 'fake-token' });
+        (authApi.login as any).mockResolvedValue({ access_token: 'fake-token', refresh_token: 'fake-refresh' });
 
         render(
             <MemoryRouter>
@@ -87,7 +87,7 @@ describe('LoginPage', () => {
         fireEvent.click(screen.getByRole('button', { name: /Sign in/i }));
 
         await waitFor(() => {
-            expect(mockLogin).toHaveBeenCalledWith('fake-token');
+            expect(mockLogin).toHaveBeenCalledWith('fake-token', 'fake-refresh');
             expect(mockNavigate).toHaveBeenCalledWith('/');
         });
     });
@@ -23,7 +23,7 @@ export default function LoginPage() {
             console.log('Calling authApi.login...');
             const response = await authApi.login(data.email, data.password);
             console.log('Login response:', response);
-            await login(response.access_token);
+            await login(response.access_token, response.refresh_token);
             navigate('/');
         } catch (err: any) {
             console.error('Login error:', err);